@@ -0,0 +1,99 @@
+# Headless models of the accelerator hardware; sprites2 subclasses these to draw them
+
+from constants import *
+import math
+
+# Sections (the geometry the physics needs from each piece of hardware)
+
+class CuboidalSection:
+    def __init__(self, pos, size):
+        self.pos = pos
+        self.size = size
+
+
+class CylindricalSection:
+    def __init__(self, pos, radius, height):
+        self.pos = pos
+        self.radius = radius
+        self.height = height
+
+# Accelerators
+
+class SourceChamber:
+    def __init__(self, pos, radius, height):
+        self.pos = pos
+        self.radius = radius
+        self.height = height
+        self.nozzle = CylindricalSection([0, 5, -9], 3, 5)
+        self.wall = CylindricalSection([0, 5, -1.5], 3, 0.25) # Only acts on points once the chamber is sealed
+        self.plate = CuboidalSection([0, 0.5, -4], (3, 3, 5))
+        self.sealed = False
+        self.activated = False
+
+    def reset(self):
+        self.sealed = False
+        self.activated = False
+
+    def seal(self):
+        self.sealed = True
+
+    def applyPlate(self):
+        self.activated = True
+
+
+class LINAC:
+    def __init__(self, pos):
+        self.initialLength = 3
+        self.updatedPos = [0, 5, (pos[2] - 1.5)]
+        self.initialGapLength = 1
+        self.endTerminalZCord = -95
+        self.tubes = []
+        self.wires = []
+        self.checkpoints = []
+        self.updateObjects()
+
+    def updateObjects(self):
+        '''Method that lays out the drift tubes and the wires between them'''
+        tubeLength = self.initialLength
+        gapLength = self.initialGapLength
+        pos = self.updatedPos
+        for i in range(0, 10):
+            self.tubes.append(CylindricalSection(pos, 0.75, tubeLength))
+            if i < 9:
+                self.wires.append(CuboidalSection([0, 2.375, (pos[2] - (tubeLength / 2) - (gapLength / 4))], (0.25, 3.75, 0.25)))
+            pos = [0, 5, pos[2] - tubeLength - gapLength]
+            tubeLength += 1
+            gapLength += 0.1
+
+    def obtainElectricField(self, distance):
+        '''Method that finds the LINAC's electric field at a distance from the end terminal'''
+        cylinderRadius = 0.75
+        eFieldMagnitude = (SIMULATED_PROTON_CHARGE * distance) / (4 * math.pi * PERMITTIVITY_OF_FREE_SPACE * ((cylinderRadius ** 2 + distance ** 2) ** (3 / 2)))
+        return eFieldMagnitude * 100
+
+
+class BoosterRing:
+    def __init__(self, pos, radius, tubeRadius):
+        self.pos = pos
+        self.radius = radius
+        self.tubeRadius = tubeRadius
+        self.electricAccelerator = CuboidalSection([0, 6.5, -100], (6, 6, 10))
+
+    def obtainSynchrotronElectricField(self):
+        cuboid = self.electricAccelerator.size
+        eFieldMagnitude = (SIMULATED_PROTON_CHARGE * -1) / (cuboid[1] * cuboid[1] * PERMITTIVITY_OF_FREE_SPACE)
+        return eFieldMagnitude * 2
+
+
+class Collider:
+    def __init__(self, pos, radius, tubeRadius):
+        self.pos = pos # Centre
+        self.radius = radius
+        self.tubeRadius = tubeRadius
+        self.started = False
+        self.electricAccelerator = CuboidalSection([0, 12, -320], (50, 14, 14))
+
+    def obtainColliderElectricField(self):
+        cuboid = self.electricAccelerator.size
+        eFieldMagnitude = (SIMULATED_PROTON_CHARGE * -1) / (cuboid[1] * cuboid[1] * PERMITTIVITY_OF_FREE_SPACE)
+        return eFieldMagnitude * 2
@@ -0,0 +1,148 @@
+# Streaming aggregates of collision readings: channel counts, energy histograms and product tallies
+# Each takes readings a batch at a time with np.bincount, merges with another of its kind by adding counts (so shards of a study are combined
+# in time proportional to the bins, not the readings) and saves to and loads from a .npz file, e.g.
+#
+#     aggregates = RunAggregates()
+#     for shard in shards:
+#         aggregates.merge(shard["aggregates"])
+#     aggregates.save("run.aggregates")
+#
+# Each also works as a sink in an event pipeline (see eventPipeline.py)
+
+import numpy as np
+from constants import *
+from collisionChannels import POSSIBILITIES, PRODUCT_COUNTS, PRODUCT_NAMES, obtainProductCodes
+from resultsFile import ResultsReader
+
+class ChannelCounter:
+    '''Counts of readings in each channel'''
+    def __init__(self):
+        self.counts = np.zeros(len(POSSIBILITIES), dtype = np.int64)
+
+    def add(self, channels):
+        self.counts += np.bincount(channels, minlength = len(POSSIBILITIES))
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    def obtainCounts(self):
+        return dict(zip(POSSIBILITIES, self.counts.tolist()))
+
+    def consume(self, batch):
+        self.add(batch["channel"])
+
+    def finish(self):
+        pass
+
+
+class EnergyHistogram:
+    '''Counts of readings in fixed width energy bins, one histogram per channel, with a bin below low and one above high at either end'''
+    def __init__(self, bins = HISTOGRAM_BINS, low = HISTOGRAM_RANGE[0], high = HISTOGRAM_RANGE[1]):
+        self.bins = bins
+        self.low = low
+        self.high = high
+        self.counts = np.zeros((len(POSSIBILITIES), bins + 2), dtype = np.int64)
+
+    def obtainBins(self, energies):
+        '''Method that finds each energy's bin, counting the underflow bin as 0, with high itself in the last bin as for np.histogram'''
+        bins = np.floor((energies - self.low) * (self.bins / (self.high - self.low))).astype(np.int64)
+        bins[energies == self.high] = self.bins - 1
+        return np.clip(bins, -1, self.bins) + 1
+
+    def add(self, energies, channels):
+        cells = channels.astype(np.int64) * (self.bins + 2) + self.obtainBins(np.asarray(energies, dtype = np.float64))
+        self.counts += np.bincount(cells, minlength = self.counts.size).reshape(self.counts.shape)
+
+    def merge(self, other):
+        if (self.bins, self.low, self.high) != (other.bins, other.low, other.high):
+            raise ValueError("Only histograms with the same bins can be merged")
+        self.counts += other.counts
+
+    def obtainEdges(self):
+        return np.linspace(self.low, self.high, self.bins + 1)
+
+    def obtainCounts(self, channel = None):
+        '''Method that gives the counts in the bins from low to high, for one channel (by name or number) or all of them together'''
+        counts = self.counts.sum(axis = 0) if channel is None else self.counts[POSSIBILITIES.index(channel) if isinstance(channel, str) else channel]
+        return counts[1:-1]
+
+    def consume(self, batch):
+        self.add(batch["energy"], batch["channel"])
+
+    def finish(self):
+        pass
+
+
+class ProductTally:
+    '''Counts of each product across all readings, and of readings giving each number of products'''
+    def __init__(self):
+        self.products = np.zeros(len(PRODUCT_NAMES), dtype = np.int64)
+        self.multiplicities = np.zeros(int(PRODUCT_COUNTS.max()) + 1, dtype = np.int64)
+
+    def add(self, productCounts, products):
+        '''Method that takes a batch's product counts and its products end to end, as codes into PRODUCT_NAMES'''
+        self.products += np.bincount(products, minlength = len(self.products))
+        self.multiplicities += np.bincount(productCounts, minlength = len(self.multiplicities))
+
+    def merge(self, other):
+        self.products += other.products
+        self.multiplicities += other.multiplicities
+
+    def obtainCounts(self):
+        return dict(zip(PRODUCT_NAMES, self.products.tolist()))
+
+    def consume(self, batch):
+        self.add(batch["productCounts"], obtainProductCodes(batch["channel"], batch["charges"]))
+
+    def finish(self):
+        pass
+
+
+class RunAggregates:
+    '''Every aggregate of a run together, as the Monte Carlo study and summaries use them'''
+    def __init__(self, bins = HISTOGRAM_BINS, low = HISTOGRAM_RANGE[0], high = HISTOGRAM_RANGE[1]):
+        self.channels = ChannelCounter()
+        self.energies = EnergyHistogram(bins, low, high)
+        self.products = ProductTally()
+
+    def add(self, channels, energies, productCounts, products):
+        self.channels.add(channels)
+        self.energies.add(energies, channels)
+        self.products.add(productCounts, products)
+
+    def merge(self, other):
+        self.channels.merge(other.channels)
+        self.energies.merge(other.energies)
+        self.products.merge(other.products)
+
+    def consume(self, batch):
+        self.add(batch["channel"], batch["energy"], batch["productCounts"], obtainProductCodes(batch["channel"], batch["charges"]))
+
+    def finish(self):
+        pass
+
+    def save(self, path):
+        '''Method that writes the aggregates to a .npz file at path (which is used as given)'''
+        with open(path, "wb") as file:
+            np.savez(file, channels = self.channels.counts, energies = self.energies.counts, energyRange = [self.energies.low, self.energies.high],
+                     products = self.products.products, multiplicities = self.products.multiplicities)
+
+
+def loadAggregates(path):
+    '''Function that reads aggregates saved by RunAggregates.save'''
+    with np.load(path) as saved:
+        low, high = saved["energyRange"].tolist()
+        aggregates = RunAggregates(saved["energies"].shape[1] - 2, low, high)
+        aggregates.channels.counts[:] = saved["channels"]
+        aggregates.energies.counts[:] = saved["energies"]
+        aggregates.products.products[:] = saved["products"]
+        aggregates.products.multiplicities[:] = saved["multiplicities"]
+    return aggregates
+
+def aggregateResultsFile(path, **binning):
+    '''Function that aggregates the readings in a results file one block at a time'''
+    reader = ResultsReader(path)
+    aggregates = RunAggregates(**binning)
+    for number in range(len(reader.blocks)):
+        aggregates.add(reader.readColumn("channel", [number]), reader.readColumn("energy", [number]), reader.readColumn("productCounts", [number]), reader.readColumn("products", [number]))
+    return aggregates
@@ -0,0 +1,300 @@
+# Benchmark suite for the physics, the mathematical helpers and the Monte Carlo study, run headless
+# Every case builds its inputs once, then is timed over repeated calls (the first call is left out, so compiled kernels are warm) and
+# reports its best call as a rate of work per second, so results at different sizes and on different machines read the same way
+#
+#     python benchmarks.py run [--quick] [--select coulomb] [--output benchmarkResults.json]
+#     python benchmarks.py baseline [--quick]
+#     python benchmarks.py compare [benchmarkResults.json] [--baseline benchmarkBaseline.json] [--tolerance 0.25]
+#
+# Results are JSON: the machine they were taken on and, for each case, its size, best time per call, rate and the unit of the rate
+# compare exits with status 1 if any case runs more than the tolerance slower than its baseline, so it can gate a build
+# Rates only compare on the machine they were taken on, so no baseline is kept in the repository: take one with baseline on the machine
+# that gates (and again whenever it changes), before the change being measured
+
+import datetime
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+import kernels
+from constants import *
+from mathematicalMethods import getMagnitude
+from particleArray import ParticleArray
+from particles import Proton
+from coulombSolvers import BarnesHutSolver, DirectSumSolver, NeighbourListSolver
+from neighbourList import NeighbourList
+from spatialHash import SpatialHash
+from collisionChannels import generateEvents
+from monteCarloSimulation import runMonteCarlo, writeReadings
+from resultsFile import ResultsWriter
+from eventStore import EventStoreWriter
+from eventPipeline import obtainReadingColumns
+from physicsEngine import PhysicsEngine, runFullPass
+
+BENCHMARK_VERSION = 1
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarkBaseline.json")
+
+def obtainPoints(count, density = 0.05, seed = 0):
+    '''Function that scatters count points uniformly through a cube sized to hold density points per unit volume'''
+    side = (count / density) ** (1 / 3)
+    return np.random.default_rng(seed).uniform(0, side, (count, 3))
+
+def obtainSpeed(seconds, work):
+    return work / seconds if seconds > 0 else math.inf
+
+def timeCall(function, minimumTime = BENCHMARK_MIN_TIME, minimumRepeats = 3):
+    '''Function that calls function until it has run for minimumTime and at least minimumRepeats times, returning its fastest call in seconds'''
+    # The fastest call is the one least disturbed by the rest of the machine, so it is the steadiest to compare
+    function()
+    best = math.inf
+    repeats = 0
+    started = time.perf_counter()
+    while repeats < minimumRepeats or time.perf_counter() - started < minimumTime:
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+        repeats += 1
+    return best
+
+# Cases, each taking a size and returning the call to time, the work one call does and the unit of work
+
+def benchmarkParticleSteps(count):
+    '''Verlet steps of count particles at once through ParticleArray.verletStep'''
+    store = ParticleArray()
+    store.addMany(obtainPoints(count), np.full((count, 3), 0.01), np.full((count, 3), 0.1), 1, SIMULATED_PROTON_CHARGE, SIMULATED_PROTON_RADIUS)
+    return store.verletStep, count, "particle steps"
+
+def benchmarkPointSteps(count):
+    '''Verlet steps of count particles one at a time, as Point.enablePhysics takes them every frame'''
+    store = ParticleArray()
+    points = [Proton(list(pos), SIMULATED_PROTON_RADIUS, [0, 0, 0.01], [0, 0, 0.1], None, None, store) for pos in obtainPoints(count).tolist()]
+    def step():
+        for point in points:
+            point.enableNewtonianMechanics()
+    return step, count, "particle steps"
+
+def benchmarkCoulomb(solver):
+    def benchmark(count):
+        positions = obtainPoints(count)
+        charges = np.full(count, SIMULATED_PROTON_CHARGE)
+        return lambda: solver().obtainForces(positions, charges), count, "particles"
+    return benchmark
+
+def benchmarkDistanceMatrix(count):
+    '''Every pairwise distance among count points through mathematicalMethods.getMagnitude, as LHCSimulation.obtainDistanceMatrix finds them'''
+    points = obtainPoints(count).tolist()
+    return lambda: [[getMagnitude(first, second) for second in points] for first in points], count * count, "distances"
+
+def benchmarkNeighbourPairs(count):
+    '''Pairs of count points within the Coulomb range, found from scratch with a neighbour list'''
+    positions = obtainPoints(count)
+    def find():
+        neighbours = NeighbourList(COULOMB_INTERACTION_RANGE)
+        neighbours.update(positions)
+        neighbours.obtainPairs(COULOMB_INTERACTION_RANGE)
+    return find, count, "particles"
+
+def benchmarkContactPairs(count):
+    '''Touching pairs of count protons found with a spatial hash'''
+    positions = obtainPoints(count)
+    radii = np.full(count, SIMULATED_PROTON_RADIUS)
+    return lambda: SpatialHash().obtainContactPairs(positions, radii), count, "particles"
+
+def obtainRingProton(engine, speed):
+    '''Function that puts a proton on the booster ring's arc, opposite its accelerator, going round at speed'''
+    centre = engine.bRing.pos
+    proton = Proton([centre[0], centre[1], centre[2] + 31], SIMULATED_PROTON_RADIUS, [0, 0, 0], [0, 0, 0], engine.bRing, engine.collider, engine.store)
+    proton.teleport = True
+    proton.orbitingRing = True
+    proton.speed = speed
+    proton.velocity = [speed, 0, 0]
+    return proton
+
+def benchmarkRingTicks(speed):
+    '''One turn of the booster ring at speed, a tick at a time through Proton.numericalCircularMotion'''
+    proton = obtainRingProton(PhysicsEngine(), speed)
+    ticks = math.ceil(2 * math.pi * 31 * RATE_OF_CALCULATIONS / speed)
+    def turn():
+        for tick in range(ticks):
+            proton.numericalCircularMotion(proton.boosterRing.pos, 31, "c")
+    return turn, 1, "turns"
+
+def benchmarkRingTurns(turns):
+    '''turns turns of the booster ring fast-forwarded through Proton.advanceRing, accelerator passes included'''
+    proton = obtainRingProton(PhysicsEngine(), 1000)
+    def advance():
+        proton.speed = 1000
+        proton.velocity = [1000, 0, 0]
+        proton.advanceRing(turns = turns)
+    return advance, turns, "turns"
+
+def benchmarkFullPass(eventDriven):
+    '''A whole reading, from the gas pump to a collision, with frames ticked or jumped between events'''
+    def benchmark(size):
+        run = lambda: runFullPass(eventDriven = eventDriven)
+        frames = run().frames
+        return run, frames, "frames"
+    return benchmark
+
+def benchmarkGenerateEvents(count):
+    '''Readings drawn by collisionChannels.generateEvents, the generator every Monte Carlo shard uses'''
+    rng = np.random.default_rng(0)
+    return lambda: generateEvents(rng, count), count, "events"
+
+def benchmarkMonteCarlo(count):
+    '''The whole Monte Carlo study in one process, shards merged and Higgs probabilities found'''
+    return lambda: runMonteCarlo(count, seed = 0, workers = 1, shards = 4), count, "events"
+
+def obtainReadings(count):
+    results = runMonteCarlo(count, seed = 0, workers = 1, shards = 1)
+    results["readingNumber"] = 1 + np.arange(count)
+    results["channel"] = results["collisionTypes"]
+    results["energy"] = results["values"]
+    results["higgsProbability"] = results["higgsProbabilities"]
+    return results
+
+def benchmarkOutput(write):
+    '''Readings written by write(readings, path) to a temporary directory, measured in megabytes of output'''
+    def benchmark(count):
+        readings = obtainReadings(count)
+        directory = tempfile.TemporaryDirectory() # Removed once the call made below is dropped
+        path = os.path.join(directory.name, "output")
+        write(readings, path)
+        def run():
+            write(readings, os.path.join(directory.name, "output"))
+        return run, obtainSize(path) / 10 ** 6, "MB"
+    return benchmark
+
+def obtainSize(path):
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+def writeResultsFile(readings, path):
+    with ResultsWriter(path) as writer:
+        writer.write(obtainReadingColumns(readings))
+
+def writeEventStore(readings, path):
+    with EventStoreWriter(path) as writer:
+        writer.write(obtainReadingColumns(readings))
+
+# Name, case and sizes, in full and with --quick
+BENCHMARKS = [
+    ("particleSteps", benchmarkParticleSteps, [100, 1000, 10000, 100000], [1000, 100000]),
+    ("pointSteps", benchmarkPointSteps, [10, 100, 1000], [100]),
+    ("coulomb/directSum", benchmarkCoulomb(DirectSumSolver), [100, 1000, 4000], [1000]),
+    ("coulomb/barnesHut", benchmarkCoulomb(lambda: BarnesHutSolver(cutoff = COULOMB_INTERACTION_RANGE)), [1000, 10000], [1000]),
+    ("coulomb/neighbourList", benchmarkCoulomb(lambda: NeighbourListSolver(COULOMB_INTERACTION_RANGE)), [1000, 10000, 100000], [10000]),
+    ("distances/getMagnitude", benchmarkDistanceMatrix, [10, 100, 300], [100]),
+    ("distances/neighbourList", benchmarkNeighbourPairs, [1000, 10000, 100000], [10000]),
+    ("distances/spatialHash", benchmarkContactPairs, [1000, 10000, 100000], [10000]),
+    ("ring/ticked", benchmarkRingTicks, [1000, 10000], [1000]),
+    ("ring/fastForward", benchmarkRingTurns, [1, 1000], [1000]),
+    ("fullPass/ticked", benchmarkFullPass(False), [1], []),
+    ("fullPass/eventDriven", benchmarkFullPass(True), [1], [1]),
+    ("monteCarlo/generateEvents", benchmarkGenerateEvents, [10000, 1000000], [1000000]),
+    ("monteCarlo/study", benchmarkMonteCarlo, [1000000], [100000]),
+    ("output/resultsFile", benchmarkOutput(writeResultsFile), [1000000], [100000]),
+    ("output/eventStore", benchmarkOutput(writeEventStore), [1000000], [100000]),
+    ("output/text", benchmarkOutput(writeReadings), [100000], [10000])]
+
+def obtainMachine():
+    '''Function that describes what the benchmarks ran on, so results from different machines are not mistaken for a regression'''
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "compiledKernels": kernels.COMPILED,
+        "integrator": INTEGRATOR}
+
+def runBenchmarks(quick = False, select = None, report = print):
+    '''Function that runs every case (those whose name contains select, if given) at its sizes, returning the results as JSON can hold them'''
+    results = {}
+    for name, benchmark, sizes, quickSizes in BENCHMARKS:
+        if select is not None and select not in name:
+            continue
+        for size in (quickSizes if quick else sizes):
+            function, work, unit = benchmark(size)
+            seconds = timeCall(function)
+            key = f"{name}/{size}"
+            results[key] = {"size": size, "seconds": seconds, "rate": obtainSpeed(seconds, work), "unit": f"{unit}/s"}
+            if report is not None:
+                report(f"{key:<36}{results[key]['rate']:>16.4g} {results[key]['unit']:<20}{seconds * 1000:>12.3f} ms")
+    return {
+        "version": BENCHMARK_VERSION,
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec = "seconds"),
+        "quick": quick,
+        "machine": obtainMachine(),
+        "results": results}
+
+def saveResults(results, path):
+    with open(path, "w") as file:
+        json.dump(results, file, indent = 2)
+        file.write("\n")
+
+def loadResults(path):
+    with open(path) as file:
+        results = json.load(file)
+    if results["version"] > BENCHMARK_VERSION:
+        raise ValueError(f"{path} is version {results['version']}, newer than this reader")
+    return results
+
+def compareResults(current, baseline, tolerance = BENCHMARK_TOLERANCE):
+    '''Function that sets each case's rate against its baseline, returning rows of name, baseline rate, current rate, ratio and verdict'''
+    # A case is a regression when its rate falls below (1 - tolerance) of the baseline's, cases missing from either side are listed but never fail
+    rows = []
+    for name in sorted(set(current["results"]) | set(baseline["results"])):
+        now = current["results"].get(name)
+        before = baseline["results"].get(name)
+        if now is None or before is None:
+            rows.append((name, before and before["rate"], now and now["rate"], None, "missing" if now is None else "new"))
+            continue
+        ratio = now["rate"] / before["rate"]
+        verdict = "slower" if ratio < 1 - tolerance else "faster" if ratio > 1 / (1 - tolerance) else "same"
+        rows.append((name, before["rate"], now["rate"], ratio, verdict))
+    return rows
+
+VALUE_OPTIONS = ["--select", "--output", "--baseline", "--tolerance"]
+
+def formatNumber(value):
+    return "-" if value is None else f"{value:.4g}"
+
+def obtainOption(name, default = None):
+    '''Function that reads the value given after --name on the command line'''
+    if f"--{name}" in sys.argv:
+        return sys.argv[sys.argv.index(f"--{name}") + 1]
+    return default
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "run"
+    quick = "--quick" in sys.argv
+    if command in ["run", "baseline"]:
+        results = runBenchmarks(quick, obtainOption("select"))
+        path = BASELINE_PATH if command == "baseline" else obtainOption("output", "benchmarkResults.json")
+        saveResults(results, path)
+        print(f"Saved to {path}")
+    elif command == "compare":
+        arguments = [argument for number, argument in enumerate(sys.argv[2:], 2) if not argument.startswith("--") and sys.argv[number - 1] not in VALUE_OPTIONS]
+        current = loadResults(arguments[0] if arguments else "benchmarkResults.json")
+        baselinePath = obtainOption("baseline", BASELINE_PATH)
+        if not os.path.exists(baselinePath):
+            sys.exit(f"No baseline at {baselinePath}, take one on this machine with python benchmarks.py baseline")
+        baseline = loadResults(baselinePath)
+        if current["machine"] != baseline["machine"]:
+            print("Warning: the baseline was taken on a different machine or setup")
+        rows = compareResults(current, baseline, float(obtainOption("tolerance", BENCHMARK_TOLERANCE)))
+        for name, before, now, ratio, verdict in rows:
+            print(f"{name:<36}{formatNumber(before):>16}{formatNumber(now):>16}{formatNumber(ratio):>10}  {verdict}")
+        slower = [row[0] for row in rows if row[4] == "slower"]
+        if slower:
+            print(f"Slower than the baseline: {', '.join(slower)}")
+            sys.exit(1)
+        print("No regressions")
+    else:
+        sys.exit(f"Unknown command {command}, expected run, baseline or compare")
@@ -0,0 +1,255 @@
+# Bunches of weighted macro-particles, so a real fill of ~1e11 protons can be carried by ~1e5 rows of a ParticleArray
+# Each row stands for `weight` protons: its mass and charge are scaled by the weight, so fields give it the same acceleration as one proton
+# Every stage (source chamber, LINAC, booster ring, connection tube, collider) is applied to the whole bunch with array masks
+
+import math
+import numpy as np
+from constants import *
+from mathematicalMethods import *
+from particleArray import ParticleArray, storeColumn
+from integrators import VerletIntegrator
+from coulombSolvers import NeighbourListSolver
+
+# Ring each row is on, so the phase is recovered from the position whenever a row joins an arc
+NO_RING = 0
+BOOSTER_RING = 1
+COLLIDER_RING = 2
+
+# Columns Bunch.moveThroughRings reads for the rows it moves, and those it also writes back
+RING_READ_COLUMNS = ["weight", "mass"]
+RING_WRITTEN_COLUMNS = ["pos", "velocity", "acceleration", "speed", "phase", "ring", "boosted", "orbitingRing", "passingThroughConnectionTube", "goingThroughCollider"]
+
+def obtainTwoDAngles(centre, pos):
+    '''Function that finds getTwoDAngle for many positions at once, keeping its answer for points straight above or below the centre'''
+    deltaZ = pos[:, 2] - centre[2]
+    deltaX = pos[:, 0] - centre[0]
+    angle = np.arctan2(deltaZ, deltaX) % (2 * math.pi)
+    return np.where(deltaX == 0, np.where(deltaZ >= 0, 3 * math.pi / 2, math.pi / 2), angle)
+
+def obtainInBox(pos, section):
+    '''Function that says which positions lie inside an accelerator cuboid in x and z, the bounds Proton tests for its gaps'''
+    return (np.abs(pos[:, 0] - section.pos[0]) <= section.size[0] / 2) & (np.abs(pos[:, 2] - section.pos[2]) <= section.size[2] / 2)
+
+
+class MacroParticle:
+    '''View of one row of a bunch, enough to stand in for a proton where only its position is read (e.g. PhysicsEngine.collideProtons)'''
+    def __init__(self, bunch, index):
+        self.bunch = bunch
+        self.store = bunch.store
+        self.index = index
+
+    pos = storeColumn("pos")
+    velocity = storeColumn("velocity")
+    mass = storeColumn("mass")
+    weight = storeColumn("weight")
+
+
+class Bunch:
+    def __init__(self, protons, macroParticles, boosterRing, collider, endBoostZCord = -131):
+        self.protons = protons
+        self.macroParticles = macroParticles
+        self.weight = protons / macroParticles # Protons each row stands for
+        self.boosterRing = boosterRing
+        self.collider = collider
+        self.endBoostZCord = endBoostZCord # -69 sends the bunch clockwise round the collider, -131 anticlockwise
+        self.ionised = False # Hydrogen until the source chamber is sealed
+        self.store = ParticleArray(macroParticles)
+        self.neighbourSolver = NeighbourListSolver(COULOMB_INTERACTION_RANGE) if COULOMB_INTERACTION_RANGE is not None else None # Kept for this bunch's rows alone
+        self.store.addColumn("weight")
+        self.store.addColumn("speed")
+        self.store.addColumn("phase")
+        self.store.addColumn("ring", dtype = int)
+        # The flags Proton keeps as attributes, one per row
+        for name in ["teleport", "orbitingRing", "boosted", "passingThroughConnectionTube", "goingThroughCollider"]:
+            self.store.addColumn(name, dtype = bool)
+
+    def __len__(self):
+        return self.store.count
+
+    def inject(self, pos, velocity):
+        '''Method that adds one macro-particle per row of pos, moving by velocity per tick like a freshly spawned hydrogen atom'''
+        rows = self.store.addMany(pos, velocity, [0, 0, 0], self.weight * SIMULATED_PROTON_MASS, self.weight * SIMULATED_PROTON_CHARGE, SIMULATED_PROTON_RADIUS)
+        self.store.weight[rows] = self.weight
+        return rows
+
+    def seal(self, chamber):
+        '''Method that drops the rows left behind the chamber's wall and turns the rest into protons at rest, as PhysicsEngine.sealChamber does'''
+        self.store.detach()
+        count = self.store.count
+        wallBottom = chamber.wall.pos[2] - chamber.wall.height / 2
+        self.store.compact((self.store.pos[:count, 2] + self.store.radius[:count]) <= wallBottom)
+        count = self.store.count
+        self.store.oldPos[:count] = self.store.pos[:count]
+        self.store.velocity[:count] = 0
+        self.store.acceleration[:count] = 0
+        self.store.momentum[:count] = 0
+        self.store.force[:count] = 0
+        self.ionised = True
+
+    def activate(self, LINAC):
+        '''Method that gives every row the LINAC's pull for its distance from the end terminal, scaled by its weight'''
+        self.store.detach()
+        count = self.store.count
+        distanceFromEndTerminal = LINAC.endTerminalZCord - self.store.pos[:count, 2]
+        self.store.force[:count] = 0
+        self.store.force[:count, 2] = self.store.weight[:count] * LINAC.obtainElectricField(distanceFromEndTerminal)
+
+    def update(self, engine):
+        '''Method that advances the whole bunch by one frame, the same order PhysicsEngine.update follows for single points'''
+        store = self.store
+        store.detach()
+        verlet = isinstance(engine.integrator, VerletIntegrator)
+        if verlet:
+            engine.integrator.advance(store, store.integrated)
+        else:
+            engine.integrator.advance(store, store.integrated, lambda rows, pos, velocity: self.obtainIntegratedForces(engine, rows, pos))
+        teleported = np.flatnonzero(store.teleport[:store.count])
+        if len(teleported):
+            self.moveThroughRings(teleported)
+        self.applyStageRules(engine.LINAC)
+
+        if not engine.sourceChamber.activated and store.count:
+            # An adaptive integrator already felt these pushes at every stage of its steps (see obtainIntegratedForces)
+            rows = np.arange(store.count) if verlet else np.flatnonzero(~store.integrated[:store.count])
+            if BUNCH_SPACE_CHARGE and len(rows):
+                forces = engine.obtainCoulombForces(store, np.arange(store.count), rows, store.pos[rows], self.neighbourSolver)
+                store.pos[rows] += forces / store.mass[rows, None]
+            if len(rows):
+                engine.applyCoulombWallForce(store, rows, engine.sourceChamber)
+
+    def obtainIntegratedForces(self, engine, rows, pos):
+        '''Method that finds the forces on integrated rows at trial positions, as PhysicsEngine.obtainIntegratedForces does for points'''
+        # In the source chamber: the force column, the space charge (if on) and the nozzle and wall pushes, scaled from per frame pushes to forces
+        # After activation: the LINAC's field at each trial position, scaled by the row's weight as activate does, until the row leaves the LINAC
+        store = self.store
+        forces = store.force[rows].copy()
+        if not engine.sourceChamber.activated:
+            if BUNCH_SPACE_CHARGE:
+                forces += engine.obtainCoulombForces(store, np.arange(store.count), rows, pos, self.neighbourSolver) * RATE_OF_CALCULATIONS ** 2
+            forces[:, 2] += engine.obtainCoulombWallPush(store, rows, engine.sourceChamber, pos) * store.mass[rows] * RATE_OF_CALCULATIONS ** 2
+        elif self.ionised:
+            forces[:, 2] = store.weight[rows] * engine.LINAC.obtainElectricField(engine.LINAC.endTerminalZCord - pos[:, 2])
+        return forces
+
+    def applyStageRules(self, LINAC):
+        '''Method that drops rows that have drifted out of the gas pump and hands rows leaving the LINAC to the ring logic'''
+        store = self.store
+        store.compact(store.pos[:store.count, 2] <= 18.5)
+        if self.ionised:
+            leaving = store.integrated[:store.count] & (store.pos[:store.count, 2] < LINAC.endTerminalZCord)
+            store.teleport[:store.count] |= leaving
+            store.integrated[:store.count] &= ~leaving
+
+    def moveThroughRings(self, rows):
+        '''Method that applies one tick of Proton.enablePhysics's ring logic to the rows, each branch to every row that takes it'''
+        # The branches are all chosen from the state at the start of the tick, so a row moves at most once
+        # The rows' columns are read once and written back once, each branch working on a mask of them: gathering a column for every
+        # branch's rows cost more than the branches' own arithmetic
+        store = self.store
+        if len(rows) == store.count:
+            rows = slice(0, store.count) # Every row, as for most of a pass, so the columns are worked on in place rather than copied out
+        rowColumns = {name: getattr(store, name)[rows] for name in RING_READ_COLUMNS + RING_WRITTEN_COLUMNS}
+        velocity = rowColumns["velocity"]
+        speed = rowColumns["speed"]
+        speed[:] = np.sqrt(np.einsum("ij,ij->i", velocity, velocity))
+        boosted = rowColumns["boosted"]
+        boosted[:] = speed >= 2500
+        inCollider = rowColumns["goingThroughCollider"].copy()
+        inTube = rowColumns["passingThroughConnectionTube"].copy()
+        atTube = np.abs(rowColumns["pos"][:, 2] - self.endBoostZCord) < 5
+
+        tube = boosted & ~inCollider & inTube
+        entering = boosted & ~inCollider & ~inTube & atTube
+        booster = ~boosted | (~inCollider & ~inTube & ~atTube)
+        collider = boosted & inCollider
+
+        self.moveThroughConnectionTube(rowColumns, tube)
+        rowColumns["passingThroughConnectionTube"][entering] = True
+        rowColumns["pos"][entering] = [-31, 8, self.endBoostZCord]
+        self.moveThroughBoosterRing(rowColumns, booster)
+        self.moveThroughCollider(rowColumns, collider)
+        if not isinstance(rows, slice):
+            for name in RING_WRITTEN_COLUMNS:
+                getattr(store, name)[rows] = rowColumns[name]
+
+    def moveThroughConnectionTube(self, rowColumns, rows):
+        '''Method that moves rows along the connection tube, handing them to the collider at its end (Proton.enterMainCollider)'''
+        if not rows.any():
+            return
+        pos = rowColumns["pos"]
+        xDisplacement = rowColumns["speed"][rows] * TIME_PERIOD
+        if self.endBoostZCord == -69:
+            newX = pos[rows, 0] + xDisplacement
+            arrived = newX > 100
+        else:
+            newX = pos[rows, 0] - xDisplacement
+            arrived = newX < -134
+        rows = np.flatnonzero(rows)
+        pos[rows[~arrived], 0] = newX[~arrived]
+        rowColumns["passingThroughConnectionTube"][rows[arrived]] = False
+        rowColumns["goingThroughCollider"][rows[arrived]] = True
+
+    def moveThroughBoosterRing(self, rowColumns, rows):
+        '''Method that lines rows up with the booster ring, then kicks them in its accelerator and carries them round it elsewhere'''
+        if not rows.any():
+            return
+        pos = rowColumns["pos"]
+        inAccelerator = obtainInBox(pos, self.boosterRing.electricAccelerator)
+        orbiting = rows & rowColumns["orbitingRing"]
+        adjusting = rows & ~orbiting & (pos[:, 1] < 6.5) & (pos[:, 0] > -0.004)
+
+        # Proton.adjustAxesForBoosterRing, whose y and x conditions always hold for the rows that reach it
+        pos[adjusting] += [-0.004 / 7, 1.5 / 7, -5 / 7]
+        rowColumns["orbitingRing"] |= rows & ~orbiting & ~adjusting
+
+        self.applyGapKick(rowColumns, orbiting & inAccelerator, 2, self.boosterRing.obtainSynchrotronElectricField(), False)
+        self.moveAlongArc(rowColumns, orbiting & ~inAccelerator, BOOSTER_RING, self.boosterRing.pos, 31, -1)
+
+    def moveThroughCollider(self, rowColumns, rows):
+        '''Method that kicks rows in the collider's accelerator and carries them round the collider elsewhere'''
+        if not rows.any():
+            return
+        inAccelerator = obtainInBox(rowColumns["pos"], self.collider.electricAccelerator)
+        self.applyGapKick(rowColumns, rows & inAccelerator, 0, self.collider.obtainColliderElectricField(), self.endBoostZCord != -69)
+        if self.endBoostZCord == -69:
+            self.moveAlongArc(rowColumns, rows & ~inAccelerator, COLLIDER_RING, self.collider.pos, 142, -1)
+        else:
+            self.moveAlongArc(rowColumns, rows & ~inAccelerator, COLLIDER_RING, self.collider.pos, 138, 1)
+
+    def applyGapKick(self, rowColumns, rows, axis, eForce, forwards):
+        '''Method that moves rows through an accelerator gap along one axis, the same update as Proton's gap branches'''
+        if not rows.any():
+            return
+        rows = np.flatnonzero(rows)
+        eAcceleration = eForce * rowColumns["weight"][rows] / rowColumns["mass"][rows]
+        eSpeed = -rowColumns["speed"][rows] + eAcceleration * TIME_PERIOD
+        displacement = eSpeed * TIME_PERIOD
+        rowColumns["pos"][rows, axis] += np.abs(displacement) if forwards else displacement
+        rowColumns["acceleration"][rows] = 0
+        rowColumns["acceleration"][rows, axis] = eAcceleration
+        rowColumns["velocity"][rows] = 0
+        rowColumns["velocity"][rows, axis] = eSpeed
+        rowColumns["ring"][rows] = NO_RING # Off the arc, so the phase is recovered from the position on rejoining it
+
+    def moveAlongArc(self, rowColumns, rows, ring, centre, radius, direction):
+        '''Method that steps rows round an orbit by their angular velocity, as Proton.numericalCircularMotion does'''
+        if not rows.any():
+            return
+        rows = slice(None) if rows.all() else np.flatnonzero(rows)
+        pos, phase, rowRing = rowColumns["pos"], rowColumns["phase"], rowColumns["ring"]
+        joining = rowRing[rows] != ring
+        if joining.any():
+            joining = np.flatnonzero(joining) if isinstance(rows, slice) else rows[joining]
+            phase[joining] = obtainTwoDAngles(centre, pos[joining])
+        rowRing[rows] = ring
+        changeInAngle = direction * (rowColumns["speed"][rows] / radius) / RATE_OF_CALCULATIONS
+        rowPhase = (phase[rows] + changeInAngle) % (2 * math.pi)
+        phase[rows] = rowPhase
+        pos[rows, 0] = centre[0] + radius * np.cos(rowPhase)
+        pos[rows, 1] = centre[1]
+        pos[rows, 2] = centre[2] + radius * np.sin(rowPhase)
+
+    def isArmed(self):
+        '''Method that says whether any row is fast enough in the collider to collide, the condition PhysicsEngine.checkCollisionTrigger uses'''
+        count = self.store.count
+        return bool(np.any(self.store.goingThroughCollider[:count] & (self.store.speed[:count] > 3500)))
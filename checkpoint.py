@@ -0,0 +1,165 @@
+# Checkpoints of a PhysicsEngine's whole state, so a long run can resume after a crash and a saved state (e.g. just before a collision)
+# can be reloaded instead of recomputed
+#
+# Layout: MAGIC, the version and the header's length (4 and 8 bytes, little endian), the JSON header, then the used rows of every store
+# column end to end, each starting on an 8 byte boundary
+# The header holds the engine's counters, flags and statistics, each point's type, row and attributes, each bunch's attributes, the
+# state of the generator collisions draw from (see PhysicsEngine.random) and where every column's bytes are
+
+import json
+import struct
+import numpy as np
+import particles
+from bunch import Bunch
+from constants import *
+from particleArray import ParticleArray
+from physicsEngine import MODEL_ATTRIBUTES, PhysicsEngine
+
+MAGIC = b"LHCS"
+CHECKPOINT_VERSION = 1
+
+SKIPPED_ATTRIBUTES = ["store", "object", "index"] + list(MODEL_ATTRIBUTES)
+
+def obtainPlainValue(value):
+    '''Function that turns numpy values (and lists or dicts of them) into plain Python ones that JSON can hold'''
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [obtainPlainValue(item) for item in value]
+    if isinstance(value, dict):
+        return {key: obtainPlainValue(item) for key, item in value.items()}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Cannot checkpoint a {type(value).__name__}")
+
+def obtainAttributes(owner):
+    '''Function that lists an object's own attributes, leaving out its store and scene node and naming the accelerator models it refers to'''
+    attributes = {name: obtainPlainValue(value) for name, value in vars(owner).items() if name not in SKIPPED_ATTRIBUTES}
+    attributes["models"] = [name for name in MODEL_ATTRIBUTES if name in vars(owner)]
+    return attributes
+
+def restoreAttributes(owner, attributes, engine):
+    owner.__dict__.update(attributes)
+    for name in owner.__dict__.pop("models"):
+        owner.__dict__[name] = getattr(engine, MODEL_ATTRIBUTES[name])
+
+
+class CheckpointWriter:
+    '''Class that gathers the columns a checkpoint's header points to, to be written after it'''
+    def __init__(self):
+        self.arrays = []
+        self.length = 0
+
+    def addStore(self, store):
+        '''Method that queues the used rows of every column of a store, returning the store's header entry'''
+        columns = {}
+        for name in store.columnNames():
+            column = np.ascontiguousarray(getattr(store, name)[:store.count])
+            columns[name] = {"dtype": column.dtype.str, "shape": list(column.shape), "offset": self.length}
+            self.arrays.append(column)
+            self.length += -(-column.nbytes // 8) * 8
+        return {"count": store.count, "capacity": store.capacity, "extraColumns": store.extraColumnNames, "columns": columns}
+
+    def write(self, file):
+        for array in self.arrays:
+            data = array.tobytes()
+            file.write(data)
+            file.write(bytes(-len(data) % 8))
+
+
+def saveCheckpoint(engine, path):
+    '''Function that writes everything a PhysicsEngine needs to carry on from this frame'''
+    writer = CheckpointWriter()
+    randomState = engine.random.getstate()
+    header = {
+        "engine": {
+            "frames": engine.frames,
+            "collided": engine.collided,
+            "ableToCollide": engine.ableToCollide,
+            "readingNumber": engine.readingNumber,
+            "lastReading": obtainPlainValue(engine.lastReading),
+            "higgsStatistics": [engine.higgsStatistics.count, engine.higgsStatistics.mean, engine.higgsStatistics.squares],
+            "sealed": engine.sourceChamber.sealed,
+            "activated": engine.sourceChamber.activated,
+            "colliderStarted": engine.collider.started},
+        "integrator": {"type": type(engine.integrator).__name__, "attributes": obtainAttributes(engine.integrator)},
+        "store": writer.addStore(engine.store),
+        "points": [{"type": type(point).__name__, "row": point.index, "attributes": obtainAttributes(point)} for point in engine.points],
+        "bunches": [{"attributes": obtainAttributes(bunch), "store": writer.addStore(bunch.store)} for bunch in engine.bunches],
+        "random": [randomState[0], list(randomState[1]), randomState[2]]}
+    encodedHeader = json.dumps(header).encode()
+    encodedHeader += b" " * (-(len(MAGIC) + 12 + len(encodedHeader)) % 8) # So the columns start on an 8 byte boundary
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<IQ", CHECKPOINT_VERSION, len(encodedHeader)))
+        file.write(encodedHeader)
+        writer.write(file)
+
+def restoreStore(store, entry, data):
+    '''Function that fills a store with the rows a checkpoint saved, leaving every row without an owner'''
+    store.clear()
+    while store.capacity < max(entry["capacity"], 1):
+        store.grow()
+    for name in entry["extraColumns"]:
+        column = entry["columns"][name]
+        store.addColumn(name, tuple(column["shape"][1:]), np.dtype(column["dtype"]))
+    count = entry["count"]
+    for name in store.columnNames():
+        getattr(store, name)[:count] = 0 # Columns the checkpoint has no record of, e.g. added by a different integrator
+    for name, column in entry["columns"].items():
+        getattr(store, name)[:count] = np.frombuffer(data, dtype = column["dtype"], count = int(np.prod(column["shape"])), offset = column["offset"]).reshape(column["shape"])
+    store.owners = [None] * count
+    store.count = count
+    return store
+
+def loadCheckpoint(path, engine = None):
+    '''Function that puts an engine (a new headless one by default) into the state a checkpoint saved, returning it'''
+    # The engine is reset first, so a renderer observing it hears systemReset and then pointAdded and bunchAdded for what is restored
+    with open(path, "rb") as file:
+        contents = file.read()
+    if contents[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a checkpoint")
+    version, headerLength = struct.unpack_from("<IQ", contents, len(MAGIC))
+    if version > CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is version {version}, newer than this reader")
+    headerStart = len(MAGIC) + 12
+    header = json.loads(contents[headerStart:headerStart + headerLength])
+    data = memoryview(contents)[headerStart + headerLength:]
+
+    if engine is None:
+        engine = PhysicsEngine()
+    if type(engine.integrator).__name__ != header["integrator"]["type"]:
+        raise ValueError(f"{path} was saved with the {header['integrator']['type']}, not the {type(engine.integrator).__name__}")
+    engine.resetSystem()
+
+    state = header["engine"]
+    engine.frames = state["frames"]
+    engine.collided = state["collided"]
+    engine.ableToCollide = state["ableToCollide"]
+    engine.readingNumber = state["readingNumber"]
+    engine.lastReading = state["lastReading"]
+    engine.higgsStatistics.count, engine.higgsStatistics.mean, engine.higgsStatistics.squares = state["higgsStatistics"]
+    engine.sourceChamber.sealed = state["sealed"]
+    engine.sourceChamber.activated = state["activated"]
+    engine.collider.started = state["colliderStarted"]
+    engine.integrator.__dict__.update(header["integrator"]["attributes"])
+
+    restoreStore(engine.store, header["store"], data)
+    for entry in header["points"]:
+        pointType = getattr(particles, entry["type"])
+        point = pointType.__new__(pointType)
+        restoreAttributes(point, entry["attributes"], engine)
+        point.store = engine.store
+        point.object = None
+        point.index = entry["row"]
+        engine.store.owners[point.index] = point
+        engine.addPoint(point)
+    for entry in header["bunches"]:
+        bunch = Bunch.__new__(Bunch)
+        restoreAttributes(bunch, entry["attributes"], engine)
+        bunch.store = restoreStore(ParticleArray(), entry["store"], data)
+        engine.addBunch(bunch)
+
+    version, state, gaussNext = header["random"]
+    engine.random.setstate((version, tuple(state), gaussNext))
+    return engine
@@ -0,0 +1,93 @@
+# Table-driven classification of collision readings, shared by PhysicsEngine.collideProtons and the Monte Carlo study
+# Every rest mass energy band maps to one channel, so whole arrays of energies are classified by a single np.searchsorted
+
+import numpy as np
+from constants import *
+
+POSSIBILITIES = ["Elastic Scattering", "Inelastic Scattering", "Deep Inelastic Scattering", "Gluon-Gluon Fusion", "Higgs Production", "Quark-Antiquark Annihilation", "Jets Formation", "Parton-Parton Scattering", "Resonance Production"]
+CHARGES = ["+", "-", "0"]
+ENERGY_STEPS = 100000 # Rest mass energies are drawn from 0.1 to 10000.0 GeV in steps of 0.1 GeV
+
+def after(energy):
+    '''Function that finds the next float above an energy, so a band that includes its top end can be written by where the next band starts'''
+    return np.nextafter(energy, np.inf)
+
+# Lowest energy of each band and its channel (index into POSSIBILITIES), each band running up to where the next one starts
+# The gaps between the named bands (e.g. 5.0-10.0 and 30-80 GeV) are bands of their own
+CHANNEL_TABLE = [
+    (-np.inf, 0), # Elastic Scattering up to 2.0 GeV
+    (after(2.0), 7),
+    (2.1, 8), # Resonance Production
+    (after(5.0), 7), # Parton-Parton Scattering below 10 GeV
+    (10.0, 2), # Deep Inelastic Scattering
+    (20.1, 6), # Jets Formation
+    (after(30.0), 2),
+    (80.1, 5), # Quark-Antiquark Annihilation
+    (after(100.0), 2),
+    (100.1, 3), # Gluon-Gluon Fusion
+    (124.0, 4), # Higgs Production
+    (after(126.0), 3),
+    (after(130.0), 2),
+    (after(500.0), 1), # Inelastic Scattering
+    (after(1000.0), 7)] # Parton-Parton Scattering above 1000 GeV
+CHANNEL_EDGES = np.array([edge for edge, channel in CHANNEL_TABLE])
+CHANNELS = np.array([channel for edge, channel in CHANNEL_TABLE], dtype = np.int8)
+PRODUCT_COUNTS = np.array([2, 6, 4, 2, 8, 3, 2, 2, 4], dtype = np.int8) # Products each channel gives
+
+def obtainCollisionTypes(values):
+    '''Function that finds the channel of every rest mass energy in one pass over the table'''
+    return CHANNELS[np.searchsorted(CHANNEL_EDGES, values, side = "right") - 1]
+
+def obtainCollisionType(value):
+    return int(obtainCollisionTypes(value))
+
+# Channel of every energy the generator can draw, indexed by the energy in tenths of a GeV
+CHANNEL_LOOKUP = obtainCollisionTypes(np.arange(ENERGY_STEPS + 1) / 10)
+
+def obtainProducts(collisionType, pionCharge, kaonCharge):
+    '''Function that lists the products of a channel, charges being indices into CHARGES'''
+    pion = "Pion " + CHARGES[pionCharge]
+    kaon = "Kaon " + CHARGES[kaonCharge]
+    products = [
+        ["Proton", "Proton"],
+        ["Pion +", "Pion -", "Pion 0", "Kaon +", "Kaon -", "Kaon 0"],
+        [pion, kaon, "Neutrino", "Lepton"],
+        ["Top Quark", "Antitop Quark"],
+        ["Higgs Boson", "Top Quark", "Antitop Quark", "Photon", "Z Boson", "W Boson", "Bottom Quark", "Tau Lepton"],
+        ["W + Boson", "W - Boson", "Z 0 Boson"],
+        ["Pion Jets", "Kaon Jets"],
+        ["Baryon Jet", "Meson Jet"],
+        ["Baryon", "Neutron", "Proton", pion]]
+    return products[collisionType]
+
+# Every product name a reading can list, and each channel's products for every pion and kaon charge as codes into it (padded to the longest)
+PRODUCT_NAMES = []
+PRODUCT_CODES = np.zeros((len(POSSIBILITIES), len(CHARGES), len(CHARGES), PRODUCT_COUNTS.max()), dtype = np.uint8)
+for collisionType in range(len(POSSIBILITIES)):
+    for pionCharge in range(len(CHARGES)):
+        for kaonCharge in range(len(CHARGES)):
+            for number, product in enumerate(obtainProducts(collisionType, pionCharge, kaonCharge)):
+                if product not in PRODUCT_NAMES:
+                    PRODUCT_NAMES.append(product)
+                PRODUCT_CODES[collisionType, pionCharge, kaonCharge, number] = PRODUCT_NAMES.index(product)
+
+def obtainProductCodes(collisionTypes, charges):
+    '''Function that lists the products of a batch of readings end to end, as codes into PRODUCT_NAMES'''
+    padded = PRODUCT_CODES[collisionTypes, charges[:, 0], charges[:, 1]]
+    return padded[np.arange(padded.shape[1]) < PRODUCT_COUNTS[collisionTypes][:, None]]
+
+def drawEvents(rng, count):
+    '''Function that draws a batch of readings' energies, as whole tenths of a GeV, and their pion and kaon charges'''
+    tenths = rng.integers(1, ENERGY_STEPS + 1, count)
+    charges = rng.integers(0, len(CHARGES), (count, 2), dtype = np.int8) # Pion and kaon charge of every reading, whether its products use them or not
+    return tenths, charges
+
+def classifyTenths(tenths):
+    '''Function that finds the channels of energies given in whole tenths of a GeV, read straight from CHANNEL_LOOKUP'''
+    return CHANNEL_LOOKUP[tenths]
+
+def generateEvents(rng, count):
+    '''Function that draws a batch of readings at once, returning their energies, channels, product counts and pion and kaon charges'''
+    tenths, charges = drawEvents(rng, count)
+    collisionTypes = classifyTenths(tenths)
+    return tenths / 10, collisionTypes, PRODUCT_COUNTS[collisionTypes], charges
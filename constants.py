@@ -5,6 +5,39 @@ import sys
 # Configuration
 RATE_OF_CALCULATIONS = 200 # How fast the LHCSimulation can run, Time Period = 1 / RATE_OF_CALCULATIONS
 TIME_PERIOD = 1 / RATE_OF_CALCULATIONS
+COULOMB_INTERACTION_RANGE = 4 # Points further apart than this do not repel, None lets every pair interact
+COULOMB_OPENING_ANGLE = 0.5 # Barnes-Hut opening angle (node width / distance) below which a node is treated as one charge
+COULOMB_DIRECT_SUM_LIMIT = 5000 # Largest number of points whose Coulomb forces are summed exactly, above it the octree is used
+COULOMB_BLOCK_MEMORY = 8 * 1024 * 1024 # Bytes of temporaries each direct-sum tile may use
+NEIGHBOUR_LIST_SKIN = 1 # Extra distance a neighbour list covers past its cutoff, it is rebuilt once a point moves half of this
+COLLISION_TRIGGER_DISTANCE = 30 # Protons in the collider closer than this collide
+KERNEL_BACKEND = "auto" # "auto" compiles the hot kernels with Numba when it is installed, "numba" insists on it, "numpy" never uses it
+INTEGRATOR = "verlet" # "verlet" keeps the fixed frame step, "dormandPrince" takes adaptive steps with error control (and a live LINAC field, see integrators.py)
+INTEGRATOR_TOLERANCE = 1e-8 # Default error per adaptive step, relative to the size of a point's position and velocity
+INTEGRATOR_MAX_STEP = 2.0 # Longest adaptive step in seconds, so a point in a steady field still checks in now and then
+BUNCH_PROTONS = 1.15 * 10 ** 11 # Protons in one bunch of a real fill
+BUNCH_MACRO_PARTICLES = 100000 # Rows each bunch is carried by, every row stands for BUNCH_PROTONS / BUNCH_MACRO_PARTICLES protons
+BUNCH_POSITION_SPREAD = [0.1, 0.1, 0] # Standard deviation of the injected positions about the gas pump on each axis
+BUNCH_VELOCITY_SPREAD = [0, 0, 0.001] # Standard deviation of the injected velocities (displacement per tick, as spawnHydrogen gives it) on each axis
+BUNCH_SPACE_CHARGE = False # Whether the macro-particles of a bunch repel each other in the source chamber (slow, and heavily weighted rows fly apart)
+MONTE_CARLO_READINGS = 100000 # Readings monteCarloSimulation.py generates
+MONTE_CARLO_SEED = None # Master seed of the Monte Carlo study, None draws a fresh one (printed so the run can be repeated)
+MONTE_CARLO_WORKERS = None # Processes the Monte Carlo study is spread over, None uses every core
+RESULTS_BLOCK_ROWS = 65536 # Readings in each compressed block of a results file
+EVENT_STORE_SORT_ROWS = 2 ** 23 # Rows an event store sorts in memory at once while indexing, larger stores are merged from sorted runs on disk
+PIPELINE_BATCH_SIZE = 65536 # Readings in each batch an event pipeline passes from stage to stage
+PIPELINE_BUFFER_BATCHES = 2 # Batches a prefetching stage may hold ready ahead of its consumer
+IMPORT_BLOCK_BYTES = 2 ** 26 # Bytes of text legacyImport.py reads and parses at a time
+HISTOGRAM_BINS = 10000 # Energy bins of the aggregated spectra (see aggregations.py)
+HISTOGRAM_RANGE = [0, 10000] # Lowest and highest energy (GeV) the aggregated spectra bin, energies outside falling in an underflow or overflow bin
+FRAME_TIMING = False # Whether frames are timed phase by phase (see frameTiming.py), off costs one test per phase
+FRAME_TIMING_WINDOW = 1000 # Latest frames the timing percentiles are taken over
+FRAME_TIMING_SUMMARY_FRAMES = 1000 # Frames between the timing summaries printed while timing is on, None for none
+TRACE_LEVEL = None # Lowest level of trace record kept ("debug", "info" or "warning", see tracing.py), None keeps none
+TRACE_BUFFER_SIZE = 10000 # Latest trace records held in memory until they are dumped
+TRACE_SAMPLING = {"hydrogen.circularMotion": 200, "proton.speed": 200, "engine.ableToCollide": 200, "simulation.points": 200} # Sites that keep one trace record in this many (about one a second at 200 Hz), others keep all
+BENCHMARK_MIN_TIME = 0.5 # Seconds each benchmark case is repeated for at the least, its fastest call being the one reported
+BENCHMARK_TOLERANCE = 0.25 # Fraction by which a benchmark's rate may fall below its baseline before benchmarks.py compare calls it a regression
 
 # Position Vectors
 ORIGIN = [0, 0, 0]
@@ -14,6 +47,7 @@ LHC_CIRCUMFERENCE = 27000
 # Simulated Scalars
 SIMULATED_PROTON_MASS = 1
 SIMULATED_PROTON_RADIUS = 0.25
+CONTACT_CELL_SIZE = 2 * SIMULATED_PROTON_RADIUS # Side of a contact broadphase cell, two touching protons are never more than one cell apart
 SIMULATED_PROTON_CHARGE = 1.05 * 10 ** -6
 SIMULATED_SPEED_OF_LIGHT = 1
 SIMULATED_PERMITTIVITY = 0.01
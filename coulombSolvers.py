@@ -0,0 +1,219 @@
+# Coulomb force backends used by PhysicsEngine.obtainCoulombForce
+# Each solver takes positions (N, 3) and charges (N,) and returns the electric force on every point (N, 3)
+
+import math
+import numpy as np
+from constants import *
+from mathematicalMethods import getRanges, expandRanges, expandPairs
+from neighbourList import NeighbourList
+import kernels
+
+def spreadBits(values):
+    '''Function that spaces the lowest 21 bits of each value two bits apart, ready for interleaving'''
+    values = values.astype(np.uint64) & np.uint64(0x1fffff)
+    values = (values | (values << np.uint64(32))) & np.uint64(0x1f00000000ffff)
+    values = (values | (values << np.uint64(16))) & np.uint64(0x1f0000ff0000ff)
+    values = (values | (values << np.uint64(8))) & np.uint64(0x100f00f00f00f00f)
+    values = (values | (values << np.uint64(4))) & np.uint64(0x10c30c30c30c30c3)
+    values = (values | (values << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return values
+
+def getMortonCodes(cells):
+    '''Function that interleaves integer (x, y, z) cell coordinates into Morton (Z-order) codes'''
+    return spreadBits(cells[:, 0]) | (spreadBits(cells[:, 1]) << np.uint64(1)) | (spreadBits(cells[:, 2]) << np.uint64(2))
+
+
+class Octree:
+    def __init__(self, positions, charges, maxDepth = 16, leafSize = 8):
+        # 1. Sort the points along a Morton curve so that every octree node is a contiguous run of points
+        # 2. Walk down the levels, splitting only the nodes that hold more than leafSize points
+        # 3. Use prefix sums so each node's total charge and centre of charge cost O(1)
+        self.maxDepth = maxDepth
+        lower = positions.min(axis = 0)
+        self.side = max(float((positions.max(axis = 0) - lower).max()), SIMULATED_PROTON_RADIUS) * (1 + 1e-9)
+        cellsPerSide = 2 ** maxDepth
+        cells = np.minimum(((positions - lower) / self.side * cellsPerSide).astype(np.int64), cellsPerSide - 1)
+        codes = getMortonCodes(cells)
+        self.order = np.argsort(codes, kind = "stable")
+        codes = codes[self.order]
+        self.pos = positions[self.order]
+        self.charge = charges[self.order]
+
+        weights = np.abs(self.charge)
+        chargeSums = np.concatenate(([0.0], np.cumsum(self.charge)))
+        weightSums = np.concatenate(([0.0], np.cumsum(weights)))
+        momentSums = np.vstack((np.zeros(3), np.cumsum(self.pos * weights[:, None], axis = 0)))
+
+        count = len(self.pos)
+        starts = [np.array([0])]
+        ends = [np.array([count])]
+        for level in range(1, maxDepth + 1):
+            parentStarts, parentEnds = starts[-1], ends[-1]
+            split = (parentEnds - parentStarts) > leafSize
+            if not split.any():
+                break
+            # Points of the parents being split, and the node key each falls into at this level
+            members = getRanges(parentStarts[split], parentEnds[split])
+            keys = codes[members] >> np.uint64(3 * (maxDepth - level))
+            boundaries = np.flatnonzero((keys[1:] != keys[:-1]) | (members[1:] != members[:-1] + 1)) + 1
+            starts.append(members[np.concatenate(([0], boundaries))])
+            ends.append(np.append(members[boundaries - 1] + 1, members[-1] + 1))
+
+        self.depth = len(starts) - 1
+        offsets = np.cumsum([0] + [len(levelStarts) for levelStarts in starts])
+        self.start = np.concatenate(starts)
+        self.end = np.concatenate(ends)
+        self.width = np.concatenate([np.full(len(levelStarts), self.side / 2 ** level) for level, levelStarts in enumerate(starts)])
+        self.childFirst = np.full(len(self.start), -1)
+        self.childLast = np.full(len(self.start), -1)
+        for level in range(self.depth):
+            internal = np.arange(offsets[level], offsets[level + 1])
+            internal = internal[(self.end[internal] - self.start[internal]) > leafSize]
+            self.childFirst[internal] = offsets[level + 1] + np.searchsorted(starts[level + 1], self.start[internal])
+            self.childLast[internal] = offsets[level + 1] + np.searchsorted(starts[level + 1], self.end[internal])
+        self.isLeaf = self.childFirst < 0
+
+        self.totalCharge = chargeSums[self.end] - chargeSums[self.start]
+        nodeWeights = weightSums[self.end] - weightSums[self.start]
+        self.centre = (momentSums[self.end] - momentSums[self.start]) / np.where(nodeWeights > 0, nodeWeights, 1)[:, None]
+
+        # The leaves partition the points, so they double as the groups that walk the tree together
+        self.leaves = np.flatnonzero(self.isLeaf)
+        self.leaves = self.leaves[np.argsort(self.start[self.leaves])]
+        reach = np.sqrt(((self.pos - np.repeat(self.centre[self.leaves], self.end[self.leaves] - self.start[self.leaves], axis = 0)) ** 2).sum(axis = 1))
+        self.leafRadius = np.maximum.reduceat(reach, self.start[self.leaves])
+
+
+class BarnesHutSolver:
+    def __init__(self, openingAngle = COULOMB_OPENING_ANGLE, cutoff = None, maxDepth = 16, leafSize = 8, chunkSize = 512):
+        self.openingAngle = openingAngle # Smaller is more accurate, 0 degenerates into the exact direct sum
+        self.cutoff = cutoff # Pairs this far apart or further are ignored, None means every pair interacts
+        self.maxDepth = maxDepth
+        self.leafSize = leafSize
+        self.chunkSize = chunkSize # Leaf groups walked together, bounds the size of the interaction lists
+
+    def obtainForces(self, positions, charges):
+        '''Method that finds the Coulomb force on every point from all the others in O(N log N)'''
+        positions = np.asarray(positions, dtype = float)
+        charges = np.asarray(charges, dtype = float)
+        forces = np.zeros((len(positions), 3))
+        charged = np.flatnonzero(charges != 0)
+        if len(charged) < 2:
+            return forces
+        tree = Octree(positions[charged], charges[charged], self.maxDepth, self.leafSize)
+        sortedForces = np.zeros((len(charged), 3))
+        for first in range(0, len(tree.leaves), self.chunkSize):
+            self.traverse(tree, np.arange(first, min(first + self.chunkSize, len(tree.leaves))), sortedForces)
+        forces[charged[tree.order]] = sortedForces
+        return forces
+
+    def traverse(self, tree, groups, forces):
+        '''Method that walks the tree for a batch of leaf groups at once, one level per iteration'''
+        groupIndex = groups
+        nodeIndex = np.zeros(len(groups), dtype = np.int64)
+        while len(groupIndex):
+            groupNodes = tree.leaves[groupIndex]
+            separation = tree.centre[groupNodes] - tree.centre[nodeIndex]
+            distance = np.sqrt(np.einsum("ij,ij->i", separation, separation))
+            # A node is far enough when it subtends less than the opening angle from every point of the group
+            farEnough = tree.width[nodeIndex] < self.openingAngle * (distance - tree.leafRadius[groupIndex])
+            if self.cutoff is not None:
+                # Nodes wholly out of range are dropped, and nodes straddling the cutoff are opened rather than approximated
+                reach = tree.leafRadius[groupIndex] + tree.width[nodeIndex] * math.sqrt(3)
+                inRange = np.flatnonzero(distance - reach < self.cutoff)
+                groupIndex, nodeIndex, groupNodes, distance, farEnough = groupIndex[inRange], nodeIndex[inRange], groupNodes[inRange], distance[inRange], farEnough[inRange]
+                farEnough &= distance + reach[inRange] < self.cutoff
+            leaf = tree.isLeaf[nodeIndex]
+
+            # Far nodes act on each point of the group as a single charge at their centre of charge
+            accepted = np.flatnonzero(farEnough)
+            receivers, pairs = expandRanges(tree.start[groupNodes[accepted]], tree.end[groupNodes[accepted]])
+            sourceNodes = nodeIndex[accepted][pairs]
+            self.accumulate(forces, receivers, tree.pos[receivers] - tree.centre[sourceNodes], tree.charge[receivers] * tree.totalCharge[sourceNodes])
+
+            # Near leaves interact point by point
+            near = np.flatnonzero(~farEnough & leaf)
+            receivers, sources = expandPairs(tree.start[groupNodes[near]], tree.end[groupNodes[near]], tree.start[nodeIndex[near]], tree.end[nodeIndex[near]])
+            separation = tree.pos[receivers] - tree.pos[sources]
+            distanceSquared = np.einsum("ij,ij->i", separation, separation)
+            distinct = distanceSquared > 0 # A point never acts on itself, and coincident points are skipped as in the original pairwise loop
+            if self.cutoff is not None:
+                distinct &= distanceSquared < self.cutoff ** 2
+            self.accumulate(forces, receivers[distinct], separation[distinct], tree.charge[receivers[distinct]] * tree.charge[sources[distinct]])
+
+            # Near internal nodes are opened and their children visited on the next iteration
+            opened = np.flatnonzero(~farEnough & ~leaf)
+            nodeIndex, pairs = expandRanges(tree.childFirst[nodeIndex[opened]], tree.childLast[nodeIndex[opened]])
+            groupIndex = groupIndex[opened][pairs]
+
+    def accumulate(self, forces, pointIndex, separation, chargeProducts):
+        '''Method that adds k * q1 * q2 * r / |r|^3 onto each receiving point'''
+        if len(pointIndex) == 0:
+            return
+        distanceSquared = np.einsum("ij,ij->i", separation, separation)
+        scale = COULOMB_LAW_CONSTANT * chargeProducts / (distanceSquared * np.sqrt(distanceSquared))
+        for axis in range(3):
+            forces[:, axis] += np.bincount(pointIndex, weights = separation[:, axis] * scale, minlength = len(forces))
+
+class DirectSumSolver:
+    def __init__(self, cutoff = None, blockSize = 256, memoryLimit = COULOMB_BLOCK_MEMORY):
+        self.cutoff = cutoff # Pairs this far apart or further are ignored, None means every pair interacts
+        # Each tile holds about eight blockSize x blockSize float64 temporaries, so the memory limit caps the block size
+        self.blockSize = max(1, min(blockSize, int(math.sqrt(memoryLimit / 64))))
+
+    def obtainForces(self, positions, charges):
+        '''Method that finds the exact Coulomb force on every point by summing over every pair'''
+        # 1. Split the charged points into blocks and visit each pair of blocks once (block j >= block i)
+        # 2. Within a tile, the unit vector between two points is their separation over its length, no angles needed
+        # 3. Newton's third law: the force a tile puts on block i is put back, reversed, on block j
+        positions = np.asarray(positions, dtype = float)
+        charges = np.asarray(charges, dtype = float)
+        forces = np.zeros((len(positions), 3))
+        charged = np.flatnonzero(charges != 0)
+        pos = positions[charged]
+        charge = charges[charged]
+        if kernels.COMPILED:
+            forces[charged] = kernels.coulombForces(pos, charge, math.inf if self.cutoff is None else self.cutoff ** 2, COULOMB_LAW_CONSTANT)
+            return forces
+        chargedForces = np.zeros((len(charged), 3))
+        for firstI in range(0, len(charged), self.blockSize):
+            blockI = slice(firstI, min(firstI + self.blockSize, len(charged)))
+            for firstJ in range(firstI, len(charged), self.blockSize):
+                blockJ = slice(firstJ, min(firstJ + self.blockSize, len(charged)))
+                separation = [pos[blockI, axis, None] - pos[None, blockJ, axis] for axis in range(3)]
+                distanceSquared = separation[0] ** 2 + separation[1] ** 2 + separation[2] ** 2
+                interacting = distanceSquared > 0 # A point never acts on itself, and coincident points are skipped as in the original pairwise loop
+                if self.cutoff is not None:
+                    interacting &= distanceSquared < self.cutoff ** 2
+                if firstI == firstJ:
+                    interacting = np.triu(interacting, 1) # Each pair on the diagonal tile is counted once
+                # |F| * unit vector = k * q1 * q2 / r^2 * (r / |r|)
+                scale = np.zeros_like(distanceSquared)
+                np.divide(COULOMB_LAW_CONSTANT * charge[blockI, None] * charge[None, blockJ], distanceSquared * np.sqrt(distanceSquared), out = scale, where = interacting)
+                for axis in range(3):
+                    pairForces = separation[axis] * scale
+                    chargedForces[blockI, axis] += pairForces.sum(axis = 1)
+                    chargedForces[blockJ, axis] -= pairForces.sum(axis = 0)
+        forces[charged] = chargedForces
+        return forces
+
+class NeighbourListSolver:
+    def __init__(self, cutoff, skin = NEIGHBOUR_LIST_SKIN):
+        self.cutoff = cutoff
+        self.neighbours = NeighbourList(cutoff, skin) # Kept between calls, so a frame only rechecks the pairs already listed
+
+    def obtainForces(self, positions, charges):
+        '''Method that finds the Coulomb force on every point from the pairs within the cutoff, O(N * neighbours)'''
+        positions = np.asarray(positions, dtype = float)
+        charges = np.asarray(charges, dtype = float)
+        forces = np.zeros((len(positions), 3))
+        self.neighbours.update(positions)
+        first, second, distance = self.neighbours.obtainPairs()
+        interacting = (distance > 0) & (charges[first] != 0) & (charges[second] != 0)
+        first, second, distance = first[interacting], second[interacting], distance[interacting]
+        separation = positions[first] - positions[second]
+        scale = COULOMB_LAW_CONSTANT * charges[first] * charges[second] / (distance ** 3)
+        for axis in range(3):
+            forces[:, axis] += np.bincount(first, weights = separation[:, axis] * scale, minlength = len(forces))
+            forces[:, axis] -= np.bincount(second, weights = separation[:, axis] * scale, minlength = len(forces))
+        return forces
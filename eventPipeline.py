@@ -0,0 +1,150 @@
+# Streaming pipeline for collision readings: a lazy source of batches, transform stages and sinks, wired together as generators
+# A batch is a dict of arrays with one entry per reading, so memory stays bounded by the batch size however long the run is, e.g.
+#
+#     batches = trackHiggsStatistics(classify(generateBatches(seed = 1, readings = 10 ** 8)))
+#     fileSink, counter = runPipeline(prefetch(batches), ResultsFileSink("run.lhcr"), ChannelCounter())
+
+import itertools
+import queue
+import threading
+import numpy as np
+from constants import *
+from mathematicalMethods import RunningStatistics, combineStatistics
+from collisionChannels import PRODUCT_COUNTS, drawEvents, classifyTenths, obtainCollisionTypes, obtainProductCodes
+from monteCarloSimulation import obtainCounted, obtainRunningStatistics, obtainHiggsProbabilities
+from resultsFile import ResultsWriter
+from eventStore import EventStoreWriter
+from aggregations import ChannelCounter, RunAggregates
+
+# Sources
+
+def generateBatches(seed = MONTE_CARLO_SEED, batchSize = PIPELINE_BATCH_SIZE, readings = None, firstReading = 1):
+    '''Generator that draws readings a batch at a time, for ever if readings is None, each batch from its own spawned seed stream'''
+    seedSequence = np.random.SeedSequence(seed)
+    readingNumber = firstReading
+    for number in itertools.count():
+        count = batchSize if readings is None else min(batchSize, readings - number * batchSize)
+        if count <= 0:
+            return
+        tenths, charges = drawEvents(np.random.default_rng(seedSequence.spawn(1)[0]), count)
+        yield {"readingNumber": readingNumber + np.arange(count), "tenths": tenths, "energy": tenths / 10, "charges": charges}
+        readingNumber += count
+
+# Transforms
+
+def classify(batches):
+    '''Stage that adds each reading's channel and product count'''
+    for batch in batches:
+        channel = classifyTenths(batch["tenths"]) if "tenths" in batch else obtainCollisionTypes(batch["energy"])
+        batch["channel"] = channel
+        batch["productCounts"] = PRODUCT_COUNTS[channel]
+        yield batch
+
+def trackHiggsStatistics(batches, statistics = None):
+    '''Stage that adds each reading's Higgs probability, carrying the running statistics from one batch to the next'''
+    statistics = statistics if statistics is not None else RunningStatistics()
+    previous = 0.0
+    if statistics.count: # Carried on from the statistics passed in, whose only reading's energy is their mean when they hold one
+        previous = float(obtainHiggsProbabilities({"values": np.array([statistics.mean]), "counted": np.array([True]), "runningCount": np.array([statistics.count]), "runningMean": np.array([statistics.mean]), "runningSquares": np.array([statistics.squares])})[0])
+    for batch in batches:
+        counted = obtainCounted(batch["channel"])
+        runningCount, runningMean, runningSquares, batchStatistics = obtainRunningStatistics(batch["energy"], counted)
+        runningCount, runningMean, runningSquares = combineStatistics(statistics.count, statistics.mean, statistics.squares, runningCount, runningMean, runningSquares)
+        batch["higgsProbability"] = obtainHiggsProbabilities({"values": batch["energy"], "counted": counted, "runningCount": runningCount, "runningMean": runningMean, "runningSquares": runningSquares}, previous)
+        statistics.merge(batchStatistics)
+        if len(batch["higgsProbability"]):
+            previous = batch["higgsProbability"][-1]
+        yield batch
+
+def filterEvents(batches, predicate):
+    '''Stage that keeps the readings for which predicate(batch) is True, dropping batches left empty'''
+    for batch in batches:
+        keep = predicate(batch)
+        if np.any(keep):
+            yield {name: values[keep] for name, values in batch.items()}
+
+def prefetch(batches, depth = PIPELINE_BUFFER_BATCHES):
+    '''Stage that runs everything upstream on a background thread, holding at most depth batches ready so producing and consuming overlap'''
+    ready = queue.Queue(depth)
+    finished = object()
+    stopping = threading.Event()
+
+    def produce():
+        try:
+            for batch in batches:
+                while not stopping.is_set():
+                    try:
+                        ready.put(batch, timeout = 0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if stopping.is_set():
+                    return
+            ready.put(finished)
+        except BaseException as error: # Handed to the consumer so it is raised where the pipeline is being run
+            ready.put(error)
+
+    producer = threading.Thread(target = produce, daemon = True)
+    producer.start()
+    try:
+        while True:
+            batch = ready.get()
+            if batch is finished:
+                return
+            if isinstance(batch, BaseException):
+                raise batch
+            yield batch
+    finally:
+        stopping.set()
+
+# Sinks, each consuming batches and giving its result when the stream ends (the aggregates in aggregations.py are sinks too)
+
+def runPipeline(batches, *sinks):
+    '''Function that pulls batches through the pipeline into every sink and returns the sinks once the source runs out'''
+    for batch in batches:
+        for sink in sinks:
+            sink.consume(batch)
+    for sink in sinks:
+        sink.finish()
+    return sinks
+
+
+def obtainReadingColumns(batch):
+    '''Function that picks out a batch's columns as results files and event stores hold them'''
+    return {
+        "readingNumber": batch["readingNumber"],
+        "channel": batch["channel"],
+        "energy": batch["energy"],
+        "higgsProbability": batch["higgsProbability"],
+        "productCounts": batch["productCounts"],
+        "products": obtainProductCodes(batch["channel"], batch["charges"])}
+
+
+class ResultsFileSink:
+    '''Sink that writes readings to a columnar results file as they arrive'''
+    def __init__(self, path):
+        self.writer = ResultsWriter(path)
+
+    def consume(self, batch):
+        self.writer.write(obtainReadingColumns(batch))
+
+    def finish(self):
+        self.writer.close()
+
+
+class EventStoreSink:
+    '''Sink that appends readings to a memory-mapped event store, indexing them when the stream ends'''
+    def __init__(self, path):
+        self.writer = EventStoreWriter(path)
+
+    def consume(self, batch):
+        self.writer.write(obtainReadingColumns(batch))
+
+    def finish(self):
+        self.writer.close()
+
+
+if __name__ == "__main__":
+    batches = prefetch(trackHiggsStatistics(classify(generateBatches(readings = MONTE_CARLO_READINGS))))
+    fileSink, counter = runPipeline(batches, ResultsFileSink("testResults.lhcr"), ChannelCounter())
+    print(counter.obtainCounts())
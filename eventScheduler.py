@@ -0,0 +1,81 @@
+# Event-driven alternative to stepping PhysicsEngine one frame at a time
+# Once the source chamber is activated no force couples the protons, so each one can jump straight to its next event:
+# the next frame that does more than repeat its current motion (a gap, the end of a tube or stage, leaving the simulation)
+
+import heapq
+import itertools
+from constants import *
+from particles import Proton
+
+class EventScheduler:
+    def __init__(self, engine):
+        self.engine = engine
+        self.queue = [] # (frame, order, point) for every point's next event, earliest first
+        self.clock = {} # Frame each point has been moved up to
+        self.order = itertools.count()
+        self.events = 0
+
+    def schedule(self, point):
+        '''Method that queues a point's next event, points whose motion never changes are only moved when synchronised'''
+        ticks = self.engine.obtainUniformTicks(point)
+        if ticks is not None:
+            heapq.heappush(self.queue, (self.clock[point] + ticks + 1, next(self.order), point))
+
+    def synchronise(self, point, frame):
+        '''Method that brings a point up to a frame by skipping the uniform frames in between'''
+        self.engine.skipUniformTicks(point, frame - self.clock[point])
+        self.clock[point] = frame
+
+    def synchroniseAll(self, frame):
+        '''Method that brings every point up to a frame, so the engine can look at them together'''
+        for point in self.engine.points:
+            self.synchronise(point, frame)
+        self.engine.frames = frame
+
+    def isArmed(self):
+        '''Method that says whether the collision trigger needs checking, the same condition as PhysicsEngine.checkCollisionTrigger'''
+        return any(isinstance(point, Proton) and point.goingThroughCollider and point.speed > 3500 for point in self.engine.points)
+
+    def run(self, maxFrames = 200000):
+        '''Method that runs the engine until the protons collide or maxFrames is reached, jumping from event to event'''
+        # 1. Pop the points whose event falls on the earliest frame, skip each one to the frame before and run that frame in full
+        # 2. Queue each point's following event
+        # 3. Once the collision trigger is armed it needs every point at the same frame, so bring them all up to date
+        #    and step frame by frame from there, exactly as PhysicsEngine.update does
+        engine = self.engine
+        if not engine.sourceChamber.activated or engine.bunches: # Coulomb forces still couple the points, or whole bunches move together
+            while not engine.collided and engine.frames < maxFrames:
+                engine.step()
+            return engine
+        for point in engine.points:
+            self.clock[point] = engine.frames
+            self.schedule(point)
+
+        while self.queue and not engine.collided:
+            frame = self.queue[0][0]
+            if frame > maxFrames:
+                break
+            due = []
+            while self.queue and self.queue[0][0] == frame:
+                due.append(heapq.heappop(self.queue)[2])
+            engine.frames = frame
+            for point in sorted(due, key = engine.points.index): # The order update visits them in
+                self.synchronise(point, frame - 1)
+                self.clock[point] = frame
+                if engine.tickPoint(point):
+                    self.schedule(point)
+                else:
+                    del self.clock[point]
+            self.events += 1
+            if self.isArmed():
+                self.synchroniseAll(frame)
+                engine.checkCollisionTrigger()
+                engine.notify("frameCompleted", engine)
+                while not engine.collided and engine.frames < maxFrames:
+                    engine.step()
+                return engine
+            engine.notify("frameCompleted", engine)
+
+        if not engine.collided:
+            self.synchroniseAll(maxFrames)
+        return engine
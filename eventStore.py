@@ -0,0 +1,279 @@
+# Memory-mapped store of collision readings with indexes for the selections studies keep asking for
+# Every column lives uncompressed in its own file, so opening a store maps the files rather than reading them and a selection hands back
+# numpy views of the mapped pages, e.g.
+#
+#     store = EventStore("run.events")
+#     higgs = store.selectChannel("Higgs Production") # Rows of every Higgs Production reading
+#     energies = store.column("energy")[store.query(low = 124, high = 126)] # In order of energy
+#
+# Layout: a directory holding store.json, which gives every file's dtype and shape, and one .bin file per column and index
+# Indexes: each channel's rows in reading order (with a bitmap per channel for testing rows one by one) and every row sorted by energy
+# The indexes are built from the mapped columns EVENT_STORE_SORT_ROWS rows at a time, so indexing 10^8 readings needs no more memory than 10^7:
+# the channel index is a counting sort, and the energy index sorts runs of that many rows and merges them in pairs, pass by pass, on disk
+
+import json
+import math
+import os
+import numpy as np
+from constants import *
+from collisionChannels import POSSIBILITIES
+from resultsFile import READING_COLUMNS, ResultsReader
+
+STORE_VERSION = 1
+
+class EventStoreWriter:
+    '''Class that appends readings to a new store column by column, building its indexes once every reading is in'''
+    def __init__(self, path, columns = READING_COLUMNS, sortRows = EVENT_STORE_SORT_ROWS):
+        self.path = path
+        self.columns = columns
+        self.sortRows = max(8, sortRows // 8 * 8) # A whole number of bytes of each channel bitmap
+        self.rows = 0
+        self.raggedRows = {column["name"]: 0 for column in columns if "lengths" in column} # Values written so far to each ragged column
+        os.makedirs(path, exist_ok = True)
+        if os.path.exists(self.obtainDescriptionPath()): # A store being overwritten must not open while its column files are truncated
+            os.remove(self.obtainDescriptionPath())
+        self.files = {column["name"]: open(os.path.join(path, column["name"] + ".bin"), "wb") for column in columns}
+        for name in self.raggedRows:
+            self.files[name + "Offsets"] = open(os.path.join(path, name + "Offsets.bin"), "wb")
+            np.zeros(1, dtype = np.int64).tofile(self.files[name + "Offsets"])
+
+    def obtainDescriptionPath(self):
+        return os.path.join(self.path, "store.json")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        # A store whose writing failed is left without its indexes and store.json, so EventStore will not open it
+        self.close(buildIndexes = exception[0] is None)
+
+    def write(self, values):
+        '''Method that appends rows, given as one array per column name (ragged columns end to end) as for ResultsWriter.write'''
+        for column in self.columns:
+            np.asarray(values[column["name"]], dtype = column["dtype"]).tofile(self.files[column["name"]])
+            if "lengths" in column:
+                offsets = self.raggedRows[column["name"]] + np.cumsum(values[column["lengths"]], dtype = np.int64)
+                offsets.tofile(self.files[column["name"] + "Offsets"])
+                self.raggedRows[column["name"]] = int(offsets[-1]) if len(offsets) else self.raggedRows[column["name"]]
+        self.rows += len(values[self.columns[0]["name"]])
+
+    def close(self, buildIndexes = True):
+        '''Method that closes the column files, then builds the indexes from them and writes store.json unless buildIndexes is False'''
+        if self.files is None:
+            return
+        for file in self.files.values():
+            file.close()
+        self.files = None
+        if not buildIndexes:
+            return
+        shapes = {column["name"]: (column["dtype"], [self.raggedRows.get(column["name"], self.rows)]) for column in self.columns}
+        for name in self.raggedRows:
+            shapes[name + "Offsets"] = ("int64", [self.rows + 1])
+        self.buildChannelIndexes(shapes, self.mapColumn("channel", np.uint8))
+        self.buildEnergyIndexes(shapes, self.mapColumn("energy", np.float64))
+        description = {
+            "version": STORE_VERSION,
+            "rows": self.rows,
+            "columns": self.columns,
+            "files": {name: {"dtype": dtype, "shape": shape} for name, (dtype, shape) in shapes.items()}}
+        with open(self.obtainDescriptionPath(), "w") as file:
+            json.dump(description, file)
+
+    def writeIndex(self, shapes, name, values):
+        values.tofile(os.path.join(self.path, name + ".bin"))
+        shapes[name] = (values.dtype.name, list(values.shape))
+
+    def createIndex(self, shapes, name, dtype, shape):
+        '''Method that creates an index file of the given shape, mapped for writing'''
+        shapes[name] = (np.dtype(dtype).name, list(shape))
+        return self.mapFile(name, dtype, shape, "w+")
+
+    def mapColumn(self, name, dtype):
+        return self.mapFile(name, dtype, [self.rows], "r")
+
+    def mapFile(self, name, dtype, shape, mode):
+        if 0 in shape: # np.memmap cannot map an empty file
+            open(os.path.join(self.path, name + ".bin"), "ab").close()
+            return np.zeros(shape, dtype = dtype)
+        return np.memmap(os.path.join(self.path, name + ".bin"), dtype = dtype, mode = mode, shape = tuple(shape))
+
+    def obtainChunks(self):
+        return [(start, min(start + self.sortRows, self.rows)) for start in range(0, self.rows, self.sortRows)]
+
+    def buildChannelIndexes(self, shapes, channel):
+        '''Method that writes each channel's rows in reading order, where each channel's rows start and each channel's bitmap'''
+        # A counting sort: the first pass counts each channel's rows, the second deals every chunk's rows out behind those of earlier chunks
+        channels = len(POSSIBILITIES)
+        counts = np.zeros(channels, dtype = np.int64)
+        for start, stop in self.obtainChunks():
+            counts += np.bincount(channel[start:stop], minlength = channels)
+        starts = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.writeIndex(shapes, "channelStarts", starts)
+        order = self.createIndex(shapes, "channelOrder", np.int64, [self.rows])
+        bitmaps = self.createIndex(shapes, "channelBitmaps", np.uint8, [channels, (self.rows + 7) // 8])
+        filled = starts[:-1].copy()
+        for start, stop in self.obtainChunks():
+            values = np.asarray(channel[start:stop])
+            chunkOrder = np.argsort(values, kind = "stable") + start # Stable, so each channel's rows stay in reading order
+            chunkStarts = np.searchsorted(values[chunkOrder - start], np.arange(channels + 1))
+            for number in range(channels):
+                count = chunkStarts[number + 1] - chunkStarts[number]
+                order[filled[number]:filled[number] + count] = chunkOrder[chunkStarts[number]:chunkStarts[number + 1]]
+                filled[number] += count
+                bitmaps[number, start // 8:(stop + 7) // 8] = np.packbits(values == number)
+        del order, bitmaps # Flushes the mapped pages to the files
+
+    def buildEnergyIndexes(self, shapes, energy):
+        '''Method that writes every row sorted by energy and the energies in that order, equal energies keeping reading order'''
+        # 1. Sort each chunk, giving runs of sorted rows
+        # 2. Merge neighbouring runs in pairs until one is left, each pass reading one pair of files and writing the other
+        # The passes alternate between the index files and scratch files, starting so that the last pass writes the index files
+        chunks = self.obtainChunks()
+        passes = math.ceil(math.log2(len(chunks))) if len(chunks) > 1 else 0
+        targets = [(self.createIndex(shapes, "sortedEnergy", np.float64, [self.rows]), self.createIndex(shapes, "energyOrder", np.int64, [self.rows]))]
+        if passes:
+            targets.append((self.mapFile("sortedEnergyScratch", np.float64, [self.rows], "w+"), self.mapFile("energyOrderScratch", np.int64, [self.rows], "w+")))
+        keys, rows = targets[passes % 2]
+        for start, stop in chunks:
+            values = np.asarray(energy[start:stop])
+            chunkOrder = np.argsort(values, kind = "stable")
+            keys[start:stop] = values[chunkOrder]
+            rows[start:stop] = chunkOrder + start
+        bounds = [start for start, stop in chunks] + [self.rows]
+        for number in range(passes):
+            source, target = targets[(passes - number) % 2], targets[(passes - number - 1) % 2]
+            merged = []
+            for first in range(0, len(bounds) - 1, 2):
+                middle = bounds[first + 1]
+                end = bounds[first + 2] if first + 2 < len(bounds) else middle
+                self.mergeRuns(source, target, bounds[first], middle, end)
+                merged.append(bounds[first])
+            bounds = merged + [self.rows]
+        del targets, keys, rows # Flushes the mapped pages to the files
+        if passes:
+            os.remove(os.path.join(self.path, "sortedEnergyScratch.bin"))
+            os.remove(os.path.join(self.path, "energyOrderScratch.bin"))
+
+    def mergeRuns(self, source, target, start, middle, end):
+        '''Method that merges the sorted runs start to middle and middle to end of source into start to end of target, a chunk at a time'''
+        # Of the next chunk of each run, every key up to the lower of their last keys can go out now, as neither run has a smaller one to come.
+        # When the first run's chunk ends at or below the second's, keys of the second equal to its last wait, since the first run's are
+        # earlier readings and more of them may follow
+        sourceKeys, sourceRows = source
+        targetKeys, targetRows = target
+        first, second, written = start, middle, start
+        while first < middle or second < end:
+            firstKeys = np.asarray(sourceKeys[first:min(first + self.sortRows, middle)])
+            secondKeys = np.asarray(sourceKeys[second:min(second + self.sortRows, end)])
+            if not len(firstKeys) or not len(secondKeys):
+                firstTaken, secondTaken = len(firstKeys), len(secondKeys)
+            elif firstKeys[-1] <= secondKeys[-1]:
+                firstTaken, secondTaken = len(firstKeys), int(np.searchsorted(secondKeys, firstKeys[-1], side = "left"))
+            else:
+                firstTaken, secondTaken = int(np.searchsorted(firstKeys, secondKeys[-1], side = "right")), len(secondKeys)
+            keys = np.concatenate([firstKeys[:firstTaken], secondKeys[:secondTaken]])
+            order = np.argsort(keys, kind = "stable") # Stable, so on equal keys the first run's earlier readings come first
+            count = len(keys)
+            targetKeys[written:written + count] = keys[order]
+            targetRows[written:written + count] = np.concatenate([sourceRows[first:first + firstTaken], sourceRows[second:second + secondTaken]])[order]
+            first += firstTaken
+            second += secondTaken
+            written += count
+
+
+class EventStore:
+    '''Class that maps a store's files read only, answering selections with row numbers and columns with views'''
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "store.json")) as file:
+            description = json.load(file)
+        if description["version"] > STORE_VERSION:
+            raise ValueError(f"{path} is version {description['version']}, newer than this reader")
+        self.rows = description["rows"]
+        self.columns = {column["name"]: column for column in description["columns"]}
+        self.arrays = {name: self.mapFile(name, entry["dtype"], entry["shape"]) for name, entry in description["files"].items()}
+
+    def mapFile(self, name, dtype, shape):
+        if 0 in shape: # np.memmap cannot map an empty file
+            return np.zeros(shape, dtype = dtype)
+        return np.memmap(os.path.join(self.path, name + ".bin"), dtype = dtype, mode = "r", shape = tuple(shape))
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        '''Method that gives a whole column as a read only view of its mapped file'''
+        return self.arrays[name]
+
+    def obtainChannel(self, channel):
+        return POSSIBILITIES.index(channel) if isinstance(channel, str) else channel
+
+    # Selections, each giving row numbers that index any column
+
+    def selectReadings(self, first, last):
+        '''Method that finds the rows of readings first to last inclusive, as a slice so that indexing a column with it gives a view'''
+        readingNumbers = self.arrays["readingNumber"]
+        return slice(int(np.searchsorted(readingNumbers, first, side = "left")), int(np.searchsorted(readingNumbers, last, side = "right")))
+
+    def selectChannel(self, channel):
+        '''Method that finds the rows of one channel, by name or number, in reading order as a view of the channel index'''
+        channel = self.obtainChannel(channel)
+        starts = self.arrays["channelStarts"]
+        return self.arrays["channelOrder"][starts[channel]:starts[channel + 1]]
+
+    def selectEnergy(self, low, high):
+        '''Method that finds the rows with energies from low to high inclusive, in order of energy as a view of the energy index'''
+        sortedEnergy = self.arrays["sortedEnergy"]
+        return self.arrays["energyOrder"][np.searchsorted(sortedEnergy, low, side = "left"):np.searchsorted(sortedEnergy, high, side = "right")]
+
+    def channelBitmap(self, channel):
+        '''Method that gives a channel's bitmap, one bit per row (most significant bit first), as a view'''
+        return self.arrays["channelBitmaps"][self.obtainChannel(channel)]
+
+    def inChannel(self, rows, channel):
+        '''Method that tests which of the given rows are in a channel by looking up their bits, touching nothing else'''
+        rows = np.asarray(rows)
+        return (self.channelBitmap(channel)[rows >> 3] >> (7 - (rows & 7)).astype(np.uint8)) & 1 == 1
+
+    def query(self, channel = None, low = None, high = None, first = None, last = None):
+        '''Method that finds the rows meeting every condition given, in order of energy when an energy range is given and reading order otherwise'''
+        # Starts from the energy range or the channel, whichever is given, and narrows it with the others, so the work is in proportion to the rows found
+        # The energy index's rows are kept in its order rather than sorted back into reading order, which would cost O(n log n) on wide ranges
+        rows = None
+        readings = slice(0, self.rows)
+        if (first is not None or last is not None) and self.rows:
+            readingNumbers = self.arrays["readingNumber"]
+            readings = self.selectReadings(first if first is not None else readingNumbers[0], last if last is not None else readingNumbers[-1])
+        if low is not None or high is not None:
+            rows = self.selectEnergy(low if low is not None else -np.inf, high if high is not None else np.inf)
+            if readings.start > 0 or readings.stop < self.rows:
+                rows = rows[(rows >= readings.start) & (rows < readings.stop)]
+        if channel is not None:
+            if rows is None:
+                rows = self.selectChannel(channel)
+                rows = rows[np.searchsorted(rows, readings.start):np.searchsorted(rows, readings.stop)]
+            else:
+                rows = rows[self.inChannel(rows, channel)]
+        if rows is None:
+            rows = np.arange(readings.start, readings.stop)
+        return rows
+
+    # Reading what was selected
+
+    def take(self, name, rows):
+        '''Method that reads a column at the selected rows, a view when rows is a slice'''
+        return self.arrays[name][rows]
+
+    def obtainProducts(self, row):
+        '''Method that lists the product names of one reading'''
+        offsets = self.arrays["productsOffsets"]
+        return [self.columns["products"]["dictionary"][code] for code in self.arrays["products"][offsets[row]:offsets[row + 1]].tolist()]
+
+
+def buildEventStore(resultsPath, path):
+    '''Function that builds a store from a results file one block at a time'''
+    reader = ResultsReader(resultsPath)
+    with EventStoreWriter(path, list(reader.columns.values())) as writer:
+        for number in range(len(reader.blocks)):
+            writer.write({name: reader.readColumn(name, [number]) for name in reader.columns})
+    return EventStore(path)
@@ -0,0 +1,98 @@
+# Per-phase frame timing, so it can be seen where each frame's time goes
+# A frame is timed as a run of phases: every mark records the nanoseconds since the one before it (or since the frame started) against a phase,
+# from the monotonic clock. The latest FRAME_TIMING_WINDOW samples of each phase are kept, from which rolling percentiles are read, e.g.
+#
+#     timer = FrameTimer()
+#     timer.startFrame()
+#     drawSprites()
+#     timer.mark("drawing")
+#     engine.step()
+#     timer.mark("physics")
+#     timer.endFrame()
+#     timer.obtainPercentiles("drawing") # {"p50": ..., "p95": ..., "p99": ...} in milliseconds
+#
+# Frames may nest (LHCSimulation.run times its own phases around PhysicsEngine.update, which times its phases), only the outermost frame
+# starts and ends one. Code that is timed holds None instead of a timer when timing is off, so then each phase costs one test of None
+
+import collections
+import time
+import numpy as np
+from constants import *
+
+FRAME_PERCENTILES = [50, 95, 99]
+
+class FrameTimer:
+    def __init__(self, window = FRAME_TIMING_WINDOW, summaryFrames = FRAME_TIMING_SUMMARY_FRAMES, report = print):
+        self.window = window
+        self.summaryFrames = summaryFrames # Frames between summaries passed to report, None for no periodic summary
+        self.report = report
+        self.samples = {} # Latest durations of each phase in nanoseconds, in the order the phases were first marked
+        self.totals = {} # Nanoseconds spent in each phase over every frame, so shares of the frame are over the same frames
+        self.frames = 0
+        self.depth = 0
+        self.frameStart = 0
+        self.lastMark = 0
+
+    def startFrame(self):
+        self.depth += 1
+        if self.depth == 1:
+            self.frameStart = self.lastMark = time.perf_counter_ns()
+
+    def mark(self, phase):
+        '''Method that ends a phase, recording the time since the previous mark against it'''
+        now = time.perf_counter_ns()
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = collections.deque(maxlen = self.window)
+        duration = now - self.lastMark
+        samples.append(duration)
+        self.totals[phase] = self.totals.get(phase, 0) + duration
+        self.lastMark = now
+
+    def endFrame(self):
+        '''Method that ends a frame, recording its whole duration as the "frame" phase and reporting a summary every summaryFrames frames'''
+        self.depth -= 1
+        if self.depth:
+            return
+        now = time.perf_counter_ns()
+        samples = self.samples.get("frame")
+        if samples is None:
+            samples = self.samples["frame"] = collections.deque(maxlen = self.window)
+        duration = now - self.frameStart
+        samples.append(duration)
+        self.totals["frame"] = self.totals.get("frame", 0) + duration
+        self.frames += 1
+        if self.summaryFrames and self.frames % self.summaryFrames == 0 and self.report is not None:
+            self.report(self.formatSummary())
+
+    def obtainPercentiles(self, phase, percentiles = FRAME_PERCENTILES):
+        '''Method that finds percentiles of a phase's latest durations in milliseconds, keyed "p50" and so on'''
+        samples = np.fromiter(self.samples.get(phase, ()), dtype = np.int64)
+        if not len(samples):
+            return {f"p{percentile}": None for percentile in percentiles}
+        return dict(zip([f"p{percentile}" for percentile in percentiles], (np.percentile(samples, percentiles) / 10 ** 6).tolist()))
+
+    def obtainSummary(self):
+        '''Method that gives every phase's percentiles and mean over the window and its share of all frame time so far, frame last'''
+        frameTotal = self.totals.get("frame", 0)
+        summary = {}
+        for phase in sorted(self.samples, key = lambda phase: phase == "frame"):
+            summary[phase] = self.obtainPercentiles(phase)
+            summary[phase]["mean"] = float(np.mean(self.samples[phase])) / 10 ** 6 if self.samples[phase] else None
+            summary[phase]["share"] = self.totals[phase] / frameTotal if frameTotal else None
+        return summary
+
+    def formatSummary(self):
+        '''Method that lays the summary out as a table, one phase per line'''
+        lines = [f"Frame timing over the last {min(self.frames, self.window)} of {self.frames} frames (ms)"]
+        lines.append(f"{'phase':<20}" + "".join(f"{name:>10}" for name in ["p50", "p95", "p99", "mean", "share"]))
+        for phase, statistics in self.obtainSummary().items():
+            cells = [statistics[f"p{percentile}"] for percentile in FRAME_PERCENTILES] + [statistics["mean"]]
+            share = f"{statistics['share']:.1%}" if statistics["share"] is not None else "-"
+            lines.append(f"{phase:<20}" + "".join(f"{cell:>10.3f}" if cell is not None else f"{'-':>10}" for cell in cells) + f"{share:>10}")
+        return "\n".join(lines)
+
+    def reset(self):
+        self.samples = {}
+        self.totals = {}
+        self.frames = 0
@@ -0,0 +1,155 @@
+# Integrators that PhysicsEngine uses to move the freely moving rows of a ParticleArray on by one frame
+# Each takes the store, the rows to move and optionally forceFunction(rows, pos, velocity) -> forces,
+# which defaults to each row's force column
+#
+# PhysicsEngine (and Bunch.update, for each bunch's rows) gives the adaptive integrator a forceFunction with every force that depends on
+# where a row is: the Coulomb repulsion and the nozzle and wall pushes in the source chamber, and the LINAC's field (evaluated at each
+# trial position) after activation. So its step size shrinks near the LINAC's end terminal and on close approaches, and grows where the
+# force hardly changes. The Verlet integrator keeps the original scheme, with the LINAC force fixed when the chamber is activated and the other pushes applied as kicks after the step.
+# The two schemes therefore do not give the same run: the live LINAC field and the restart velocity (pos - oldPos) * R, which is the Verlet
+# velocity half a frame back rather than the velocity at pos, change the speed each proton leaves the LINAC with, so with "dormandPrince"
+# runFullPass collides at frame 4327 instead of the Verlet integrator's 4799
+
+import numpy as np
+from constants import *
+
+# Dormand-Prince 5(4) tableau
+NODES = [0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1]
+STAGE_WEIGHTS = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84]]
+FIFTH_ORDER_WEIGHTS = [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0]
+FOURTH_ORDER_WEIGHTS = [5179 / 57600, 0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40]
+
+def obtainIntegrator(name = INTEGRATOR):
+    '''Function that creates the integrator with the given name ("verlet" or "dormandPrince")'''
+    integrators = {"verlet": VerletIntegrator, "dormandPrince": DormandPrinceIntegrator}
+    return integrators[name]()
+
+def obtainRows(store, rows):
+    '''Function that turns a row index, a boolean mask or None (every row) into an array of row indices'''
+    if rows is None:
+        return np.arange(store.count)
+    if isinstance(rows, np.ndarray) and rows.dtype == bool:
+        return np.flatnonzero(rows[:store.count])
+    return np.atleast_1d(rows)
+
+
+class VerletIntegrator:
+    def __init__(self):
+        self.forceEvaluations = 0
+
+    def advance(self, store, rows, forceFunction = None):
+        '''Method that moves the rows on by one frame with the original fixed Verlet step'''
+        rows = obtainRows(store, rows)
+        forces = None if forceFunction is None else forceFunction(rows, store.pos[rows], store.velocity[rows])
+        store.verletStep(rows, forces)
+        self.forceEvaluations += len(rows)
+
+
+class DormandPrinceIntegrator:
+    def __init__(self, maxStep = INTEGRATOR_MAX_STEP, minStep = TIME_PERIOD / 1000):
+        self.maxStep = maxStep
+        self.minStep = minStep # Steps this short are accepted whatever their error, so a row can never stall
+        self.forceEvaluations = 0
+        self.acceptedSteps = 0
+        self.rejectedSteps = 0
+
+    def prepare(self, store):
+        '''Method that adds the step state each row keeps between frames to the store'''
+        store.addColumn("clock") # Time the row has been moved up to
+        store.addColumn("stepStart")
+        store.addColumn("stepLength")
+        for name in ["startPos", "startVelocity", "endPos", "endVelocity", "writtenPos", "stepForce"]:
+            store.addColumn(name, (3,))
+
+    def advance(self, store, rows, forceFunction = None):
+        '''Method that moves the rows on by one frame, each row only taking a step once its frame passes the end of its last one'''
+        # 1. Rows that something else has moved or pushed since the last frame (and new rows) restart from where they are
+        # 2. Rows whose frame lies past the end of their latest step take adaptive steps, each with its own step size
+        # 3. The frame's position comes from the cubic through both ends of the step, so it costs no force evaluations
+        if not hasattr(store, "stepForce"): # Added once per store, after which the columns move with its rows
+            self.prepare(store)
+        rows = obtainRows(store, rows)
+        if not len(rows):
+            return
+        if forceFunction is None:
+            forceFunction = lambda rows, pos, velocity: store.force[rows]
+        # The checks and the interpolation read and write every row each frame, so when every row is moved (as for a bunch) they take views of the columns
+        every = slice(0, store.count) if len(rows) == store.count else rows
+        moved = (store.stepLength[every] == 0) | np.any(store.pos[every] != store.writtenPos[every], axis = 1) | np.any(store.force[every] != store.stepForce[every], axis = 1)
+        self.restart(store, rows[moved])
+        pending = rows
+        while len(pending):
+            pending = pending[store.stepStart[pending] + store.stepLength[pending] < store.clock[pending] + TIME_PERIOD]
+            if len(pending):
+                self.attemptSteps(store, pending, forceFunction)
+        self.interpolate(store, every, store.clock[every] + TIME_PERIOD)
+
+    def restart(self, store, rows):
+        '''Method that starts the rows' steps again from their current position and (Verlet) velocity'''
+        velocity = (store.pos[rows] - store.oldPos[rows]) * RATE_OF_CALCULATIONS
+        store.startPos[rows] = store.pos[rows]
+        store.endPos[rows] = store.pos[rows]
+        store.startVelocity[rows] = velocity
+        store.endVelocity[rows] = velocity
+        store.stepStart[rows] = store.clock[rows]
+        store.stepLength[rows] = 0
+        store.stepForce[rows] = store.force[rows]
+        store.stepSize[rows] = np.where(store.stepSize[rows] > 0, store.stepSize[rows], TIME_PERIOD)
+
+    def attemptSteps(self, store, rows, forceFunction):
+        '''Method that tries one Dormand-Prince step per row, keeping those within tolerance and resizing every row's next step'''
+        stepSize = np.minimum(store.stepSize[rows], self.maxStep)[:, None]
+        state = np.hstack((store.endPos[rows], store.endVelocity[rows]))
+        mass = store.mass[rows, None]
+        stages = []
+        for weights in STAGE_WEIGHTS:
+            stageState = state + stepSize * sum(weight * stage for weight, stage in zip(weights, stages)) if stages else state
+            acceleration = forceFunction(rows, stageState[:, :3], stageState[:, 3:]) / mass
+            stages.append(np.hstack((stageState[:, 3:], acceleration)))
+        self.forceEvaluations += len(STAGE_WEIGHTS) * len(rows)
+        newState = state + stepSize * sum(weight * stage for weight, stage in zip(FIFTH_ORDER_WEIGHTS, stages))
+        error = stepSize * sum((fifth - fourth) * stage for fifth, fourth, stage in zip(FIFTH_ORDER_WEIGHTS, FOURTH_ORDER_WEIGHTS, stages))
+        scale = store.tolerance[rows, None] * (1 + np.maximum(np.abs(state), np.abs(newState)))
+        errorNorm = np.sqrt(np.mean((error / scale) ** 2, axis = 1))
+
+        stepSize = stepSize[:, 0]
+        accepted = (errorNorm <= 1) | (stepSize <= self.minStep)
+        kept = rows[accepted]
+        store.startPos[kept] = store.endPos[kept]
+        store.startVelocity[kept] = store.endVelocity[kept]
+        store.endPos[kept] = newState[accepted, :3]
+        store.endVelocity[kept] = newState[accepted, 3:]
+        store.stepStart[kept] += store.stepLength[kept]
+        store.stepLength[kept] = stepSize[accepted]
+        self.acceptedSteps += len(kept)
+        self.rejectedSteps += len(rows) - len(kept)
+
+        # Standard step size control, growing by at most 5x and shrinking by at most 5x per attempt
+        with np.errstate(divide = "ignore"):
+            factor = np.clip(0.9 * errorNorm ** -0.2, 0.2, 5)
+        store.stepSize[rows] = np.maximum(stepSize * factor, self.minStep)
+
+    def interpolate(self, store, rows, time):
+        '''Method that writes the rows' state at a time inside their latest step, from the cubic Hermite through its ends'''
+        length = store.stepLength[rows, None]
+        s = (time - store.stepStart[rows])[:, None] / length
+        squared, cubed = s ** 2, s ** 3
+        startPos, startVelocity = store.startPos[rows], store.startVelocity[rows]
+        endPos, endVelocity = store.endPos[rows], store.endVelocity[rows]
+        pos = (2 * cubed - 3 * squared + 1) * startPos + (cubed - 2 * squared + s) * length * startVelocity + (-2 * cubed + 3 * squared) * endPos + (cubed - squared) * length * endVelocity
+        velocity = (6 * squared - 6 * s) * (startPos - endPos) / length + (3 * squared - 4 * s + 1) * startVelocity + (3 * squared - 2 * s) * endVelocity
+        acceleration = (12 * s - 6) * (startPos - endPos) / length ** 2 + ((6 * s - 4) * startVelocity + (6 * s - 2) * endVelocity) / length
+        store.pos[rows] = pos
+        store.oldPos[rows] = pos - velocity / RATE_OF_CALCULATIONS # Keeps (pos - oldPos) * R the velocity, as the Verlet step reads it
+        store.velocity[rows] = velocity
+        store.acceleration[rows] = acceleration
+        store.momentum[rows] = store.mass[rows, None] * velocity
+        store.writtenPos[rows] = pos
+        store.clock[rows] = time
@@ -0,0 +1,66 @@
+# Hot numerical kernels, compiled with Numba when it is installed (and KERNEL_BACKEND allows it), plain NumPy otherwise
+# Compiled kernels are cached on disk next to this file, so only the first run after a change pays for compilation
+
+import numpy as np
+from constants import *
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if KERNEL_BACKEND == "numba" and numba is None:
+    raise ImportError('KERNEL_BACKEND is "numba" but Numba is not installed')
+COMPILED = numba is not None and KERNEL_BACKEND != "numpy"
+
+def verletStepLoop(pos, oldPos, velocity, acceleration, momentum, forces, mass, rows, rate):
+    '''Function that applies one Verlet step to each row, one row and axis at a time (compiled by Numba)'''
+    for n in range(rows.shape[0]):
+        row = rows[n]
+        for axis in range(3):
+            rowAcceleration = forces[n, axis] / mass[row]
+            rowVelocity = (pos[row, axis] - (oldPos[row, axis] - rowAcceleration / (rate * rate))) * rate
+            acceleration[row, axis] = rowAcceleration
+            velocity[row, axis] = rowVelocity
+            momentum[row, axis] = mass[row] * rowVelocity
+            oldPos[row, axis] = pos[row, axis]
+            pos[row, axis] += rowVelocity / rate
+
+def verletStepArrays(pos, oldPos, velocity, acceleration, momentum, forces, mass, rows, rate):
+    '''Function that applies one Verlet step to every row at once with NumPy'''
+    rowMass = mass[rows, None]
+    rowAcceleration = forces / rowMass
+    rowVelocity = (pos[rows] - (oldPos[rows] - rowAcceleration / (rate * rate))) * rate
+    acceleration[rows] = rowAcceleration
+    velocity[rows] = rowVelocity
+    momentum[rows] = rowMass * rowVelocity
+    oldPos[rows] = pos[rows]
+    pos[rows] += rowVelocity / rate
+
+def coulombForcesLoop(pos, charge, cutoffSquared, constant):
+    '''Function that sums k * q1 * q2 * r / |r|^3 over every pair closer than the cutoff, visiting each pair once (compiled by Numba)'''
+    # cutoffSquared is infinite when every pair interacts; coincident points are skipped as in the pairwise original
+    count = pos.shape[0]
+    forces = np.zeros((count, 3))
+    for i in range(count):
+        for j in range(i + 1, count):
+            dx = pos[i, 0] - pos[j, 0]
+            dy = pos[i, 1] - pos[j, 1]
+            dz = pos[i, 2] - pos[j, 2]
+            distanceSquared = dx * dx + dy * dy + dz * dz
+            if distanceSquared > 0 and distanceSquared < cutoffSquared:
+                scale = constant * charge[i] * charge[j] / (distanceSquared * np.sqrt(distanceSquared))
+                forces[i, 0] += dx * scale
+                forces[i, 1] += dy * scale
+                forces[i, 2] += dz * scale
+                forces[j, 0] -= dx * scale
+                forces[j, 1] -= dy * scale
+                forces[j, 2] -= dz * scale
+    return forces
+
+if COMPILED:
+    verletStep = numba.njit(cache = True)(verletStepLoop)
+    coulombForces = numba.njit(cache = True)(coulombForcesLoop)
+else:
+    verletStep = verletStepArrays
+    coulombForces = None # DirectSumSolver's tiled NumPy sum is used instead
@@ -0,0 +1,159 @@
+# Importer for results written in the old text format (see monteCarloSimulation.writeReadings), converting them to columnar results files
+# The text is read in large blocks cut at the last complete reading, and each field is pulled out of a whole block at once with numpy
+# (from where its lines start and end in the block's bytes), so nothing is parsed one reading, or even one line, at a time
+#
+# Every reading is seven lines:
+#
+#     Reading 1
+#     Collision Type: Higgs Production
+#     Initial Energy: 13000
+#     Rest Mass Energy: 125.3
+#     Collision Products: Higgs Boson, Top Quark, ...
+#     Higgs Probability: 0.0
+#     (blank)
+#
+# How far each text file has been imported is kept in the results file's footer, so a tail import only reads what was appended since
+
+import os
+import sys
+import numpy as np
+from constants import *
+from collisionChannels import POSSIBILITIES, PRODUCT_NAMES
+from resultsFile import ResultsWriter
+
+LINES_PER_READING = 7
+
+def obtainFields(text, starts, ends, prefix):
+    '''Function that checks every line (from its start to end in text) starts with prefix and gives the rest of each line as a row of bytes, padded with zeros'''
+    # Rows are copied out of a sliding window view of the text, one fancy index for the whole column, so no per byte indices are built
+    # (text must be followed by at least as many bytes as the longest line, see parseReadings)
+    matches = (ends - starts >= len(prefix)) & np.all(np.lib.stride_tricks.sliding_window_view(text, len(prefix))[starts] == np.frombuffer(prefix, dtype = np.uint8), axis = 1)
+    if not np.all(matches):
+        line = np.argmin(matches)
+        raise ValueError(f"Expected a line starting {prefix.decode()!r}, found {text[starts[line]:ends[line]].tobytes().decode()!r}")
+    starts = starts + len(prefix)
+    lengths = ends - starts
+    width = -(-int(lengths.max(initial = 0)) // 8) * 8 # Whole 8 byte words, so rows can be hashed a word at a time
+    if width == 0:
+        return np.zeros((len(starts), 0), dtype = np.uint8)
+    fields = np.lib.stride_tricks.sliding_window_view(text, width)[starts]
+    masks = np.where(np.arange(width) < np.arange(width + 1)[:, None], 255, 0).astype(np.uint8).view(np.uint64) # Keeps a line's first n bytes, for every n
+    fields.view(np.uint64)[...] &= masks[lengths]
+    return fields
+
+def obtainDecimals(fields, places):
+    '''Function that reads numbers written as digits with exactly places decimal places straight from the digits, or gives None if any is written otherwise'''
+    # Exact, as the nearest float to the whole number of units over 10 ** places is the nearest float to the number written
+    lengths = np.count_nonzero(fields, axis = 1)
+    columns = np.arange(fields.shape[1])
+    point = (lengths - 1 - places if places else lengths)[:, None]
+    isDigit = (fields >= ord("0")) & (fields <= ord("9"))
+    if not len(fields) or lengths.max() > 18 or lengths.min() < (places + 2 if places else 1) or not np.array_equal(isDigit | (columns == point), columns < lengths[:, None]):
+        return None
+    powers = lengths[:, None] - 1 - columns - (columns < point)
+    units = np.sum(np.where(isDigit, (fields - ord("0")).astype(np.int64) * 10 ** np.maximum(powers, 0), 0), axis = 1)
+    return units / 10 ** places if places else units
+
+def obtainNumbers(fields, dtype, places = None):
+    '''Function that reads a column of numbers, from their digits when every one has the given number of decimal places and by parsing them otherwise'''
+    numbers = obtainDecimals(fields, places) if places is not None else None
+    if numbers is not None:
+        return numbers.astype(dtype)
+    return fields.view(f"S{fields.shape[1]}").reshape(len(fields)).astype(dtype) if fields.shape[1] else np.zeros(len(fields), dtype = dtype)
+
+def obtainUnique(fields):
+    '''Function that finds the different rows of fields, as bytes, and which of them every row is, hashing the rows and then checking the hashes were enough'''
+    words = fields.view(np.uint64)
+    weights = np.random.default_rng(0).integers(1, 2 ** 63, words.shape[1], dtype = np.uint64) | 1
+    hashes = np.sum(words * weights, axis = 1, dtype = np.uint64)
+    uniqueHashes, first, inverse = np.unique(hashes, return_index = True, return_inverse = True)
+    inverse = inverse.reshape(-1)
+    if not np.array_equal(fields, fields[first[inverse]]): # Two different rows hashed the same, so fall back to comparing whole rows
+        uniqueRows, first, inverse = np.unique(fields, axis = 0, return_index = True, return_inverse = True)
+        inverse = inverse.reshape(-1)
+    return [fields[row].tobytes().rstrip(b"\0") for row in first], inverse
+
+def obtainCodes(fields, dictionary):
+    '''Function that turns a column of names into their codes in a dictionary, looking up each different name once'''
+    names, inverse = obtainUnique(fields)
+    try:
+        codes = np.array([dictionary.index(name.decode()) for name in names], dtype = np.uint8)
+    except ValueError as error:
+        raise ValueError(f"Unknown name in results text: {error}") from None
+    return codes[inverse]
+
+def obtainProducts(fields):
+    '''Function that turns a column of product lists into each reading's product count and all the products end to end as codes'''
+    uniqueLists, inverse = obtainUnique(fields)
+    try:
+        lists = [[PRODUCT_NAMES.index(name) for name in products.decode().split(", ")] if products else [] for products in uniqueLists]
+    except ValueError as error:
+        raise ValueError(f"Unknown product in results text: {error}") from None
+    counts = np.array([len(products) for products in lists], dtype = np.uint8)
+    padded = np.zeros((len(lists), max(counts, default = 0)), dtype = np.uint8)
+    for number, products in enumerate(lists):
+        padded[number, :len(products)] = products
+    return counts[inverse], padded[inverse][np.arange(padded.shape[1]) < counts[inverse][:, None]]
+
+def obtainReadingsEnd(data):
+    '''Function that finds where the last complete reading in a block of text ends, just after its blank line'''
+    blank = data.rfind(b"\n\n")
+    windowsBlank = data.rfind(b"\n\r\n")
+    return max(blank + 2 if blank >= 0 else 0, windowsBlank + 3 if windowsBlank >= 0 else 0)
+
+def parseReadings(data):
+    '''Function that parses a block of complete readings into one array per results file column'''
+    data = data.replace(b"\r\n", b"\n")
+    text = np.frombuffer(data, dtype = np.uint8)
+    ends = np.flatnonzero(text == ord("\n"))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    text = np.frombuffer(data + bytes(int((ends - starts).max(initial = 0)) + 1), dtype = np.uint8) # Padded so every line's sliding window fits
+    if len(ends) % LINES_PER_READING or np.any(ends[LINES_PER_READING - 1::LINES_PER_READING] != starts[LINES_PER_READING - 1::LINES_PER_READING]):
+        raise ValueError("Results text is not made of seven line readings")
+    field = lambda line, prefix: obtainFields(text, starts[line::LINES_PER_READING], ends[line::LINES_PER_READING], prefix)
+    productCounts, products = obtainProducts(field(4, b"Collision Products: "))
+    field(2, b"Initial Energy: ")
+    return {
+        "readingNumber": obtainNumbers(field(0, b"Reading "), np.int64, 0),
+        "channel": obtainCodes(field(1, b"Collision Type: "), POSSIBILITIES),
+        "energy": obtainNumbers(field(3, b"Rest Mass Energy: "), np.float64, 1),
+        "higgsProbability": obtainNumbers(field(5, b"Higgs Probability: "), np.float64),
+        "productCounts": productCounts,
+        "products": products}
+
+def importReadings(textPath, resultsPath, tail = False, blockBytes = IMPORT_BLOCK_BYTES):
+    '''Function that converts a text results file to a columnar results file, or with tail appends only the readings added since the last import'''
+    # A reading still being written when the import runs is left for the next tail import
+    # The offset is moved on with every block written, so if a later block fails the footer still matches the readings it holds
+    source = os.path.abspath(textPath)
+    readings = 0
+    with ResultsWriter(resultsPath, append = tail) as writer:
+        imported = writer.metadata.setdefault("imported", {})
+        offset = imported.get(source, 0)
+        with open(textPath, "rb") as file:
+            if offset: # The last import stopped just after a blank line, which is still there unless the file was replaced
+                size = file.seek(0, 2)
+                file.seek(max(offset - 3, 0))
+                if size < offset or not file.read(offset - file.tell()).replace(b"\r", b"").endswith(b"\n\n"):
+                    raise ValueError(f"{textPath} has changed since it was last imported, import it again without tail")
+            file.seek(offset)
+            remainder = b""
+            while True:
+                block = file.read(blockBytes)
+                if not block:
+                    break
+                data = remainder + block
+                end = obtainReadingsEnd(data)
+                remainder = data[end:]
+                if end:
+                    values = parseReadings(data[:end])
+                    writer.write(values)
+                    readings += len(values["readingNumber"])
+                    offset += end
+                    imported[source] = offset
+    return readings
+
+if __name__ == "__main__":
+    # python legacyImport.py testResultsFinalFinal.txt testResults.lhcr [--tail]
+    paths = [argument for argument in sys.argv[1:] if not argument.startswith("--")]
+    print(f"Imported {importReadings(paths[0], paths[1], '--tail' in sys.argv)} readings")
@@ -44,10 +44,7 @@ def getThreeDAngle(cordOne, cordTwo):
 
 def getMagnitude(cordOne, cordTwo):
     '''Method that finds the magnitude between two points'''
-    diff = [0, 0, 0]
-    for d in range(3):
-        diff[d] = cordTwo[d] - cordOne[d]
-    return math.sqrt(diff[0] ** 2 + diff[1] ** 2 + diff[2] ** 2)
+    return math.dist(cordOne[:3], cordTwo[:3])
 
 def getQuartiles(cordOne, cordTwo):
     '''Method that gets the resultant direction of motion of the point depending on the quartile'''
@@ -79,4 +76,64 @@ def findMidpoint(cordOne, cordTwo):
 def getCylinderSurfaceArea(radius, height):
     return 2 * math.pi * radius * height
 
+def getVariance(data):
+    mean = sum(data) / len(data)
+    squaredDifferences = [(value - mean) ** 2 for value in data]
+    variance = sum(squaredDifferences) / len(data)
+    return variance
+    
+def obtainNormalProbabilityDensity(parameter, mean, standardDeviation):
+    return (1 / (standardDeviation * math.sqrt(2 * math.pi))) * math.exp(-0.5 * ((parameter - mean) / standardDeviation) ** 2)
+
+def combineStatistics(countOne, meanOne, squaresOne, countTwo, meanTwo, squaresTwo):
+    '''Function that combines the count, mean and sum of squared deviations of two data sets (Chan et al.), elementwise for arrays'''
+    count = countOne + countTwo
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        share = np.where(count > 0, countTwo / np.maximum(count, 1), 0)
+    delta = meanTwo - meanOne
+    return count, meanOne + delta * share, squaresOne + squaresTwo + delta * delta * countOne * share
+
+class RunningStatistics:
+    '''Mean and variance of a stream of values in constant time and memory per value (Welford), mergeable across workers (Chan et al.)'''
+    def __init__(self, count = 0, mean = 0.0, squares = 0.0):
+        self.count = count
+        self.mean = mean
+        self.squares = squares # Sum of squared deviations from the mean
+
+    def add(self, value):
+        '''Method that takes one more value into the statistics'''
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.squares += delta * (value - self.mean)
+
+    def merge(self, other):
+        '''Method that takes every value another RunningStatistics has seen into these statistics'''
+        count, mean, squares = combineStatistics(self.count, self.mean, self.squares, other.count, other.mean, other.squares)
+        self.count, self.mean, self.squares = int(count), float(mean), float(squares)
+
+    def obtainVariance(self):
+        '''Method that finds the population variance, as getVariance does for the whole list'''
+        return self.squares / self.count
+
+    def obtainStandardDeviation(self):
+        return math.sqrt(self.obtainVariance())
+
+def getRanges(starts, ends):
+    '''Function that concatenates the integer ranges [starts[i], ends[i])'''
+    return expandRanges(starts, ends)[0]
+
+def expandRanges(starts, ends):
+    '''Function that concatenates the ranges [starts[i], ends[i]) and says which range each value came from'''
+    counts = ends - starts
+    owners = np.repeat(np.arange(len(starts)), counts)
+    return starts[owners] + np.arange(counts.sum()) - (np.cumsum(counts) - counts)[owners], owners
 
+def expandPairs(firstStarts, firstEnds, secondStarts, secondEnds):
+    '''Function that lists every (a, b) with a in [firstStarts[i], firstEnds[i]) and b in [secondStarts[i], secondEnds[i])'''
+    firstCounts = firstEnds - firstStarts
+    secondCounts = secondEnds - secondStarts
+    pairCounts = firstCounts * secondCounts
+    owners = np.repeat(np.arange(len(firstStarts)), pairCounts)
+    local = np.arange(pairCounts.sum()) - (np.cumsum(pairCounts) - pairCounts)[owners]
+    return firstStarts[owners] + local // secondCounts[owners], secondStarts[owners] + local % secondCounts[owners]
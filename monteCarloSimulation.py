@@ -1,97 +1,131 @@
-import random
+# Monte Carlo study of collision readings, sharded across a process pool
+# Every shard draws from its own stream spawned from one numpy SeedSequence, so a master seed and shard count always give the same readings
+
 import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from constants import *
+from mathematicalMethods import RunningStatistics, combineStatistics
+from collisionChannels import POSSIBILITIES, generateEvents, obtainProducts, obtainProductCodes
+from resultsFile import ResultsWriter
+from aggregations import RunAggregates
+
+INITIAL_ENERGY = 13000
+
+def obtainCounted(collisionTypes):
+    '''Function that says which readings feed the Higgs statistics, those past the resonance band as in the original serial loop'''
+    return (collisionTypes != 0) & (collisionTypes != 8)
+
+def obtainRunningStatistics(values, counted):
+    '''Function that finds the count, mean and sum of squared deviations of the counted values up to each reading, and their totals'''
+    # Running sums of the values shifted by their mean, which keeps the sum of squared deviations free of cancellation
+    runningCount = np.cumsum(counted)
+    shift = values[counted].mean() if runningCount[-1:].sum() else 0.0
+    deviations = np.where(counted, values - shift, 0)
+    runningSum = np.cumsum(deviations)
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        runningMean = np.where(runningCount > 0, shift + runningSum / runningCount, 0)
+        runningSquares = np.where(runningCount > 0, np.cumsum(deviations ** 2) - runningSum ** 2 / runningCount, 0)
+    statistics = RunningStatistics(int(runningCount[-1]), float(runningMean[-1]), float(runningSquares[-1])) if len(values) else RunningStatistics()
+    return runningCount, runningMean, runningSquares, statistics
 
-def getVariance(data):
-    mean = sum(data) / len(data)
-    squaredDifferences = [(value - mean) ** 2 for value in data]
-    variance = sum(squaredDifferences) / len(data)
-    return variance
-    
-def obtainNormalProbabilityDensity(parameter, mean, standardDeviation):
-    return (1 / (standardDeviation * math.sqrt(2 * math.pi))) * math.exp(-0.5 * ((parameter - mean) / standardDeviation) ** 2)
+def generateShard(seedSequence, count):
+    '''Function that draws one shard of readings from its own stream, along with the running statistics its Higgs probabilities need'''
+    values, collisionTypes, productCounts, charges = generateEvents(np.random.default_rng(seedSequence), count)
+    counted = obtainCounted(collisionTypes)
+    runningCount, runningMean, runningSquares, statistics = obtainRunningStatistics(values, counted)
+    aggregates = RunAggregates()
+    aggregates.add(collisionTypes, values, productCounts, obtainProductCodes(collisionTypes, charges))
+    return {
+        "values": values,
+        "charges": charges,
+        "collisionTypes": collisionTypes,
+        "productCounts": productCounts,
+        "counted": counted,
+        "runningCount": runningCount,
+        "runningMean": runningMean,
+        "runningSquares": runningSquares,
+        "statistics": statistics,
+        "aggregates": aggregates}
 
+def mergeShards(shards):
+    '''Function that joins shards in order, combining each shard's running statistics with the exact totals of the shards before it'''
+    merged = {}
+    for name in ["values", "charges", "collisionTypes", "productCounts", "counted"]:
+        merged[name] = np.concatenate([shard[name] for shard in shards])
+    statistics = RunningStatistics()
+    columns = []
+    for shard in shards:
+        columns.append(combineStatistics(statistics.count, statistics.mean, statistics.squares, shard["runningCount"], shard["runningMean"], shard["runningSquares"]))
+        statistics.merge(shard["statistics"])
+    for number, name in enumerate(["runningCount", "runningMean", "runningSquares"]):
+        merged[name] = np.concatenate([column[number] for column in columns])
+    merged["statistics"] = statistics
+    merged["aggregates"] = RunAggregates()
+    for shard in shards:
+        merged["aggregates"].merge(shard["aggregates"])
+    merged["higgsProbabilities"] = obtainHiggsProbabilities(merged)
+    return merged
 
-dataFile = open("testResultsFinalFinal.txt", "w")
-higgsProbabilities = []
+def obtainHiggsProbabilities(results, previous = 0.0):
+    '''Function that finds the probability density at 125 GeV of the normal distribution fitted to every counted reading so far'''
+    # A reading outside the counted bands repeats the last counted reading's probability, previous before there is one
+    count = results["runningCount"]
+    values = results["values"]
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        mean = results["runningMean"]
+        standardDeviation = np.sqrt(results["runningSquares"] / count)
+        density = (1 / (standardDeviation * math.sqrt(2 * math.pi))) * np.exp(-0.5 * ((125 - mean) / standardDeviation) ** 2)
+    firstReading = np.where((values <= 126) & (values >= 124), 1.0, 0.0)
+    probabilities = np.where(count > 1, density, firstReading)
+    latest = np.maximum.accumulate(np.where(results["counted"], np.arange(len(values)), -1))
+    return np.where(latest >= 0, probabilities[np.maximum(latest, 0)], previous)
 
-for i in range(1, 100001):
-    initialEnergy = 13000
-    chosenGeVValue = round(random.uniform(0.1, 10000.0), 1)
-    possibilities = ["Elastic Scattering", "Inelastic Scattering", "Deep Inelastic Scattering", "Gluon-Gluon Fusion", "Higgs Production", "Quark-Antiquark Annihilation", "Jets Formation", "Parton-Parton Scattering", "Resonance Production"]
-    collisionType = ""
-    products = []
-    if chosenGeVValue <= 2.0:
-        collisionType = possibilities[0]
-        products.append("Proton")
-        products.append("Proton")
-    elif chosenGeVValue >= 2.1 and chosenGeVValue <= 5.0:
-        collisionType = possibilities[8]
-        pionCharge = random.choice(["+", "-", "0"])
-        products.append("Baryon")
-        products.append("Neutron")
-        products.append("Proton")
-        products.append("Pion " + pionCharge)
+def runMonteCarlo(readings = MONTE_CARLO_READINGS, seed = MONTE_CARLO_SEED, workers = MONTE_CARLO_WORKERS, shards = None):
+    '''Function that generates readings across a process pool, one independent seed stream per shard'''
+    # Results only depend on the seed and the number of shards (the worker count by default), not on which process ran a shard
+    workers = workers if workers is not None else os.cpu_count()
+    shards = shards if shards is not None else workers
+    seedSequence = np.random.SeedSequence(seed)
+    counts = [readings // shards + (1 if shard < readings % shards else 0) for shard in range(shards)]
+    if workers == 1:
+        results = [generateShard(child, count) for child, count in zip(seedSequence.spawn(shards), counts)]
     else:
-        if chosenGeVValue >= 10.0 and chosenGeVValue <= 1000.0:
-            if chosenGeVValue <= 500.0:
-                if chosenGeVValue <= 30.0 and chosenGeVValue >= 20.1:
-                    collisionType = possibilities[6]
-                    products.append("Pion Jets")
-                    products.append("Kaon Jets")
-                elif chosenGeVValue >= 80.1 and chosenGeVValue <= 100:
-                    collisionType = possibilities[5]
-                    products.append("W + Boson")
-                    products.append("W - Boson")
-                    products.append("Z 0 Boson")
-                elif chosenGeVValue >= 100.1 and chosenGeVValue <= 130.0:
-                    if chosenGeVValue >= 124.0 and chosenGeVValue <= 126.0:
-                        collisionType = possibilities[4]
-                        products.append("Higgs Boson")
-                        products.append("Top Quark")
-                        products.append("Antitop Quark")
-                        products.append("Photon")
-                        products.append("Z Boson")
-                        products.append("W Boson")
-                        products.append("Bottom Quark")
-                        products.append("Tau Lepton")
-                    else:
-                        collisionType = possibilities[3]
-                        products.append("Top Quark")
-                        products.append("Antitop Quark")
-                else:
-                    collisionType = possibilities[2]
-                    pionCharge = random.choice(["+", "-", "0"])
-                    kaonCharge = random.choice(["+", "-", "0"])
-                    products.append("Pion " + pionCharge)
-                    products.append("Kaon " + kaonCharge)
-                    products.append("Neutrino")
-                    products.append("Lepton")
-            else:
-                collisionType = possibilities[1]
-                products.append("Pion +")
-                products.append("Pion -")
-                products.append("Pion 0")
-                products.append("Kaon +")
-                products.append("Kaon -")
-                products.append("Kaon 0")
-        else:
-            collisionType = possibilities[7]
-            products.append("Baryon Jet")
-            products.append("Meson Jet")
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(generateShard, seedSequence.spawn(shards), counts))
+    merged = mergeShards(results)
+    merged["seed"] = seedSequence.entropy # Reproduces an unseeded run when passed back in
+    return merged
 
-        higgsProbabilities.append(chosenGeVValue)
-        meanData = sum(higgsProbabilities) / len(higgsProbabilities)
-        standardDeviationData = 0.0
-        if len(higgsProbabilities) > 1:
-            standardDeviationData = math.sqrt(getVariance(higgsProbabilities))
-            higgsProbability = obtainNormalProbabilityDensity(125, meanData, standardDeviationData)
-        else:
-            higgsProbability = 1.0 if chosenGeVValue <= 126 and chosenGeVValue >= 124 else 0.0
-    
-    dataFile.write("Reading " + str(i) + "\n")
-    dataFile.write("Collision Type: " + collisionType + "\n")
-    dataFile.write("Initial Energy: " + str(initialEnergy) + "\n")
-    dataFile.write("Rest Mass Energy: " + str(chosenGeVValue) + "\n")
-    dataFile.write("Collision Products: " + ", ".join(products) + "\n")
-    dataFile.write("Higgs Probability: " + str(higgsProbability) + "\n\n")
-    
+def writeResults(results, path, firstReading = 1):
+    '''Function that writes the readings to a columnar results file (see resultsFile.py)'''
+    with ResultsWriter(path) as writer:
+        writer.write({
+            "readingNumber": firstReading + np.arange(len(results["values"])),
+            "channel": results["collisionTypes"],
+            "energy": results["values"],
+            "higgsProbability": results["higgsProbabilities"],
+            "productCounts": results["productCounts"],
+            "products": obtainProductCodes(results["collisionTypes"], results["charges"])})
+
+def writeReadings(results, path):
+    '''Function that writes the readings in the text format the serial study produced'''
+    with open(path, "w") as dataFile:
+        for i, (value, collisionType, charges, higgsProbability) in enumerate(zip(results["values"].tolist(), results["collisionTypes"].tolist(), results["charges"].tolist(), results["higgsProbabilities"].tolist()), 1):
+            dataFile.write("Reading " + str(i) + "\n")
+            dataFile.write("Collision Type: " + POSSIBILITIES[collisionType] + "\n")
+            dataFile.write("Initial Energy: " + str(INITIAL_ENERGY) + "\n")
+            dataFile.write("Rest Mass Energy: " + str(value) + "\n")
+            dataFile.write("Collision Products: " + ", ".join(obtainProducts(collisionType, *charges)) + "\n")
+            dataFile.write("Higgs Probability: " + str(higgsProbability) + "\n\n")
+
+if __name__ == "__main__":
+    results = runMonteCarlo()
+    if "--text" in sys.argv:
+        writeReadings(results, "testResultsFinalFinal.txt")
+    else:
+        writeResults(results, "testResults.lhcr")
+    results["aggregates"].save("testResults.aggregates")
+    print(f"Seed: {results['seed']}")
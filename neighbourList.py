@@ -0,0 +1,59 @@
+# Verlet neighbour lists, so pair queries reuse last frame's pairs instead of rechecking every pair
+# The list holds every pair within cutoff + skin and is only rebuilt once some point has moved more than half the skin
+
+import numpy as np
+from constants import *
+from spatialHash import SpatialHash
+
+class NeighbourList:
+    def __init__(self, cutoff, skin = NEIGHBOUR_LIST_SKIN):
+        self.cutoff = cutoff
+        self.skin = skin
+        self.grid = SpatialHash()
+        self.referencePos = None # Positions when the list was last built
+        self.pos = None # Positions given to the latest update
+        self.first = np.zeros(0, dtype = int)
+        self.second = np.zeros(0, dtype = int)
+        self.rebuilds = 0
+
+    def update(self, positions):
+        '''Method that takes this frame's positions and rebuilds the list only when it may have gone stale'''
+        # Two points each moving half the skin towards each other can close the whole skin, so beyond that a pair could be missed
+        self.pos = np.array(positions, dtype = float)
+        if self.referencePos is None or len(self.referencePos) != len(self.pos):
+            self.build()
+        elif len(self.pos) and np.einsum("ij,ij->i", self.pos - self.referencePos, self.pos - self.referencePos).max() > (self.skin / 2) ** 2:
+            self.build()
+
+    def build(self):
+        '''Method that lists every pair of points within cutoff + skin of each other'''
+        reach = self.cutoff + self.skin
+        first, second = self.grid.obtainCandidatePairs(self.pos, reach)
+        separation = self.pos[second] - self.pos[first]
+        within = np.einsum("ij,ij->i", separation, separation) < reach ** 2
+        # The lower index always comes first, so a pair reads the same way however the grid found it
+        self.first = np.minimum(first[within], second[within])
+        self.second = np.maximum(first[within], second[within])
+        self.referencePos = self.pos.copy()
+        self.rebuilds += 1
+
+    def obtainPairs(self, maxDistance = None):
+        '''Method that returns the pairs (first, second, distance) currently closer than maxDistance (the cutoff by default)'''
+        if maxDistance is None:
+            maxDistance = self.cutoff
+        separation = self.pos[self.second] - self.pos[self.first]
+        distance = np.sqrt(np.einsum("ij,ij->i", separation, separation))
+        closer = distance < min(maxDistance, self.cutoff)
+        return self.first[closer], self.second[closer], distance[closer]
+
+    def anyPairCloser(self, distance):
+        '''Method that says whether any pair of points is closer than the distance given'''
+        return len(self.obtainPairs(distance)[0]) > 0
+
+    def obtainClosestPair(self, maxDistance = None):
+        '''Method that returns the closest pair (first, second, distance) closer than maxDistance, or None'''
+        first, second, distance = self.obtainPairs(maxDistance)
+        if not len(first):
+            return None
+        closest = np.argmin(distance)
+        return int(first[closest]), int(second[closest]), float(distance[closest])
@@ -0,0 +1,255 @@
+# Structure-of-arrays particle store that every point in the simulation is a view into
+# A forked store shares its columns with the store it came from until one of them writes, so every method that writes columns
+# (and anything else writing them directly, e.g. PhysicsEngine.update and Bunch.update) calls detach first with the columns it writes
+# Sharing is column by column: a write copies only the columns written, and reading a shared column copies nothing (a point's view
+# of a shared row is read only, so it is written through its property's setter instead)
+
+import copy
+import math
+import weakref
+import numpy as np
+import kernels
+from constants import *
+
+VERLET_COLUMNS = ["pos", "oldPos", "velocity", "acceleration", "momentum"] # Columns a Verlet step writes
+
+class ParticleArray:
+    def __init__(self, capacity = 64):
+        self.count = 0
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 3))
+        self.oldPos = np.zeros((capacity, 3))
+        self.velocity = np.zeros((capacity, 3))
+        self.acceleration = np.zeros((capacity, 3))
+        self.momentum = np.zeros((capacity, 3))
+        self.force = np.zeros((capacity, 3))
+        self.mass = np.zeros(capacity)
+        self.charge = np.zeros(capacity)
+        self.radius = np.zeros(capacity)
+        self.integrated = np.zeros(capacity, dtype = bool) # Rows advanced by the batched Verlet kernel
+        self.stepSize = np.zeros(capacity) # Step an adaptive integrator will try next for each row, 0 until one is chosen
+        self.tolerance = np.zeros(capacity) # Error each adaptive step of a row may make, relative to the size of its state
+        self.extraColumnNames = [] # Columns added later, e.g. the step state of an adaptive integrator
+        self.owners = [] # The point object viewing each row, kept so rows can be compacted on removal
+        self.sharers = {} # Column name: stores sharing that column since a fork, a name being dropped once this store has its own copy
+
+    def fork(self):
+        '''Method that makes a store with the same rows and no owners, sharing these columns until either store writes to them'''
+        for name in self.columnNames():
+            if name not in self.sharers:
+                self.sharers[name] = weakref.WeakSet([self])
+        branch = copy.copy(self)
+        branch.extraColumnNames = list(self.extraColumnNames)
+        branch.owners = [None] * self.count
+        branch.sharers = dict(self.sharers)
+        for sharers in self.sharers.values():
+            sharers.add(branch)
+        return branch
+
+    def detach(self, names = None):
+        '''Method that gives the store its own copy of the named columns it shares (every column by default), unless every other sharer has already gone'''
+        for name in list(self.sharers) if names is None else names:
+            sharers = self.sharers.pop(name, None)
+            if sharers is None:
+                continue
+            sharers.discard(self)
+            if len(sharers):
+                setattr(self, name, getattr(self, name).copy())
+
+    def stopSharing(self):
+        '''Method that leaves every sharing group without copying, for a store about to replace all of its columns'''
+        for sharers in self.sharers.values():
+            sharers.discard(self)
+        self.sharers = {}
+
+    def add(self, owner, pos, initialVelocity, initialForce, mass, charge, radius):
+        '''Method that appends a particle to the store and returns its row index'''
+        self.detach()
+        if self.count == self.capacity:
+            self.grow()
+        index = self.count
+        self.pos[index] = pos
+        self.oldPos[index] = self.pos[index] - initialVelocity
+        self.velocity[index] = 0
+        self.acceleration[index] = 0
+        self.momentum[index] = 0
+        self.force[index] = initialForce
+        self.mass[index] = mass
+        self.charge[index] = charge
+        self.radius[index] = radius
+        self.integrated[index] = True
+        self.stepSize[index] = 0
+        self.tolerance[index] = INTEGRATOR_TOLERANCE
+        for name in self.extraColumnNames:
+            getattr(self, name)[index] = 0
+        self.owners.append(owner)
+        self.count += 1
+        return index
+
+    def addMany(self, pos, initialVelocity, initialForce, mass, charge, radius):
+        '''Method that appends a block of ownerless rows at once (mass, charge and radius may be arrays or scalars) and returns their indices'''
+        self.detach()
+        pos = np.asarray(pos, dtype = float)
+        count = len(pos)
+        while self.count + count > self.capacity:
+            self.grow()
+        rows = np.arange(self.count, self.count + count)
+        for name in self.columnNames():
+            getattr(self, name)[rows] = 0
+        self.pos[rows] = pos
+        self.oldPos[rows] = pos - initialVelocity
+        self.force[rows] = initialForce
+        self.mass[rows] = mass
+        self.charge[rows] = charge
+        self.radius[rows] = radius
+        self.integrated[rows] = True
+        self.tolerance[rows] = INTEGRATOR_TOLERANCE
+        self.owners.extend([None] * count)
+        self.count += count
+        return rows
+
+    def compact(self, keep):
+        '''Method that removes every row whose keep flag is False in one pass, keeping the order of the rest'''
+        kept = np.flatnonzero(keep[:self.count])
+        if len(kept) == self.count:
+            return
+        self.detach()
+        for column in self.columns():
+            column[:len(kept)] = column[kept]
+        for index in np.flatnonzero(~keep[:self.count]):
+            if self.owners[index] is not None:
+                self.owners[index].index = None
+        self.owners = [self.owners[index] for index in kept]
+        for index, owner in enumerate(self.owners):
+            if owner is not None:
+                owner.index = index
+        self.count = len(kept)
+
+    def remove(self, index):
+        '''Method that removes a row by moving the last row into its place'''
+        last = self.count - 1
+        if index != last:
+            self.detach()
+            for column in self.columns():
+                column[index] = column[last]
+            self.owners[index] = self.owners[last]
+            if self.owners[index] is not None:
+                self.owners[index].index = index
+        self.owners.pop()
+        self.count -= 1
+
+    def clear(self):
+        '''Method that removes every row from the store'''
+        for owner in self.owners:
+            if owner is not None:
+                owner.index = None
+        self.owners = []
+        self.count = 0
+        # Nothing needs copying when every row is going, the next rows are written to new columns
+        shared = list(self.sharers)
+        self.stopSharing()
+        for name in shared:
+            setattr(self, name, np.zeros_like(getattr(self, name)))
+
+    def grow(self):
+        '''Method that doubles the capacity of every column'''
+        self.stopSharing() # Every column is replaced by a new one
+        self.capacity *= 2
+        for name in self.columnNames():
+            column = getattr(self, name)
+            newColumn = np.zeros((self.capacity,) + column.shape[1:], dtype = column.dtype)
+            newColumn[:self.count] = column[:self.count]
+            setattr(self, name, newColumn)
+
+    def addColumn(self, name, shape = (), dtype = float):
+        '''Method that adds a zeroed column, which then moves with its rows like the built in ones'''
+        if name not in self.columnNames():
+            setattr(self, name, np.zeros((self.capacity,) + shape, dtype = dtype))
+            self.extraColumnNames.append(name)
+
+    def columnNames(self):
+        return ["pos", "oldPos", "velocity", "acceleration", "momentum", "force", "mass", "charge", "radius", "integrated", "stepSize", "tolerance"] + self.extraColumnNames
+
+    def columns(self):
+        return [getattr(self, name) for name in self.columnNames()]
+
+    def verletStep(self, rows = None, forces = None):
+        '''Method that advances the selected rows (all rows by default) by one Verlet step, under forces if given or else the force column'''
+        # Same scheme as Point.enableNewtonianMechanics, applied to every selected row at once
+        # rows may be a row index, a slice or a boolean mask over the first self.count rows
+        self.detach(VERLET_COLUMNS)
+        if rows is None:
+            rows = np.arange(self.count)
+        elif isinstance(rows, slice):
+            rows = np.arange(self.count)[rows]
+        elif isinstance(rows, np.ndarray) and rows.dtype == bool:
+            rows = np.flatnonzero(rows[:self.count])
+        else:
+            rows = np.atleast_1d(rows)
+        forces = self.force[rows] if forces is None else np.asarray(forces, dtype = float).reshape(len(rows), 3)
+        kernels.verletStep(self.pos, self.oldPos, self.velocity, self.acceleration, self.momentum, forces, self.mass, rows, RATE_OF_CALCULATIONS)
+
+    def advanceConstantForce(self, index, ticks):
+        '''Method that applies ticks Verlet steps to one row in closed form, valid while its force does not change'''
+        # Every step adds acceleration / R^2 to the displacement, so after n steps pos = pos + n * d + kick * n(n + 1) / 2
+        if ticks <= 0:
+            return
+        self.detach(VERLET_COLUMNS)
+        acceleration = self.force[index] / self.mass[index]
+        kick = acceleration / (RATE_OF_CALCULATIONS ** 2)
+        displacement = self.pos[index] - self.oldPos[index]
+        lastDisplacement = displacement + ticks * kick
+        self.pos[index] += ticks * displacement + kick * (ticks * (ticks + 1) / 2)
+        self.oldPos[index] = self.pos[index] - lastDisplacement
+        self.acceleration[index] = acceleration
+        self.velocity[index] = lastDisplacement * RATE_OF_CALCULATIONS
+        self.momentum[index] = self.mass[index] * self.velocity[index]
+
+    def obtainConstantForceCrossing(self, index, axis, boundary, below = True):
+        '''Method that finds the first constant-force Verlet step that leaves a row below (or above) a boundary on one axis, None if none does'''
+        # The coordinate after n steps is a quadratic in n, so the crossing is read off its roots instead of stepping
+        side = 1 if below else -1
+        kick = self.force[index, axis] / self.mass[index] / (RATE_OF_CALCULATIONS ** 2)
+        displacement = self.pos[index, axis] - self.oldPos[index, axis]
+        a = side * kick / 2
+        b = side * (displacement + kick / 2)
+        c = side * (self.pos[index, axis] - boundary)
+        beyond = lambda n: a * n * n + b * n + c < 0
+        if a == 0:
+            if b == 0:
+                first = 1 if c < 0 else None
+            elif b < 0:
+                first = max(1, math.floor(-c / b) + 1)
+            else:
+                first = 1 if beyond(1) else None
+        else:
+            discriminant = b * b - 4 * a * c
+            if discriminant < 0:
+                first = 1 if a < 0 else None
+            else:
+                roots = sorted([(-b - math.sqrt(discriminant)) / (2 * a), (-b + math.sqrt(discriminant)) / (2 * a)])
+                if a > 0:
+                    first = max(1, math.floor(roots[0]) + 1)
+                    first = first if first < roots[1] else None
+                else:
+                    first = 1 if 1 < roots[0] else max(1, math.floor(roots[1]) + 1)
+        if first is None:
+            return None
+        # Rounding can put the root a step late, and an early answer is always safe
+        while first > 1 and beyond(first - 1):
+            first -= 1
+        return first
+
+def storeColumn(name):
+    '''Returns a property that views an owner's row of the named ParticleArray column'''
+    def getter(self):
+        # A row of a shared column is handed out read only, so writing it in place fails rather than changing every sharer's row
+        value = getattr(self.store, name)[self.index]
+        if name in self.store.sharers and isinstance(value, np.ndarray):
+            value = value.view()
+            value.flags.writeable = False
+        return value
+    def setter(self, value):
+        self.store.detach([name])
+        getattr(self.store, name)[self.index] = value
+    return property(getter, setter)
@@ -0,0 +1,483 @@
+# Headless particle classes; scene nodes are attached by a renderer observing the physics engine
+
+from constants import *
+from mathematicalMethods import *
+import math
+from particleArray import ParticleArray, storeColumn
+from ringTransport import RingOrbit
+from tracing import tracer, TRACE_DEBUG
+
+# Points
+
+class Point:
+    store = ParticleArray() # Default structure-of-arrays backing store, so every point can be stepped in one call
+
+    def __init__(self, pos, colour, radius, initialVelocity, initialForce, charge = 0, store = None):
+        if store is not None:
+            self.store = store # e.g. a PhysicsEngine's own store
+        self.object = None # Scene node, attached by a renderer if one is observing
+        self.colour = colour
+        self.index = self.store.add(self, pos, initialVelocity, initialForce, SIMULATED_PROTON_MASS, charge, radius)
+        self.volume = 4/3 * math.pi * ((self.radius) ** 3)
+        self.density = self.mass / self.volume
+        self.electroMagneticForce = [0, 0, 0]
+        self.terminal = None
+
+    # Views into the backing store
+    pos = storeColumn("pos")
+    oldPos = storeColumn("oldPos")
+    velocity = storeColumn("velocity")
+    acceleration = storeColumn("acceleration")
+    momentum = storeColumn("momentum")
+    force = storeColumn("force")
+    mass = storeColumn("mass")
+    radius = storeColumn("radius")
+    integrated = storeColumn("integrated")
+    tolerance = storeColumn("tolerance") # Per point error control for the adaptive integrator
+        
+    def enablePhysics(self):
+        '''Method that enables the point's physics'''
+        self.enableNewtonianMechanics()
+
+    def enableNewtonianMechanics(self):
+        '''Method that moves the point using the calculated resultant force'''
+        # Basic Newtonian Mechanics (Kinematics, Dynamics, Verlet Integration)
+        # 1. Obtain acceleration by F = ma
+        # 2. Obtain velocity by difference in pos and old pos over time
+        # 3. Update pos based on s = vt
+        # 4. Don't change position directly, change velocity so use oldPos (which is a record of the position of the proton before the frame) -- Analogy: A slingshot; the further you pull the ball back, the higher the velocity of projection
+        # The kernel lives in ParticleArray.verletStep so that PhysicsEngine.update can step every point at once
+        self.store.verletStep(self.index)
+        
+    def draw(self):
+        '''Method that draws the point'''
+        self.object.setPosition(self.pos.tolist())
+        self.object.color((self.colour))
+        self.object.setScale((self.radius, self.radius, self.radius)) # Allows changing of sphere orientation
+
+    def remove(self):
+        '''Method that removes the point from the scene and from the backing store'''
+        if self.object is not None:
+            self.object.remove()
+            self.object = None
+        self.store.remove(self.index)
+        self.index = None
+
+
+class HydrogenAtom(Point):
+    def __init__(self, pos, radius, initialVelocity, initialForce, store = None):
+        super().__init__(pos, RED, radius, initialVelocity, initialForce, SIMULATED_PROTON_CHARGE, store)
+        self.electroMagneticForce = [0, 0, 0]
+        self.startedCircularMotion = False
+        self.velocity = initialVelocity
+
+    def enablePhysics(self):
+        '''Method that enables the hydrogen atom's physics'''
+        self.enableNewtonianMechanics()
+
+    def enableNewtonianMechanics(self):
+        '''Method that moves the point using the calculated resultant force'''
+        super().enableNewtonianMechanics()
+        
+    def numericalCircularMotion(self, centre, radius, initialVelocity = None):
+        '''Method that manages circular motion in the booster ring and the actual collider using a numerical method'''
+        # 1. Calculate angular velocity from the starting velocity and the orbital radius
+        # 2. Calculate the new angle based on the angular velocity and adjust the point's position
+        self.orbitalCentre = centre
+        self.orbitalRadius = radius
+        if initialVelocity is not None:
+            self.speed = getMagnitude(ORIGIN, initialVelocity)
+            self.angularVelocity = self.speed / self.orbitalRadius
+            self.changeInAngle = -self.angularVelocity / RATE_OF_CALCULATIONS
+            
+        currentAngle = getTwoDAngle(self.orbitalCentre, self.pos)
+        newAngle = currentAngle + self.changeInAngle
+        if newAngle > (2 * math.pi):
+            newAngle = newAngle - (math.pi * 2)
+        if tracer.level <= TRACE_DEBUG:
+            tracer.record(TRACE_DEBUG, "hydrogen.circularMotion", "Pos: %s, current angle: %s, new angle: %s", self.pos, currentAngle, newAngle)
+        newPos = [self.orbitalCentre[0] + self.orbitalRadius * math.cos(newAngle), self.orbitalCentre[1], self.orbitalCentre[2] + self.orbitalRadius * math.sin(newAngle)]
+        self.pos = newPos
+        
+    def draw(self):
+        '''Method that draws the hydrogen atom'''
+        super().draw()
+
+
+class Proton(Point):
+    def __init__(self, pos, radius, initialVelocity, initialForce, boosterRing, collider, store = None):
+        super().__init__(pos, PURPLE, radius, initialVelocity, initialForce, SIMULATED_PROTON_CHARGE, store)
+        self.initialForce = initialForce
+        self.charge = SIMULATED_PROTON_CHARGE
+        self.boosterRing = boosterRing
+        self.speed = 0
+        self.completedLINAC = False
+        self.collider = collider
+        self.electroMagneticForce = [0, 0, 0]
+        self.boosting = False
+        self.deflectionDirection = None
+        self.passingThroughTube = False
+        self.completedTube = False
+        self.goingThroughCollider = False
+        self.collided = False
+        self.teleport = False
+        self.orbitingRing = False
+        self.boosted = False
+        self.passingThroughConnectionTube = False
+        self.goingThroughCollider = False
+        self.endBoostZCord = -131
+        self.orbitalCentre = None
+        self.orbitalRadius = None
+        self.phase = None # Azimuthal phase while on a ring's arc, None until the proton joins one
+
+    def enablePhysics(self):
+        '''Method that enables the hydrogen atom's physics'''
+        if self.teleport:
+            self.speed = getMagnitude(ORIGIN, self.velocity)
+            if self.speed >= 2500:
+                self.boosted = True
+            else:
+                self.boosted = False
+            if self.boosted:
+                if not self.goingThroughCollider:
+                    if self.passingThroughConnectionTube:
+                        self.enterMainCollider()
+                    else:
+                        if abs(self.pos[2] - self.endBoostZCord) < 5:
+                            self.passingThroughConnectionTube = True
+                            if self.endBoostZCord == -69:
+                                self.pos = [-31, 8, -69]
+                            else:
+                                self.pos = [-31, 8, -131]
+                        else:
+                            self.moveThroughBoosterRing()
+                else:
+                    self.moveThroughCollider()
+            else:
+                self.moveThroughBoosterRing()
+        else:
+            self.enableNewtonianMechanics()
+            
+    def moveThroughBoosterRing(self):
+        '''Method that moves the proton through the booster ring'''
+        if self.pos[2] <= -95 and self.pos[2] >= -105 and self.pos[0] >= -3 and self.pos[0] <= 3:
+            inAccelerator = True
+        else:
+            inAccelerator = False
+        if not self.orbitingRing:
+            if self.pos[1] < 6.5 and self.pos[0] > -0.004:
+                self.adjustAxesForBoosterRing(self.pos)
+            else:
+                self.orbitingRing = True
+        else:
+            if inAccelerator:
+                eForce = self.boosterRing.obtainSynchrotronElectricField()
+                eAcceleration = (eForce / self.mass)
+                eSpeed = -self.speed + eAcceleration * (TIME_PERIOD)
+                zDisplacement = eSpeed * (TIME_PERIOD)
+                newZ = self.pos[2] + zDisplacement
+                self.pos[2] = newZ
+                self.acceleration = [0, 0, eAcceleration]
+                self.velocity = [0, 0, eSpeed]
+                self.phase = None # Off the arc, so the phase is recovered from the position on rejoining it
+            else:
+                self.numericalCircularMotion(self.boosterRing.pos, 31, "c")
+                
+    def moveThroughCollider(self):
+        if self.pos[2] <= -313 and self.pos[2] >= -327 and self.pos[0] >= -25 and self.pos[0] <= 25:
+            acceleratingInCollider = True
+        else:
+            acceleratingInCollider = False
+        if acceleratingInCollider:
+            self.phase = None # Off the arc, so the phase is recovered from the position on rejoining it
+            eForce = self.collider.obtainColliderElectricField()
+            eAcceleration = (eForce / self.mass)
+            if self.endBoostZCord == -69:
+                eSpeed = -self.speed + eAcceleration * (TIME_PERIOD)
+                xDisplacement = eSpeed * (TIME_PERIOD)
+                newX = self.pos[0] + xDisplacement
+                self.pos[0] = newX
+                self.acceleration = [eAcceleration, 0, 0]
+                self.velocity = [eSpeed, 0, 0]
+            else:
+                eSpeed = -self.speed + eAcceleration * (TIME_PERIOD)
+                xDisplacement = abs(eSpeed * (TIME_PERIOD))
+                newX = self.pos[0] + xDisplacement
+                self.pos[0] = newX
+                self.acceleration = [eAcceleration, 0, 0]
+                self.velocity = [eSpeed, 0, 0]
+                
+        else:
+            if self.endBoostZCord == -69:
+                self.numericalCircularMotion(self.collider.pos, 142, "c")
+            else:
+                self.numericalCircularMotion(self.collider.pos, 138, "a")
+                
+    def enterMainCollider(self):
+        '''Method that moves the proton through the connection tubes'''
+        if self.endBoostZCord == -69:
+            xDisplacement = self.speed * (TIME_PERIOD)
+            newX = self.pos[0] + xDisplacement
+            if newX > 100:
+                self.passingThroughConnectionTube = False
+                self.goingThroughCollider = True
+                if tracer.level <= TRACE_DEBUG:
+                    tracer.record(TRACE_DEBUG, "proton.collider", "Entering the collider at %s, speed: %s", self.pos, self.speed)
+            else:
+                self.pos[0] = newX
+        else:
+            xDisplacement = self.speed * (TIME_PERIOD)
+            newX = self.pos[0] - xDisplacement
+            if newX < -134:
+                self.passingThroughConnectionTube = False
+                self.goingThroughCollider = True
+                if tracer.level <= TRACE_DEBUG:
+                    tracer.record(TRACE_DEBUG, "proton.collider", "Entering the collider at %s, speed: %s", self.pos, self.speed)
+            else:
+                self.pos[0] = newX
+        
+
+    def enableNewtonianMechanics(self):
+        '''Method that moves the point using the calculated resultant force'''
+        super().enableNewtonianMechanics()
+        
+    def numericalCircularMotion(self, centre, radius, direction, initialSpeed = None, ticks = 1):
+        '''Method that manages circular motion in the booster ring and the actual collider by carrying the phase forward'''
+        # 1. Recover the phase from the position only when the proton joins an arc, after that the stored phase is stepped
+        # 2. Calculate angular velocity from the speed and the orbital radius, then rebuild the position from the phase
+        self.phase = self.obtainArcPhase(centre, radius)
+        self.orbitalCentre = centre
+        self.orbitalRadius = radius
+        if tracer.level <= TRACE_DEBUG:
+            tracer.record(TRACE_DEBUG, "proton.speed", "Speed: %s", self.speed)
+        self.angularVelocity = self.speed / self.orbitalRadius
+        if direction == "c":
+            self.changeInAngle = -self.angularVelocity / RATE_OF_CALCULATIONS
+        elif direction == "a":
+            self.changeInAngle = self.angularVelocity / RATE_OF_CALCULATIONS
+        self.phase = (self.phase + ticks * self.changeInAngle) % (2 * math.pi)
+        self.pos = [self.orbitalCentre[0] + self.orbitalRadius * math.cos(self.phase), self.orbitalCentre[1], self.orbitalCentre[2] + self.orbitalRadius * math.sin(self.phase)]
+
+    def obtainArcPhase(self, centre, radius):
+        '''Method that finds the phase the next arc tick starts from'''
+        if self.phase is None or centre is not self.orbitalCentre or radius != self.orbitalRadius:
+            return getTwoDAngle(centre, self.pos)
+        return self.phase
+
+    def obtainUniformTicks(self):
+        '''Method that counts the coming ticks that only repeat the proton's current motion, None if that goes on for ever'''
+        # The tick after them is an event (an accelerator gap, the end of the connection tube or a change of stage) and must be run in full
+        if not self.teleport:
+            return 0 # Newtonian motion, PhysicsEngine.obtainUniformTicks knows where the LINAC ends
+        speed = getMagnitude(ORIGIN, self.velocity)
+        if speed != self.speed or self.boosted != (speed >= 2500):
+            return 0 # The next tick refreshes the speed and whether the proton is boosted
+        if self.boosted and self.passingThroughConnectionTube and not self.goingThroughCollider:
+            step = self.speed * TIME_PERIOD
+            room = (100 - self.pos[0]) if self.endBoostZCord == -69 else (self.pos[0] + 134)
+            return max(0, math.floor(room / step) - 1) # One tick short, so rounding can never carry it past the end of the tube
+        if self.boosted and self.goingThroughCollider:
+            boxes = [self.obtainGapBox(self.collider.electricAccelerator)]
+        elif self.orbitingRing and not self.goingThroughCollider and not self.passingThroughConnectionTube:
+            boxes = [self.obtainGapBox(self.boosterRing.electricAccelerator)]
+            if self.boosted:
+                boxes.append(((-math.inf, math.inf), (self.endBoostZCord - 5, self.endBoostZCord + 5))) # Where it leaves for the connection tube
+        else:
+            return 0
+        inside = lambda pos: any(xRange[0] <= pos[0] <= xRange[1] and zRange[0] <= pos[2] <= zRange[1] for xRange, zRange in boxes)
+        if inside(self.pos) or self.speed == 0:
+            return 0
+        orbit = self.obtainRingOrbit()
+        phase = self.obtainArcPhase(orbit.centre, orbit.radius)
+        changeInAngle = orbit.direction * (self.speed / orbit.radius) / RATE_OF_CALCULATIONS
+        ticks = orbit.obtainTicksToEnter(phase, changeInAngle, [interval for xRange, zRange in boxes for interval in orbit.obtainBoxPhases(xRange, zRange)])
+        if ticks is None:
+            return None
+        # Landing a tick early is always safe, landing late would skip the event
+        while ticks > 1 and inside(orbit.obtainPosition((phase + (ticks - 1) * changeInAngle) % (2 * math.pi))):
+            ticks -= 1
+        return ticks
+
+    def skipUniformTicks(self, ticks):
+        '''Method that applies a number of uniform ticks in closed form'''
+        if ticks <= 0:
+            return
+        if self.passingThroughConnectionTube and not self.goingThroughCollider:
+            step = self.speed * TIME_PERIOD
+            self.pos[0] += ticks * step if self.endBoostZCord == -69 else -ticks * step
+        else:
+            orbit = self.obtainRingOrbit()
+            self.numericalCircularMotion(orbit.centre, orbit.radius, "c" if orbit.direction < 0 else "a", ticks = ticks)
+
+    def obtainGapBox(self, section):
+        '''Method that finds the x and z ranges of an accelerator cuboid, the same bounds moveThroughBoosterRing and moveThroughCollider test'''
+        return ((section.pos[0] - section.size[0] / 2, section.pos[0] + section.size[0] / 2), (section.pos[2] - section.size[2] / 2, section.pos[2] + section.size[2] / 2))
+
+    def obtainRingOrbit(self):
+        '''Method that describes the orbit the proton is going round, the same radii and directions moveThroughBoosterRing and moveThroughCollider use'''
+        if self.goingThroughCollider:
+            if self.endBoostZCord == -69:
+                return RingOrbit(self.collider.pos, 142, "c", self.collider.electricAccelerator, self.collider.obtainColliderElectricField(), 0, False)
+            return RingOrbit(self.collider.pos, 138, "a", self.collider.electricAccelerator, self.collider.obtainColliderElectricField(), 0, True)
+        return RingOrbit(self.boosterRing.pos, 31, "c", self.boosterRing.electricAccelerator, self.boosterRing.obtainSynchrotronElectricField(), 2, False)
+
+    def advanceRing(self, ticks = 0, turns = 0):
+        '''Method that fast-forwards the proton round its ring by whole turns and then ticks, returning the kinetic energy gained'''
+        # The same motion as ticking moveThroughBoosterRing or moveThroughCollider, accelerator passes included (see RingOrbit.advance),
+        # at a cost that grows with the accelerator passes rather than the ticks. It stays on the ring, never taking the exit to the collider
+        orbit = self.obtainRingOrbit()
+        self.speed = getMagnitude(ORIGIN, self.velocity)
+        startSpeed = self.speed
+        phase = self.phase if self.phase is not None and self.orbitalCentre is orbit.centre and self.orbitalRadius == orbit.radius else None
+        pos = self.pos.tolist()
+        velocity = self.velocity.tolist()
+        if turns > 0:
+            pos, velocity, phase, passes, taken = orbit.advance(pos, phase, self.speed, self.mass, angle = 2 * math.pi * turns)
+        if ticks > 0:
+            pos, velocity, phase, passes, taken = orbit.advance(pos, phase, getMagnitude(ORIGIN, velocity), self.mass, ticks = ticks)
+        self.orbitalCentre = orbit.centre
+        self.orbitalRadius = orbit.radius
+        self.phase = phase
+        self.pos = pos
+        self.velocity = velocity # enablePhysics reads the speed back from the velocity
+        self.speed = getMagnitude(ORIGIN, velocity)
+        self.orbitingRing = True
+        return 0.5 * self.mass * (self.speed ** 2 - startSpeed ** 2)
+
+    def adjustAxesForBoosterRing(self, currentPos):
+        newPos = currentPos
+        if currentPos[1] != 6.5:
+            newPos[1] += 1.5 / 7
+        if currentPos[0] != -0.004:
+            newPos[0] -= 0.004 / 7
+        
+        newPos[2] -= 5 / 7
+            
+        self.pos = newPos
+    
+    def adjustAxesForCollider(self, currentPos):
+        newPos = currentPos
+        if currentPos[1] != 12:
+            newPos[1] += 4 / 8
+        if currentPos[0] > 0:
+            if currentPos[0] < self.xDistancePlus:
+                newPos[0] += self.differencePlus / 8
+        elif currentPos[0] < 0:
+            if currentPos[0] > self.xDistanceMinus:
+                newPos[0] -= self.differenceMinus / 8
+            
+        self.pos = newPos
+    
+    def draw(self):
+        '''Method that draws the hydrogen atom'''
+        super().draw()
+
+
+class Neutron(Point):
+    def __init__(self, pos, radius, initialVelocity, initialForce):
+        super().__init__(pos, DARK_CYAN, radius, initialVelocity, initialForce)
+        
+    def enablePhysics(self):
+        '''Method that enables the electron's physics'''
+        super().enablePhysics()
+    
+    def enableNewtonianMechanics(self):
+        '''Method that moves the point using the calculated resultant force'''
+        super().enableNewtonianMechanics()
+
+    def draw(self):
+        '''Method that draws the electron'''
+        super().draw()
+        
+class Baryon(Point):
+    def __init__(self, pos, radius, initialVelocity, initialForce):
+        super().__init__(pos, GREEN, radius, initialVelocity, initialForce)
+        
+    def draw(self, alpha):
+        super().draw()
+        self.object.alpha(alpha)
+        
+    
+    def enablePhysics(self):
+        super().enablePhysics()
+        
+    def enableNewtonianMechanics(self):
+        super().enableNewtonianMechanics()
+        
+class Pion(Point):
+    def __init__(self, pos, radius, initialVelocity, initialForce, charge):
+        super().__init__(pos, YELLOW, radius, initialVelocity, initialForce)
+        self.charge = charge
+            
+    def draw(self):
+        super().draw()
+    
+    def enablePhysics(self):
+        super().enablePhysics()
+        
+    def enableNewtonianMechanics(self):
+        super().enableNewtonianMechanics()
+        
+class Meson(Point):
+    def __init__(self, pos, radius, initialVelocity, initialForce):
+        super().__init__(pos, BROWN, radius, initialVelocity, initialForce)
+    
+    def enablePhysics(self):
+        '''Method that enables the electron's physics'''
+        super().enablePhysics()
+    
+    def enableNewtonianMechanics(self):
+        '''Method that moves the point using the calculated resultant force'''
+        super().enableNewtonianMechanics()
+
+    def draw(self):
+        '''Method that draws the electron'''
+        super().draw()
+        
+class Kaon(Point):
+    def __init__(self, pos, radius, initialVelocity, initialForce):
+        super().__init__(pos, BLACK, radius, initialVelocity, initialForce)
+    
+    def enablePhysics(self):
+        '''Method that enables the electron's physics'''
+        super().enablePhysics()
+    
+    def enableNewtonianMechanics(self):
+        '''Method that moves the point using the calculated resultant force'''
+        super().enableNewtonianMechanics()
+
+    def draw(self):
+        '''Method that draws the electron'''
+        super().draw()
+        
+class Neutrino(Point):
+    def __init__(self, pos, radius, initialVelocity, initialForce):
+        super().__init__(pos, CYAN, radius, initialVelocity, initialForce)
+    
+    def enablePhysics(self):
+        '''Method that enables the electron's physics'''
+        super().enablePhysics()
+    
+    def enableNewtonianMechanics(self):
+        '''Method that moves the point using the calculated resultant force'''
+        super().enableNewtonianMechanics()
+
+    def draw(self):
+        '''Method that draws the electron'''
+        super().draw()
+        
+class Lepton(Point):
+    def __init__(self, pos, radius, initialVelocity, initialForce):
+        super().__init__(pos, TAN, radius, initialVelocity, initialForce)
+    
+    def enablePhysics(self):
+        '''Method that enables the electron's physics'''
+        super().enablePhysics()
+    
+    def enableNewtonianMechanics(self):
+        '''Method that moves the point using the calculated resultant force'''
+        super().enableNewtonianMechanics()
+
+    def draw(self):
+        '''Method that draws the electron'''
+        super().draw()
@@ -0,0 +1,562 @@
+# Headless physics engine that owns the particles, the accelerator models and the per-frame simulation logic
+# Nothing here needs Vizard; a renderer (see simulationMain2.py) registers itself as an observer
+import copy
+import random
+import numpy as np
+from scipy.spatial import cKDTree
+import accelerators
+from bunch import Bunch, MacroParticle
+from collisionChannels import POSSIBILITIES, obtainCollisionType, obtainProducts
+from coulombSolvers import BarnesHutSolver, DirectSumSolver, NeighbourListSolver
+from particleArray import ParticleArray
+from spatialHash import SpatialHash
+from neighbourList import NeighbourList
+from eventScheduler import EventScheduler
+from frameTiming import FrameTimer
+from tracing import tracer, TRACE_DEBUG
+from integrators import obtainIntegrator, VerletIntegrator
+from particles import *
+from constants import *
+from mathematicalMethods import *
+
+# Attributes of points and bunches that refer to the engine's accelerator models, pointed at another engine's models when copied into it
+MODEL_ATTRIBUTES = {"boosterRing": "bRing", "collider": "collider"}
+
+def copyIntoBranch(owner, branch, store):
+    '''Function that copies a point or bunch into a branch engine, with its own attributes but viewing the branch's store and models'''
+    twin = copy.copy(owner)
+    for name, value in vars(owner).items():
+        if name in MODEL_ATTRIBUTES:
+            setattr(twin, name, getattr(branch, MODEL_ATTRIBUTES[name]))
+        elif name not in ["store", "object"]:
+            setattr(twin, name, copy.deepcopy(value))
+    twin.store = store
+    if "object" in vars(owner):
+        twin.object = None
+    return twin
+
+# Main physics class
+class PhysicsEngine:
+    def __init__(self, sourceChamber = None, LINAC = None, bRing = None, collider = None):
+        self.frames = 0
+        self.store = ParticleArray()
+        self.integrator = obtainIntegrator(INTEGRATOR)
+        self.points = []
+        self.bunches = [] # Weighted macro-particle bunches, each stepped as a whole
+        self.observers = []
+        self.higgsStatistics = RunningStatistics() # Mean and variance of every rest mass energy so far
+        self.directSolver = DirectSumSolver(cutoff = COULOMB_INTERACTION_RANGE)
+        self.treeSolver = BarnesHutSolver(cutoff = COULOMB_INTERACTION_RANGE)
+        self.neighbourSolver = NeighbourListSolver(COULOMB_INTERACTION_RANGE) if COULOMB_INTERACTION_RANGE is not None else None # The points' (each bunch keeps its own)
+        self.contactGrid = SpatialHash()
+        self.collisionNeighbours = NeighbourList(COLLISION_TRIGGER_DISTANCE)
+        # Models default to headless ones; a renderer passes its drawable subclasses instead
+        self.sourceChamber = sourceChamber if sourceChamber is not None else accelerators.SourceChamber([0, 5, -4], 3, 5)
+        self.LINAC = LINAC if LINAC is not None else accelerators.LINAC([0, 5, -11.5])
+        self.bRing = bRing if bRing is not None else accelerators.BoosterRing([-31, 6.5, -100], 30, 2.5)
+        self.collider = collider if collider is not None else accelerators.Collider([0, 12, -180], 140, 6)
+        self.collided = False
+        self.ableToCollide = False
+        self.holdingCollisions = False # Whether the collision trigger stops at finding a pair instead of colliding it (see runBranches)
+        self.collisionHeld = False # Whether the trigger has found a pair while collisions were held
+        self.readingNumber = 1
+        self.lastReading = None
+        self.random = random.Random() # Collision outcomes are drawn from this engine's own generator, so restoring or seeding it leaves the random module alone
+        self.frameTimer = FrameTimer() if FRAME_TIMING else None # Times each phase of update, a renderer may share it to time its own phases
+
+    def addObserver(self, observer):
+        '''Method that registers an observer; it is sent only the notifications it has methods for'''
+        self.observers.append(observer)
+
+    def removeObserver(self, observer):
+        self.observers.remove(observer)
+
+    def notify(self, event, *args):
+        '''Method that calls the method named event on every observer that defines it'''
+        for observer in self.observers:
+            handler = getattr(observer, event, None)
+            if handler is not None:
+                handler(*args)
+
+    def addPoint(self, point):
+        self.points.append(point)
+        self.notify("pointAdded", point)
+
+    def removePoint(self, point):
+        self.notify("pointRemoved", point)
+        self.points.remove(point)
+        point.remove()
+
+    def addBunch(self, bunch):
+        self.bunches.append(bunch)
+        self.notify("bunchAdded", bunch)
+
+    def removeBunch(self, bunch):
+        self.notify("bunchRemoved", bunch)
+        self.bunches.remove(bunch)
+        bunch.store.clear()
+
+    def fork(self, seed = None):
+        '''Method that clones the simulation into a headless branch, which can then go its own way, e.g. draw its own collision outcome'''
+        # The branch's particle arrays are this engine's until either of them writes (see ParticleArray.fork), so forking copies no rows,
+        # and a write afterwards, by either engine, copies only the columns written
+        # It draws collisions from its own random.Random(seed), a fresh one from the system's entropy if seed is None
+        branch = PhysicsEngine()
+        branch.frames = self.frames
+        branch.collided = self.collided
+        branch.ableToCollide = self.ableToCollide
+        branch.readingNumber = self.readingNumber
+        branch.lastReading = copy.deepcopy(self.lastReading)
+        branch.higgsStatistics = RunningStatistics(self.higgsStatistics.count, self.higgsStatistics.mean, self.higgsStatistics.squares)
+        branch.sourceChamber.sealed = self.sourceChamber.sealed
+        branch.sourceChamber.activated = self.sourceChamber.activated
+        branch.collider.started = self.collider.started
+        branch.integrator = copy.deepcopy(self.integrator)
+        branch.random = random.Random(seed)
+        branch.store = self.store.fork()
+        for point in self.points:
+            twin = copyIntoBranch(point, branch, branch.store)
+            branch.store.owners[twin.index] = twin
+            branch.points.append(twin)
+        for bunch in self.bunches:
+            branch.bunches.append(copyIntoBranch(bunch, branch, bunch.store.fork()))
+        return branch
+
+    def step(self, frames = 1):
+        '''Method that advances the simulation by a number of frames as fast as the CPU allows'''
+        for frame in range(frames):
+            self.update()
+        return self.frames
+
+    def update(self):
+        '''Method that advances the simulation by one frame (the physics of LHCSimulation.run)'''
+        timer = self.frameTimer
+        if timer is not None:
+            timer.startFrame()
+        self.frames += 1
+        if not self.collided:
+            self.store.detach() # Points write their rows through views as they move
+            self.advanceIntegrated(self.store.integrated) # Every freely moving point is advanced in one vectorised call
+            for point in self.points:
+                if not point.integrated:
+                    point.enablePhysics()
+            if timer is not None:
+                timer.mark("physics")
+
+            for point in self.points.copy():
+                self.applyStageRules(point)
+            for bunch in self.bunches:
+                bunch.update(self)
+            if timer is not None:
+                timer.mark("stages")
+
+            if not self.sourceChamber.activated:
+                # An adaptive integrator already felt these pushes at every stage of its steps (see obtainIntegratedForces)
+                pushed = self.points if isinstance(self.integrator, VerletIntegrator) else [point for point in self.points if not point.integrated]
+                self.obtainCoulombForce(pushed)
+                if timer is not None:
+                    timer.mark("coulomb")
+                # self.checkPointCollisions(self.points)
+                self.obtainCoulombWallForce(self.sourceChamber, pushed)
+                if timer is not None:
+                    timer.mark("wallForces")
+
+            self.checkCollisionTrigger()
+            if timer is not None:
+                timer.mark("collisionTrigger")
+
+        self.notify("frameCompleted", self)
+        if timer is not None:
+            timer.mark("observers")
+            timer.endFrame()
+
+    def applyStageRules(self, point):
+        '''Method that moves a point on to its next stage once it has moved, returning False if it has left the simulation'''
+        if point.pos[2] > 18.5:
+            self.removePoint(point)
+            return False # Its row has been handed back to the store
+
+        if point.pos[2] < self.LINAC.endTerminalZCord and type(point) == Proton:
+            if not point.completedLINAC:
+                point.completedLINAC = True
+                point.teleport = True
+                point.integrated = False # Guided by the ring logic in Proton.enablePhysics from now on
+
+        if type(point) == Proton and point.boosted:
+            if self.points.index(point) == 0:
+                point.endBoostZCord = -69
+            else:
+                point.endboostZCord = -131
+        return True
+
+    def checkCollisionTrigger(self):
+        '''Method that collides the closest pair of points once a proton is fast enough in the collider'''
+        self.ableToCollide = False
+        for point in self.points:
+            if type(point) == Proton:
+                if point.goingThroughCollider and point.speed > 3500:
+                    self.ableToCollide = True
+        if any(bunch.isArmed() for bunch in self.bunches):
+            self.ableToCollide = True
+
+        if self.ableToCollide:
+            if tracer.level <= TRACE_DEBUG:
+                tracer.record(TRACE_DEBUG, "engine.ableToCollide", "Able to collide at frame %d", self.frames)
+            if self.points:
+                rows = np.array([point.index for point in self.points])
+                self.collisionNeighbours.update(self.store.pos[rows])
+                closestPair = self.collisionNeighbours.obtainClosestPair(COLLISION_TRIGGER_DISTANCE)
+                if closestPair is not None:
+                    self.triggerCollision(self.points[closestPair[0]], self.points[closestPair[1]])
+                    return
+            closestPair = self.obtainClosestBunchPair(COLLISION_TRIGGER_DISTANCE)
+            if closestPair is not None:
+                self.triggerCollision(closestPair[0], closestPair[1])
+
+    def triggerCollision(self, proton1, proton2):
+        '''Method that collides the pair the trigger found, or only notes that it found one while collisions are held'''
+        if self.holdingCollisions:
+            self.collisionHeld = True
+            return
+        self.collideProtons(proton1, proton2)
+
+    def obtainClosestBunchPair(self, maxDistance):
+        '''Method that finds the closest two macro-particles from different bunches closer than maxDistance, or None'''
+        # Rows of the same bunch are always close together, so only pairs across bunches can collide
+        closest = None
+        for number, bunch in enumerate(self.bunches):
+            if not len(bunch):
+                continue
+            tree = cKDTree(bunch.store.pos[:len(bunch)])
+            for other in self.bunches[number + 1:]:
+                if not len(other):
+                    continue
+                distance, index = tree.query(other.store.pos[:len(other)], distance_upper_bound = maxDistance)
+                nearest = np.argmin(distance)
+                if distance[nearest] < maxDistance and (closest is None or distance[nearest] < closest[2]):
+                    closest = (MacroParticle(bunch, int(index[nearest])), MacroParticle(other, int(nearest)), distance[nearest])
+        return closest
+
+    def tickPoint(self, point):
+        '''Method that runs one frame of a single point's motion and stage rules, returning False if it has left the simulation'''
+        self.store.detach()
+        if point.integrated:
+            self.advanceIntegrated(point.index)
+        else:
+            point.enablePhysics()
+        return self.applyStageRules(point)
+
+    def advanceIntegrated(self, rows):
+        '''Method that moves integrated rows of the store on by one frame, giving an adaptive integrator the forces wherever it evaluates them'''
+        # The Verlet step keeps the original scheme: the force column during the step, and the Coulomb and wall pushes as kicks after it
+        if isinstance(self.integrator, VerletIntegrator):
+            self.integrator.advance(self.store, rows)
+        else:
+            self.integrator.advance(self.store, rows, self.obtainIntegratedForces)
+
+    def obtainIntegratedForces(self, rows, pos, velocity):
+        '''Method that finds the forces on integrated rows at trial positions: the Coulomb and wall pushes in the source chamber, the LINAC's field after it'''
+        # A push of d per frame, as the Verlet scheme applies it, moves a row as a force of m * d * R^2 would over the frame, so pushes are scaled to match
+        # Other points are taken where they were left at the end of the last frame
+        store = self.store
+        forces = store.force[rows].copy()
+        if not self.sourceChamber.activated:
+            forces += self.obtainCoulombForces(store, self.obtainPointRows(), rows, pos, self.neighbourSolver) * RATE_OF_CALCULATIONS ** 2
+            forces[:, 2] += self.obtainCoulombWallPush(store, rows, self.sourceChamber, pos) * store.mass[rows] * RATE_OF_CALCULATIONS ** 2
+        else:
+            inLINAC = np.array([isinstance(store.owners[row], Proton) and not store.owners[row].completedLINAC for row in rows], dtype = bool)
+            forces[inLINAC, 2] = self.LINAC.obtainElectricField(self.LINAC.endTerminalZCord - pos[inLINAC, 2])
+        return forces
+
+    def obtainUniformTicks(self, point):
+        '''Method that counts the frames a point will only repeat its current motion for, None if it never stops'''
+        # Only meaningful once the chamber is activated, when no Coulomb force couples the points
+        if point.integrated:
+            if not isinstance(self.integrator, VerletIntegrator):
+                return 0 # The closed form below is the Verlet scheme's, other integrators are stepped frame by frame
+            crossings = [self.store.obtainConstantForceCrossing(point.index, 2, 18.5, below = False)]
+            if type(point) == Proton and not point.completedLINAC:
+                crossings.append(self.store.obtainConstantForceCrossing(point.index, 2, self.LINAC.endTerminalZCord))
+            crossings = [crossing for crossing in crossings if crossing is not None]
+            return min(crossings) - 1 if crossings else None
+        if hasattr(point, "obtainUniformTicks"):
+            return point.obtainUniformTicks()
+        return 0
+
+    def skipUniformTicks(self, point, ticks):
+        '''Method that moves a point through frames obtainUniformTicks allowed, in closed form'''
+        self.store.detach()
+        if point.integrated:
+            self.store.advanceConstantForce(point.index, ticks)
+        else:
+            point.skipUniformTicks(ticks)
+
+    def spawnHydrogen(self):
+        '''Method that allows a hydrogen atom to be "pumped" from the gas pump'''
+        if not self.sourceChamber.sealed and len(self.points) < 2:
+            hydrogenPoint = HydrogenAtom([0, 5, 18.5], SIMULATED_PROTON_RADIUS, [0, 0, -0.1], [0, 0, 0], self.store)
+            self.addPoint(hydrogenPoint)
+            return hydrogenPoint
+
+    def injectBunch(self, macroParticles = BUNCH_MACRO_PARTICLES, protons = BUNCH_PROTONS, positionSpread = BUNCH_POSITION_SPREAD, velocitySpread = BUNCH_VELOCITY_SPREAD, velocity = [0, 0, -0.1], rng = None):
+        '''Method that pumps a whole bunch of hydrogen in from the gas pump at once, drawn from a normal distribution about the pump'''
+        if self.sourceChamber.sealed:
+            return None
+        rng = rng if rng is not None else np.random.default_rng()
+        endBoostZCord = -69 if not self.bunches else -131 # The first bunch goes clockwise round the collider, as the first proton does
+        bunch = Bunch(protons, macroParticles, self.bRing, self.collider, endBoostZCord)
+        pos = rng.normal([0, 5, 18.5], positionSpread, (macroParticles, 3))
+        bunch.inject(pos, rng.normal(velocity, velocitySpread, (macroParticles, 3)))
+        self.addBunch(bunch)
+        return bunch
+
+    def sealChamber(self):
+        '''Method that seals the source chamber'''
+        self.sourceChamber.seal()
+        for point in self.points.copy(): # Must be a copy of self.points
+            if (point.pos[2] + point.radius) > (self.sourceChamber.wall.pos[2] - self.sourceChamber.wall.height / 2):
+                self.removePoint(point)
+
+        for point in self.points.copy(): # Replace hydrogen atoms with protons
+            point.oldPos = point.pos
+            newPoint = Proton(point.pos, SIMULATED_PROTON_RADIUS, [0, 0, 0], [0, 0, 0], self.bRing, self.collider, self.store)
+            self.removePoint(point)
+            self.addPoint(newPoint)
+
+        for bunch in self.bunches:
+            bunch.seal(self.sourceChamber)
+
+    def activateChamber(self):
+        '''Method that activates the chamber'''
+        if self.sourceChamber.sealed and not self.sourceChamber.activated and (len(self.points) > 1 or self.bunches):
+            self.sourceChamber.applyPlate()
+            for point in self.points:
+                distanceFromEndTerminal = self.LINAC.endTerminalZCord - point.pos[2]
+                point.terminal = "-"
+                forceMagnitude = self.LINAC.obtainElectricField(distanceFromEndTerminal)
+                point.force = [0, 0, forceMagnitude]
+            for bunch in self.bunches:
+                bunch.activate(self.LINAC)
+            return True
+        return False
+
+    def collideProtons(self, proton1, proton2):
+        '''Method that decides the outcome of a collision and hands the reading to the observers'''
+        self.collided = True
+        protonPositions = [proton1.pos.tolist(), proton2.pos.tolist()]
+        midpoint = findMidpoint(protonPositions[0], protonPositions[1])
+        if tracer.level <= TRACE_DEBUG:
+            tracer.record(TRACE_DEBUG, "proton.collide", "Colliding at %s and %s, midpoint: %s", protonPositions[0], protonPositions[1], midpoint)
+        chosenGeVValue = round(self.random.uniform(0.1, 10000.0), 1)
+        for point in self.points.copy():
+            self.removePoint(point)
+        for bunch in self.bunches.copy():
+            self.removeBunch(bunch)
+        channel = obtainCollisionType(chosenGeVValue)
+        collisionType = POSSIBILITIES[channel]
+        products = obtainProducts(channel, self.random.randrange(3), self.random.randrange(3))
+
+        self.higgsStatistics.add(chosenGeVValue)
+        if self.higgsStatistics.count > 1:
+            higgsProbability = obtainNormalProbabilityDensity(125, self.higgsStatistics.mean, self.higgsStatistics.obtainStandardDeviation())
+        else:
+            higgsProbability = 1.0 if chosenGeVValue <= 126 and chosenGeVValue >= 124 else 0.0
+
+        self.lastReading = {
+            "readingNumber": self.readingNumber,
+            "collisionType": collisionType,
+            "initialEnergy": 13000,
+            "restMassEnergy": chosenGeVValue,
+            "products": products,
+            "higgsProbability": higgsProbability,
+            "midpoint": midpoint,
+            "protonPositions": protonPositions,
+        }
+        self.notify("protonsCollided", self.lastReading)
+        return self.lastReading
+
+    def resetSystem(self):
+        for point in self.points.copy():
+            self.removePoint(point)
+        for bunch in self.bunches.copy():
+            self.removeBunch(bunch)
+        self.sourceChamber.reset()
+        self.collided = False
+        self.notify("systemReset", self)
+
+    def nextTest(self):
+        self.resetSystem()
+        self.readingNumber += 1
+
+    def obtainCoulombForce(self, points):
+        '''Method that applies the Coulomb repulsion on every charged point from all the others'''
+        if len(points) == 0:
+            return
+        rows = np.array([point.index for point in points])
+        forces = self.obtainCoulombForces(self.store, self.obtainPointRows(), rows, self.store.pos[rows], self.neighbourSolver)
+        # Change in momentum / mass = Change in Displacement / Change In Time, the same update the pairwise version applied
+        self.store.pos[rows] += forces / self.store.mass[rows, None]
+
+    def obtainPointRows(self):
+        return np.array([point.index for point in self.points], dtype = int)
+
+    def obtainCoulombForces(self, store, members, rows, pos, neighbourSolver):
+        '''Method that finds the Coulomb forces on some member rows of a store at positions pos, from every member, the rest where they were left'''
+        # The solver is always given every member in the same order, so the neighbour list kept for the set (one for the points, one per bunch)
+        # carries over from call to call, whichever rows are asked about and whichever trial stage they are at
+        if len(members) < 2:
+            return np.zeros((len(rows), 3))
+        order = np.argsort(members, kind = "stable")
+        places = order[np.searchsorted(members, rows, sorter = order)]
+        positions = store.pos[members]
+        positions[places] = pos
+        return self.obtainCoulombSolver(len(members), neighbourSolver).obtainForces(positions, store.charge[members])[places]
+
+    def obtainCoulombSolver(self, count, neighbourSolver = None):
+        '''Method that picks the exact direct sum for small systems, and the set's neighbour list (or the octree without a cutoff) for large ones'''
+        if count <= COULOMB_DIRECT_SUM_LIMIT:
+            return self.directSolver
+        if neighbourSolver is not None:
+            return neighbourSolver # With a cutoff, the pairs kept from last frame make each frame O(N * neighbours)
+        return self.treeSolver
+
+    def obtainCoulombWallForce(self, chamber, points = None):
+        '''Method that pushes points (every point by default) back from the nozzle and, once the chamber is sealed, from its wall'''
+        points = self.points if points is None else points
+        if not points:
+            return
+        self.applyCoulombWallForce(self.store, np.array([point.index for point in points]), chamber)
+
+    def applyCoulombWallForce(self, store, rows, chamber):
+        '''Method that applies the nozzle and wall push to rows of any store, scaled by each row's charge so weighted rows feel it per proton'''
+        for surface in self.obtainPushingSurfaces(chamber):
+            store.pos[rows, 2] += self.obtainSurfacePush(store, rows, surface, store.pos[rows])
+
+    def obtainPushingSurfaces(self, chamber):
+        surfaces = []
+        if not chamber.activated:
+            surfaces.append(chamber.nozzle)
+        if chamber.sealed:
+            surfaces.append(chamber.wall)
+        return surfaces
+
+    def obtainCoulombWallPush(self, store, rows, chamber, pos):
+        '''Method that finds the z displacement the nozzle and wall push rows at positions pos by in one frame'''
+        return sum((self.obtainSurfacePush(store, rows, surface, pos) for surface in self.obtainPushingSurfaces(chamber)), np.zeros(len(rows)))
+
+    def obtainSurfacePush(self, store, rows, surface, pos):
+        '''Method that finds the z displacement one surface pushes rows at positions pos by in one frame, 0 for rows too far away'''
+        push = np.zeros(len(rows))
+        separation = np.asarray(surface.pos, dtype = float) - pos
+        distance = np.sqrt(np.einsum("ij,ij->i", separation, separation))
+        near = np.flatnonzero((np.abs(separation[:, 2]) < (1 + surface.height / 2)) & (distance > 0))
+        electricForceMagnitude = (COULOMB_LAW_CONSTANT * ((store.charge[rows[near]] * SIMULATED_PROTON_CHARGE)) / ((pos[near, 2] - surface.pos[2] - surface.height / 2) ** 2))
+        # Only the z component of the unit vector towards the surface is applied, as before
+        push[near] = -electricForceMagnitude * (separation[near, 2] / distance[near]) / store.mass[rows[near]]
+        return push
+
+    def checkPointCollisions(self, points):
+        '''Method that finds touching points through the spatial hash and makes them bounce off each other'''
+        if len(points) < 2:
+            return
+        rows = np.array([point.index for point in points])
+        first, second, distance = self.contactGrid.obtainContactPairs(self.store.pos[rows], self.store.radius[rows])
+        if not len(first):
+            return
+        if self.collided:
+            for point in self.points.copy():
+                self.removePoint(point)
+            return
+        self.applyContactResponse(rows[first], rows[second], distance)
+
+    def applyContactResponse(self, first, second, distance):
+        '''Method that exchanges momentum along the collision normal for every touching pair of store rows at once'''
+        # 1. The collision normal is the unit vector from the first point to the second (coincident points have none)
+        # 2. Relative speed along the normal and the reduced mass give the change in momentum of each pair
+        # 3. Change in momentum / mass = Change in Displacement / Change In Time, summed over every pair a point is in
+        apart = distance > 0
+        first, second, distance = first[apart], second[apart], distance[apart]
+        pos = self.store.pos
+        mass = self.store.mass
+        collisionNormal = (pos[second] - pos[first]) / distance[:, None]
+        relativeVelocity = np.abs(self.store.velocity[first] - self.store.velocity[second])
+        resultantSpeed = np.einsum("ij,ij->i", relativeVelocity, np.abs(collisionNormal))
+        changeInMomentum = ((mass[first] * mass[second]) / (mass[first] + mass[second])) * resultantSpeed * 2
+        displacement = changeInMomentum[:, None] * collisionNormal / RATE_OF_CALCULATIONS
+        for axis in range(3):
+            shift = np.bincount(second, weights = displacement[:, axis] / mass[second], minlength = self.store.count)
+            shift -= np.bincount(first, weights = displacement[:, axis] / mass[first], minlength = self.store.count)
+            pos[:self.store.count, axis] += shift
+
+def runFullPass(maxFrames = 200000, eventDriven = False):
+    '''Function that drives one reading from the gas pump to a collision without any display'''
+    engine = PhysicsEngine()
+    engine.spawnHydrogen()
+    engine.step(int(0.2 * RATE_OF_CALCULATIONS)) # Same spacing the "Add Hydrogen" button enforces
+    engine.spawnHydrogen()
+    while engine.points and max(point.pos[2] for point in engine.points) + SIMULATED_PROTON_RADIUS > engine.sourceChamber.wall.pos[2] - engine.sourceChamber.wall.height / 2:
+        engine.step()
+    engine.sealChamber()
+    engine.activateChamber()
+    if eventDriven:
+        return EventScheduler(engine).run(maxFrames) # Jumps each proton from one boundary to the next instead of ticking
+    while not engine.collided and engine.frames < maxFrames:
+        engine.step()
+    return engine
+
+def runBunchPass(maxFrames = 200000, macroParticles = BUNCH_MACRO_PARTICLES):
+    '''Function that drives two whole bunches from the gas pump to a collision without any display'''
+    engine = PhysicsEngine()
+    engine.injectBunch(macroParticles)
+    engine.step(int(0.2 * RATE_OF_CALCULATIONS))
+    engine.injectBunch(macroParticles)
+    wallBottom = engine.sourceChamber.wall.pos[2] - engine.sourceChamber.wall.height / 2
+    # A spread bunch never clears the wall all at once, so seal once the bulk of each bunch has and let sealChamber drop the stragglers
+    while any(len(bunch) and np.median(bunch.store.pos[:len(bunch), 2]) + SIMULATED_PROTON_RADIUS > wallBottom for bunch in engine.bunches) and engine.frames < maxFrames:
+        engine.step()
+    engine.sealChamber()
+    engine.activateChamber()
+    while not engine.collided and engine.frames < maxFrames:
+        engine.step()
+    return engine
+
+def runBranches(engine, count, seed = None, maxFrames = 200000):
+    '''Function that runs an engine through one acceleration pass and collides it, then collides the same state count more times in branches, returning the branches' readings'''
+    # 1. The pass runs once with collisions held, so it stops on the frame the trigger finds a pair with nothing forked along the way
+    # 2. One fork keeps that state, then the engine takes its own reading, number engine.readingNumber
+    # 3. Each branch is forked from the kept state and collides it with its own outcome, drawn from its own seed spawned from seed
+    # Branch i records reading number engine.readingNumber + 1 + i. The branches add their readings to the engine's statistics, so each
+    # reading's Higgs probability is over every reading before it, as it would be over that many passes
+    engine.holdingCollisions = True
+    while not engine.collided and not engine.collisionHeld and engine.frames < maxFrames:
+        engine.step()
+    engine.holdingCollisions = False
+    if not engine.collisionHeld:
+        return []
+    engine.collisionHeld = False
+    preCollision = engine.fork()
+    engine.checkCollisionTrigger()
+    readings = []
+    for number, branchSeed in enumerate(np.random.SeedSequence(seed).generate_state(count)):
+        branch = preCollision.fork(int(branchSeed))
+        branch.higgsStatistics = engine.higgsStatistics
+        branch.readingNumber = engine.readingNumber + 1 + number
+        branch.checkCollisionTrigger()
+        readings.append(branch.lastReading)
+    return readings
+
+if __name__ == "__main__":
+    if "--timing" in sys.argv:
+        FRAME_TIMING = True # Read by every PhysicsEngine made from here on
+    if "--trace" in sys.argv:
+        tracer.setLevel(TRACE_DEBUG)
+    if "--bunches" in sys.argv:
+        engine = runBunchPass()
+    else:
+        engine = runFullPass(eventDriven = "--events" in sys.argv)
+    if engine.frameTimer is not None:
+        print(engine.frameTimer.formatSummary())
+    if "--trace" in sys.argv:
+        tracer.dump()
+    print(f"Frames: {engine.frames}")
+    print(engine.lastReading)
@@ -0,0 +1,85 @@
+# Layouts of the products drawn for each collision type, so a renderer can place pooled spheres and labels instead of building new ones
+# Spheres sit at an offset from the collision's midpoint, or beside their label on the readings board
+
+from constants import *
+from mathematicalMethods import getMagnitude
+
+def atMidpoint(offset, colour, radius = SIMULATED_PROTON_RADIUS, alpha = 1):
+    return {"offset": offset, "colour": colour, "radius": radius, "alpha": alpha}
+
+def towardsProton(proton, colour, radius = SIMULATED_PROTON_RADIUS):
+    '''Function that describes a sphere one unit from the midpoint towards one of the colliding protons'''
+    return {"towards": proton, "colour": colour, "radius": radius, "alpha": 1}
+
+def onBoard(y, colour, radius = 2, alpha = 1):
+    return {"pos": [22.5, y, -179], "colour": colour, "radius": radius, "alpha": alpha}
+
+def label(text, y, size = 5):
+    '''Function that describes a board label, whose text may name a product by its place in the reading's products, e.g. "{3}"'''
+    return {"text": text, "pos": [-22.5, y, -179], "size": size}
+
+PRODUCT_TEMPLATES = {
+    "Elastic Scattering": {
+        "spheres": [towardsProton(0, PURPLE), towardsProton(1, PURPLE), onBoard(57, PURPLE), onBoard(44, PURPLE)],
+        "labels": [label("Proton", 57), label("Proton", 44)]},
+    "Resonance Production": {
+        "spheres": [atMidpoint([0, 0, 0], GREEN, 1, 0.5), atMidpoint([2, 2, 2], PURPLE), atMidpoint([-1, -2, 0], DARK_CYAN), atMidpoint([-3, 0, -1], YELLOW),
+                    onBoard(62, GREEN), onBoard(54, PURPLE, 1), onBoard(46, DARK_CYAN, 1), onBoard(38, YELLOW, 1)],
+        "labels": [label("Baryon", 62), label("Proton", 54), label("Neutron", 46), label("{3}", 38)]},
+    "Jets Formation": {
+        "spheres": [atMidpoint([0, 0, 0], RED, 1)]
+                   + [atMidpoint(offset, colour) for i in range(5) for offset, colour in [([1 + i, -(2 + i), 0], YELLOW), ([-(2 + i), 2 + i, 0], BLACK)]]
+                   + [onBoard(57, YELLOW), onBoard(44, BLACK)],
+        "labels": [label("Pion Jets", 57), label("Kaon Jets", 44)]},
+    "Quark-Antiquark Annihilation": {
+        "spheres": [atMidpoint([0, 0, 0], YELLOW, 1), atMidpoint([0, 0, 3], RED), atMidpoint([-1, 1, 0], RED), atMidpoint([-2, -1, 1], ORANGE),
+                    onBoard(60, RED), onBoard(50, RED), onBoard(40, ORANGE)],
+        "labels": [label("W + Boson", 60), label("W - Boson", 50), label("Z 0 Boson", 40)]},
+    "Higgs Production": {
+        "spheres": [atMidpoint([0, 0, 0], GREEN, 1), atMidpoint([2, 0, 2], YELLOW), atMidpoint([-1, -3, 1], DARK_CYAN), atMidpoint([1, -3, 2], BLACK),
+                    atMidpoint([3, 1, -1], ORANGE), atMidpoint([2, -3, -3], RED), atMidpoint([3, 1, -1], BROWN), atMidpoint([0, -2, -3], TAN),
+                    onBoard(65.6, GREEN), onBoard(61.2, YELLOW, 1), onBoard(56.8, DARK_CYAN, 1), onBoard(52.4, BLACK, 1),
+                    onBoard(48, ORANGE, 1), onBoard(43.6, RED, 1), onBoard(39.2, BROWN, 1), onBoard(34.8, TAN, 1)],
+        "labels": [label("Higgs Boson", 65.6, 4), label("Top Quark", 61.2, 4), label("Antitop Quark", 56.8, 4), label("Photon", 52.4, 4),
+                   label("Z Boson", 48, 4), label("W Boson", 43.6, 4), label("Bottom Quark", 39.2, 4), label("Tau Lepton", 34.8, 4)]},
+    "Gluon-Gluon Fusion": {
+        "spheres": [atMidpoint([0, 0, 0], BLUE, 1), atMidpoint([2, 0, 2], YELLOW), atMidpoint([-1, -3, 1], DARK_CYAN), onBoard(57, YELLOW), onBoard(44, DARK_CYAN)],
+        "labels": [label("Top Quark", 57), label("Antitop Quark", 44)]},
+    "Deep Inelastic Scattering": {
+        "spheres": [atMidpoint([0, 0, 0], BROWN, 1), atMidpoint([-2, 0, 0], YELLOW), atMidpoint([3, 1, 2], BLACK), atMidpoint([1, -3, -2], CYAN), atMidpoint([0, -2, -3], TAN),
+                    onBoard(62, YELLOW), onBoard(54, BLACK), onBoard(46, CYAN), onBoard(38, TAN)],
+        "labels": [label("{0}", 62), label("{1}", 54), label("Neutrino", 46), label("Lepton", 38)]},
+    "Inelastic Scattering": {
+        "spheres": [atMidpoint([0, 0, 0], DARK_CYAN, 1)]
+                   + [atMidpoint(offset, YELLOW) for offset in [[-3, 0, -1], [1, 0, -3], [1, -3, -2]]]
+                   + [atMidpoint(offset, BLACK) for offset in [[0, -1, -3], [-1, 1, -1], [-3, -1, -2]]]
+                   + [onBoard(y, YELLOW) for y in [64.3, 58.6, 52.9]] + [onBoard(y, BLACK) for y in [47.2, 41.5, 35.8]],
+        "labels": [label(text, y) for text, y in [("Pion +", 64.3), ("Pion -", 58.6), ("Pion 0", 52.9), ("Kaon +", 47.2), ("Kaon -", 41.5), ("Kaon 0", 35.8)]]},
+    "Parton-Parton Scattering": {
+        "spheres": [atMidpoint([0, 0, 0], ORANGE, 1)]
+                   + [atMidpoint(offset, colour) for i in range(5) for offset, colour in [([2 + i, 1 + i, 0], GREEN), ([-(1 + i), 0, 3 + i], BROWN)]]
+                   + [onBoard(57, GREEN), onBoard(44, BROWN)],
+        "labels": [label("Baryon Jet", 57), label("Meson Jet", 44)]}}
+
+def obtainProductLayout(reading):
+    '''Function that places a reading's product spheres, as (pos, colour, radius, alpha), and its labels, as (text, pos, size)'''
+    template = PRODUCT_TEMPLATES[reading["collisionType"]]
+    midpoint = reading["midpoint"]
+    spheres = []
+    for sphere in template["spheres"]:
+        if "pos" in sphere:
+            pos = sphere["pos"]
+        elif "towards" in sphere:
+            proton = reading["protonPositions"][sphere["towards"]]
+            separation = [proton[axis] - midpoint[axis] for axis in range(3)]
+            magnitude = getMagnitude(ORIGIN, separation)
+            pos = [midpoint[axis] + separation[axis] / magnitude for axis in range(3)]
+        else:
+            pos = [midpoint[axis] + sphere["offset"][axis] for axis in range(3)]
+        spheres.append((pos, sphere["colour"], sphere["radius"], sphere["alpha"]))
+    labels = [(entry["text"].format(*reading["products"]), entry["pos"], entry["size"]) for entry in template["labels"]]
+    return spheres, labels
+
+def obtainLargestLayout():
+    '''Function that finds the most spheres and labels any template needs, so a renderer can create them all up front'''
+    return max(len(template["spheres"]) for template in PRODUCT_TEMPLATES.values()), max(len(template["labels"]) for template in PRODUCT_TEMPLATES.values())
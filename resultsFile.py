@@ -0,0 +1,203 @@
+# Chunked columnar binary files for collision readings
+# Rows are cut into blocks of RESULTS_BLOCK_ROWS, each column of a block is compressed on its own, and a footer indexes every chunk,
+# so a reader can load one column of millions of readings without touching the others
+#
+# Layout: MAGIC, then the chunks, then the JSON footer, its length (8 bytes, little endian) and MAGIC again
+# Appending writes the new chunks and a longer footer to a side file, copied onto the end of the file at close,
+# so until then the file keeps its old footer and trailer and still opens if the append dies part way
+
+import json
+import os
+import shutil
+import struct
+import zlib
+import numpy as np
+from constants import *
+from collisionChannels import POSSIBILITIES, PRODUCT_NAMES
+
+MAGIC = b"LHCR"
+VERSION = 1
+
+# How each chunk is stored:
+# "shuffle" groups the bytes of every value by significance before compressing, which suits slowly varying numbers
+# "sequence" stores nothing but the first value and the step, for columns that count up (falling back to "shuffle" if one does not)
+# "decimal" stores values with a fixed number of decimal places as whole numbers (falling back to "shuffle" if one has more)
+READING_COLUMNS = [
+    {"name": "readingNumber", "dtype": "int64", "encoding": "sequence"},
+    {"name": "channel", "dtype": "uint8", "encoding": "shuffle", "dictionary": POSSIBILITIES},
+    {"name": "energy", "dtype": "float64", "encoding": "decimal", "places": 1},
+    {"name": "higgsProbability", "dtype": "float64", "encoding": "shuffle"},
+    {"name": "productCounts", "dtype": "uint8", "encoding": "shuffle"},
+    {"name": "products", "dtype": "uint8", "encoding": "shuffle", "dictionary": PRODUCT_NAMES, "lengths": "productCounts"}] # Ragged, productCounts values per row
+
+def shuffleBytes(values):
+    '''Function that reorders an array's bytes so the first byte of every value comes first, then every second byte and so on'''
+    return np.ascontiguousarray(values).view(np.uint8).reshape(len(values), values.dtype.itemsize).T.tobytes()
+
+def unshuffleBytes(data, dtype, count):
+    dtype = np.dtype(dtype)
+    return np.frombuffer(data, dtype = np.uint8).reshape(dtype.itemsize, count).T.copy().view(dtype).reshape(count)
+
+
+class ResultsWriter:
+    def __init__(self, path, columns = READING_COLUMNS, blockRows = RESULTS_BLOCK_ROWS, compressionLevel = 3, append = False):
+        self.path = path
+        self.columns = columns
+        self.blockRows = blockRows
+        self.compressionLevel = compressionLevel
+        self.rows = 0
+        self.blocks = []
+        self.metadata = {} # Saved in the footer for whoever writes the file, e.g. how far an import has got
+        self.base = 0 # Where the file being written will start in the finished file
+        self.appending = append and os.path.exists(path)
+        if self.appending:
+            reader = ResultsReader(path)
+            self.columns = list(reader.columns.values())
+            self.rows = reader.rows
+            self.blocks = reader.blocks
+            self.metadata = reader.metadata
+            self.base = os.path.getsize(path) # The new chunks go after the old footer, which is left in place
+            self.file = open(self.obtainSidePath(), "wb")
+        else:
+            self.file = open(path, "wb")
+            self.file.write(MAGIC)
+        self.pending = {column["name"]: [] for column in self.columns} # Arrays written since the last block was cut
+        self.pendingRows = 0
+
+    def obtainSidePath(self):
+        return self.path + ".append"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def write(self, values):
+        '''Method that appends rows, given as one array per column name (ragged columns end to end), writing out every full block'''
+        for column in self.columns:
+            self.pending[column["name"]].append(np.asarray(values[column["name"]], dtype = column["dtype"]))
+        self.pendingRows += len(values[self.columns[0]["name"]])
+        if self.pendingRows >= self.blockRows:
+            pending = self.takePending()
+            start = 0
+            while self.pendingRows - start >= self.blockRows:
+                self.writeBlock(self.sliceRows(pending, start, start + self.blockRows))
+                start += self.blockRows
+            pending = self.sliceRows(pending, start, self.pendingRows)
+            self.pending = {name: [values] for name, values in pending.items()}
+            self.pendingRows -= start
+
+    def takePending(self):
+        return {name: np.concatenate(arrays) if arrays else np.zeros(0) for name, arrays in self.pending.items()}
+
+    def sliceRows(self, values, start, stop):
+        '''Method that cuts rows start to stop out of every column, finding where each ragged column's rows begin from its lengths'''
+        rows = {}
+        for column in self.columns:
+            if "lengths" in column:
+                offsets = np.concatenate(([0], np.cumsum(values[column["lengths"]], dtype = np.int64)))
+                rows[column["name"]] = values[column["name"]][offsets[start]:offsets[stop]]
+            else:
+                rows[column["name"]] = values[column["name"]][start:stop]
+        return rows
+
+    def writeBlock(self, values):
+        '''Method that compresses one block column by column and records where each chunk went'''
+        count = len(values[self.columns[0]["name"]])
+        block = {"rows": count, "start": self.rows, "chunks": {}}
+        for column in self.columns:
+            block["chunks"][column["name"]] = self.writeChunk(column, values[column["name"]])
+        self.blocks.append(block)
+        self.rows += count
+
+    def writeChunk(self, column, values):
+        '''Method that writes one column of a block with the column's encoding, returning its footer entry'''
+        chunk = {"count": len(values), "encoding": "shuffle"}
+        if column["encoding"] == "sequence" and len(values):
+            step = int(values[1] - values[0]) if len(values) > 1 else 1
+            if np.array_equal(values, values[0] + step * np.arange(len(values))):
+                chunk.update({"encoding": "sequence", "first": int(values[0]), "step": step})
+                return chunk
+        if column["encoding"] == "decimal":
+            scale = 10 ** column["places"]
+            whole = np.round(values * scale)
+            if np.all(np.abs(whole) < 2 ** 31) and np.array_equal(whole / scale, values):
+                chunk["encoding"] = "decimal"
+                values = whole.astype(np.int32)
+        data = zlib.compress(shuffleBytes(values), self.compressionLevel)
+        chunk.update({"offset": self.base + self.file.tell(), "length": len(data)})
+        self.file.write(data)
+        return chunk
+
+    def close(self):
+        '''Method that writes the rows still pending and the footer, and closes the file, copying an append onto the end of the file it extends'''
+        if self.file is None:
+            return
+        if self.pendingRows:
+            self.writeBlock(self.takePending())
+            self.pendingRows = 0
+        footer = json.dumps({"version": VERSION, "rows": self.rows, "columns": self.columns, "blocks": self.blocks, "metadata": self.metadata}).encode()
+        self.file.write(footer)
+        self.file.write(struct.pack("<Q", len(footer)))
+        self.file.write(MAGIC)
+        self.file.close()
+        self.file = None
+        if self.appending:
+            with open(self.obtainSidePath(), "rb") as side, open(self.path, "ab") as file:
+                shutil.copyfileobj(side, file)
+            os.remove(self.obtainSidePath())
+
+
+class ResultsReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a results file")
+            file.seek(-(8 + len(MAGIC)), 2)
+            footerLength = struct.unpack("<Q", file.read(8))[0]
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} has no footer, it may not have been closed")
+            file.seek(-(8 + len(MAGIC) + footerLength), 2) # Older footers left by appends sit among the chunks, only this one is read
+            footer = json.loads(file.read(footerLength))
+        if footer["version"] > VERSION:
+            raise ValueError(f"{path} is version {footer['version']}, newer than this reader")
+        self.rows = footer["rows"]
+        self.columns = {column["name"]: column for column in footer["columns"]}
+        self.blocks = footer["blocks"]
+        self.metadata = footer.get("metadata", {})
+
+    def __len__(self):
+        return self.rows
+
+    def obtainDictionary(self, name):
+        return self.columns[name].get("dictionary")
+
+    def readColumn(self, name, blocks = None):
+        '''Method that loads one column, from every block or only the block numbers given, reading no other column's chunks'''
+        column = self.columns[name]
+        blocks = self.blocks if blocks is None else [self.blocks[number] for number in blocks]
+        values = []
+        with open(self.path, "rb") as file:
+            for block in blocks:
+                values.append(self.readChunk(file, column, block["chunks"][name]))
+        return np.concatenate(values) if values else np.zeros(0, dtype = column["dtype"])
+
+    def readChunk(self, file, column, chunk):
+        if chunk["encoding"] == "sequence":
+            return (chunk["first"] + chunk["step"] * np.arange(chunk["count"])).astype(column["dtype"])
+        file.seek(chunk["offset"])
+        data = zlib.decompress(file.read(chunk["length"]))
+        if chunk["encoding"] == "decimal":
+            return unshuffleBytes(data, np.int32, chunk["count"]) / 10 ** column["places"]
+        return unshuffleBytes(data, column["dtype"], chunk["count"])
+
+    def readRagged(self, name, blocks = None):
+        '''Method that loads a ragged column as offsets (one more than the rows) and the values end to end'''
+        lengths = self.readColumn(self.columns[name]["lengths"], blocks)
+        return np.concatenate(([0], np.cumsum(lengths, dtype = np.int64))), self.readColumn(name, blocks)
+
+    def readLabels(self, name, blocks = None):
+        '''Method that loads a dictionary-encoded column as its labels'''
+        return [self.obtainDictionary(name)[code] for code in self.readColumn(name, blocks).tolist()]
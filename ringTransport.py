@@ -0,0 +1,136 @@
+# Phase-tracked transport around the booster ring and the collider
+# A proton on a ring is described by its azimuthal phase and its speed. Between passes through the accelerator it only goes round the arc,
+# so the ticks until it reaches the accelerator are found from its phase in one go rather than one at a time. Through the accelerator it
+# moves in a straight line along the gap's axis, kicked every tick, and those few ticks are applied one by one exactly as Proton applies them
+# (moveThroughBoosterRing and moveThroughCollider). The result is the same as ticking, and the cost grows with the passes through the
+# accelerator rather than with the ticks
+
+import math
+from constants import *
+from mathematicalMethods import getTwoDAngle
+
+class RingOrbit:
+    def __init__(self, centre, radius, direction, accelerator, acceleratingForce, gapAxis, gapForwards):
+        self.centre = centre
+        self.radius = radius
+        self.direction = -1 if direction == "c" else 1 # "c" is clockwise (decreasing phase), "a" anticlockwise, as in Proton.numericalCircularMotion
+        self.acceleratingForce = acceleratingForce
+        self.gapAxis = gapAxis # Axis the proton moves along in the accelerator
+        self.gapForwards = gapForwards # Whether it moves up that axis whatever the sign of its speed, as anticlockwise round the collider
+        self.gapBox = ((accelerator.pos[0] - accelerator.size[0] / 2, accelerator.pos[0] + accelerator.size[0] / 2), (accelerator.pos[2] - accelerator.size[2] / 2, accelerator.pos[2] + accelerator.size[2] / 2))
+        self.gapPhases = self.obtainBoxPhases(*self.gapBox)
+
+    def obtainPhase(self, pos):
+        '''Method that finds the azimuthal phase of a position around the centre, as Proton recovers it on joining an arc'''
+        return getTwoDAngle(self.centre, pos)
+
+    def obtainPosition(self, phase):
+        '''Method that finds the position on the orbit at a phase'''
+        return [self.centre[0] + self.radius * math.cos(phase), self.centre[1], self.centre[2] + self.radius * math.sin(phase)]
+
+    def obtainVelocity(self, phase, speed):
+        '''Method that finds the velocity along the orbit at a phase'''
+        return [-self.direction * speed * math.sin(phase), 0, self.direction * speed * math.cos(phase)]
+
+    def obtainBoxPhases(self, xRange, zRange):
+        '''Method that finds the phase intervals where the orbit lies inside an axis-aligned box in x and z'''
+        # The orbit can only enter or leave the box where it crosses one of the box's edges, so test between those phases
+        edges = [0, 2 * math.pi]
+        for x in xRange:
+            if abs((x - self.centre[0]) / self.radius) <= 1:
+                angle = math.acos((x - self.centre[0]) / self.radius)
+                edges += [angle, 2 * math.pi - angle]
+        for z in zRange:
+            if abs((z - self.centre[2]) / self.radius) <= 1:
+                angle = math.asin((z - self.centre[2]) / self.radius)
+                edges += [angle % (2 * math.pi), (math.pi - angle) % (2 * math.pi)]
+        edges = sorted(set(edges))
+        intervals = []
+        for lower, upper in zip(edges, edges[1:]):
+            middle = self.obtainPosition((lower + upper) / 2)
+            if xRange[0] <= middle[0] <= xRange[1] and zRange[0] <= middle[2] <= zRange[1]:
+                if intervals and intervals[-1][1] == lower:
+                    intervals[-1][1] = upper
+                else:
+                    intervals.append([lower, upper])
+        return intervals
+
+    def obtainTicksToEnter(self, phase, changeInAngle, intervals, maxTurns = 10000):
+        '''Method that finds the first tick at which a phase stepping by changeInAngle lands inside one of the intervals, None if it never does'''
+        # A step wider than an interval can jump over it, so later turns are tried until one of the ticks lands inside
+        step = abs(changeInAngle)
+        first = None
+        for lower, upper in intervals:
+            start = ((phase - upper) if changeInAngle < 0 else (lower - phase)) % (2 * math.pi)
+            for turn in range(-1, maxTurns):
+                entry = start + 2 * math.pi * turn
+                if entry + (upper - lower) < step:
+                    continue
+                ticks = max(1, math.ceil(entry / step))
+                if ticks * step <= entry + (upper - lower):
+                    if first is None or ticks < first:
+                        first = ticks
+                    break
+                if first is not None and ticks > first:
+                    break
+        return first
+
+    def inGap(self, pos):
+        '''Method that says whether a position is in the accelerator, the test Proton makes before each tick'''
+        (xLow, xHigh), (zLow, zHigh) = self.gapBox
+        return xLow <= pos[0] <= xHigh and zLow <= pos[2] <= zHigh
+
+    def advance(self, pos, phase, speed, mass, ticks = None, angle = None):
+        '''Method that moves a proton round the orbit by ticks, or to the first tick at which it has gone angle radians round, whichever comes first'''
+        # phase is None when the proton is off the arc (after the accelerator), so it is recovered from pos as Proton does on rejoining
+        # Returns the position, velocity, phase, accelerator passes and ticks taken
+        # 1. In the accelerator: one tick, a kick of acceleratingForce / mass over the tick and a step along the gap's axis at the new speed
+        # 2. On the arc: every tick up to the one that lands in the accelerator (or the last tick or angle allowed) at once
+        # A proton at rest on the arc stays there, it never reaches the accelerator
+        pos = list(pos)
+        velocity = None if phase is None else self.obtainVelocity(phase, speed)
+        swept = 0 # Radians gone round since the start, in the direction of travel
+        passes = 0
+        taken = 0
+        lastPhase = phase if phase is not None else self.obtainPhase(pos)
+        while ticks is None or taken < ticks:
+            if self.inGap(pos):
+                eSpeed = -speed + self.acceleratingForce / mass * TIME_PERIOD
+                displacement = eSpeed * TIME_PERIOD
+                pos[self.gapAxis] += abs(displacement) if self.gapForwards else displacement
+                velocity = [0, 0, 0]
+                velocity[self.gapAxis] = eSpeed
+                speed = abs(eSpeed)
+                phase = None
+                taken += 1
+                if not self.inGap(pos):
+                    passes += 1
+                continue
+            if phase is None:
+                phase = self.obtainPhase(pos)
+                swept += (self.direction * (phase - lastPhase) + math.pi) % (2 * math.pi) - math.pi
+            if angle is not None and swept >= angle:
+                break
+            changeInAngle = self.direction * (speed / self.radius) / RATE_OF_CALCULATIONS
+            if changeInAngle == 0:
+                pos = self.obtainPosition(phase)
+                break
+            arcTicks = self.obtainTicksToEnter(phase, changeInAngle, self.gapPhases)
+            # Landing a tick early is safe (the next pass round the loop finds it outside), landing late would skip the accelerator
+            while arcTicks is not None and arcTicks > 1 and self.inGap(self.obtainPosition((phase + (arcTicks - 1) * changeInAngle) % (2 * math.pi))):
+                arcTicks -= 1
+            if ticks is not None:
+                arcTicks = ticks - taken if arcTicks is None else min(arcTicks, ticks - taken)
+            if angle is not None:
+                toAngle = max(1, math.ceil((angle - swept) / abs(changeInAngle)))
+                arcTicks = toAngle if arcTicks is None else min(arcTicks, toAngle)
+            phase = (phase + arcTicks * changeInAngle) % (2 * math.pi)
+            pos = self.obtainPosition(phase)
+            velocity = self.obtainVelocity(phase, speed)
+            swept += arcTicks * abs(changeInAngle)
+            lastPhase = phase
+            taken += arcTicks
+        if velocity is None: # Started off the arc and took no tick
+            velocity = [0, 0, 0]
+            velocity[self.gapAxis] = -speed
+        return pos, velocity, phase, passes, taken
@@ -9,6 +9,8 @@ import random
 from sprites import *
 from constants import *
 from mathematicalMethods import *
+from frameTiming import FrameTimer
+from tracing import tracer, TRACE_DEBUG
 
 
 
@@ -50,6 +52,7 @@ class LHCSimulation:
         self.collisionStartPos = []
         self.collisionMidpoint = [0, 0, 0]
         self.collided = False
+        self.frameTimer = FrameTimer() if FRAME_TIMING else None
         self.drawGUI()
         
     def main(self):
@@ -59,13 +62,21 @@ class LHCSimulation:
 
     def run(self):
         '''Runner method'''
+        timer = self.frameTimer
+        if timer is not None:
+            timer.startFrame()
         self.frames += 1
         viz.MainView.setPosition(self.cameraPos) # Camera
         viz.MainView.setEuler(self.cameraAngle)
         self.drawSprites()
+        if timer is not None:
+            timer.mark("drawing")
         for point in self.points:
             point.enablePhysics()
-            print(f"Point {self.points.index(point)}: {point.pos}")
+            if tracer.level <= TRACE_DEBUG:
+                tracer.record(TRACE_DEBUG, "simulation.points", "Point %d: %s", self.points.index(point), point.pos)
+        if timer is not None:
+            timer.mark("physics")
         
         for point in self.points.copy():
             if point.pos[2] > 18.5:
@@ -74,6 +85,8 @@ class LHCSimulation:
             
             if point.pos[2] < -95 and type(point) == Proton and not point.completedLINAC:
                 point.completedLINAC = True
+        if timer is not None:
+            timer.mark("culling")
                 
         if self.collided:
             for point in self.points:
@@ -85,27 +98,38 @@ class LHCSimulation:
             if allCollided:
                 for i in range(len(self.points)):
                     if len(self.collisionStartPos) < 2:
-                        print("Appending")
+                        if tracer.level <= TRACE_DEBUG:
+                            tracer.record(TRACE_DEBUG, "simulation.collision", "Appending")
                         self.collisionStartPos.append(self.points[i].pos.copy())
                     else:
                         pass
                 if len(self.collisionStartPos) == 2:
                     self.collisionMidpoint = findMidpoint(self.collisionStartPos[0], self.collisionStartPos[1])
-                    print(f"CollisionStartPoints: {self.collisionStartPos}")
-                    print(f"Midpoint: {self.collisionMidpoint}")
+                    if tracer.level <= TRACE_DEBUG:
+                        tracer.record(TRACE_DEBUG, "simulation.collision", "CollisionStartPoints: %s, midpoint: %s", self.collisionStartPos, self.collisionMidpoint)
                     for i in range(len(self.points)):
                         xDifference = self.collisionMidpoint[0] - self.collisionStartPos[i][0]
                         zDifference = self.collisionMidpoint[2] - self.collisionStartPos[i][2]
                         differenceMatrix = [xDifference, 0, zDifference]
                         if self.points[i].pos != self.collisionMidpoint:
                             self.points[i].collide(self.points[i].pos, differenceMatrix)
-                            print(f"Old Frame CollisionStartPoints: {self.collisionStartPos}")
+                            if tracer.level <= TRACE_DEBUG:
+                                tracer.record(TRACE_DEBUG, "simulation.collision", "Old Frame CollisionStartPoints: %s", self.collisionStartPos)
                         else:
                             pass
+        if timer is not None:
+            timer.mark("collisionTrigger")
                             
         self.checkPointCollisions(self.points)
+        if timer is not None:
+            timer.mark("contacts")
         self.checkPointWallCollisions(self.sourceChamber)
+        if timer is not None:
+            timer.mark("wallForces")
         viz.callback(viz.BUTTON_EVENT, self.getGUIState)
+        if timer is not None:
+            timer.mark("callbacks")
+            timer.endFrame()
         
 
     def drawSprites(self):
@@ -283,5 +307,6 @@ class LHCSimulation:
         self.collided = True
         
 engine = LHCSimulation()
+vizact.onkeydown("t", tracer.dump) # Writes the buffered trace records to the console
 vizact.ontimer(TIME_PERIOD, engine.main) # Final line of code
 
@@ -0,0 +1,57 @@
+# Uniform-grid broadphase used by PhysicsEngine.checkPointCollisions
+# Points are bucketed into cubic cells so only points in the same or neighbouring cells are ever compared
+
+import numpy as np
+from constants import *
+from mathematicalMethods import expandPairs
+
+class SpatialHash:
+    def __init__(self, cellSize = CONTACT_CELL_SIZE):
+        self.cellSize = cellSize # Grown on each query so that no pair within reach can be more than one cell apart
+
+    def obtainCells(self, positions, cellSize):
+        '''Method that sorts the points by cell and returns the order, the cell of each sorted point and the neighbouring cell offsets'''
+        cells = np.floor(positions / cellSize).astype(np.int64)
+        cells -= cells.min(axis = 0) - 1 # One empty layer of cells on every side, so a neighbour offset never wraps onto another row
+        dims = cells.max(axis = 0) + 2
+        keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+        order = np.argsort(keys, kind = "stable")
+        # Half of the 26 neighbouring cells, so every pair of cells is visited once
+        offsets = np.array([(dx * dims[1] + dy) * dims[2] + dz for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)])
+        return order, keys[order], offsets[offsets > 0]
+
+    def obtainCandidatePairs(self, positions, reach = 0):
+        '''Method that lists each pair of points (first, second) sharing a cell or lying in neighbouring cells'''
+        # 1. Sort the points by cell key so every occupied cell is a contiguous run
+        # 2. Pair each cell with itself and with its 13 forward neighbours, found by binary search over the sorted keys
+        positions = np.asarray(positions, dtype = float)
+        if len(positions) < 2:
+            return np.zeros(0, dtype = int), np.zeros(0, dtype = int)
+        order, keys, offsets = self.obtainCells(positions, max(self.cellSize, reach))
+        cellStarts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        cellEnds = np.append(cellStarts[1:], len(keys))
+        cellKeys = keys[cellStarts]
+
+        first, second = expandPairs(cellStarts, cellEnds, cellStarts, cellEnds)
+        inside = first < second
+        firsts, seconds = [first[inside]], [second[inside]]
+        for offset in offsets:
+            neighbourStarts = np.searchsorted(keys, cellKeys + offset, side = "left")
+            neighbourEnds = np.searchsorted(keys, cellKeys + offset, side = "right")
+            occupied = np.flatnonzero(neighbourEnds > neighbourStarts)
+            first, second = expandPairs(cellStarts[occupied], cellEnds[occupied], neighbourStarts[occupied], neighbourEnds[occupied])
+            firsts.append(first)
+            seconds.append(second)
+        return order[np.concatenate(firsts)], order[np.concatenate(seconds)]
+
+    def obtainContactPairs(self, positions, radii):
+        '''Method that returns the pairs of spheres that touch or overlap, with the distance between their centres'''
+        positions = np.asarray(positions, dtype = float)
+        radii = np.asarray(radii, dtype = float)
+        if len(positions) < 2:
+            return np.zeros(0, dtype = int), np.zeros(0, dtype = int), np.zeros(0)
+        first, second = self.obtainCandidatePairs(positions, 2 * radii.max())
+        separation = positions[second] - positions[first]
+        distance = np.sqrt(np.einsum("ij,ij->i", separation, separation))
+        touching = distance <= radii[first] + radii[second]
+        return first[touching], second[touching], distance[touching]
@@ -6,6 +6,7 @@ from constants import *
 from mathematicalMethods import *
 import math
 import copy
+from tracing import tracer, TRACE_DEBUG
 
 # Points
 
@@ -82,41 +83,28 @@ class HydrogenAtom(Point):
         # 1. Get direction and angle
         # 2. Get orbital radius and speed
         # 3. Apply F = mv^2/r
-        print("Applying Circular Motion")
         self.orbitalCentre = centre
         self.orbitalRadius = radius
     
-        # Debugging statements
-        print(f"Centre: {centre}, Radius: {radius}")
-    
         resultantDirection = getQuartiles(self.orbitalCentre, self.pos)
         angle = getTwoDAngle(self.orbitalCentre, self.pos)
         self.speed = getMagnitude(self.orbitalCentre, self.velocity)
     
-        # More debugging statements
-        print(f"Resultant Direction: {resultantDirection}")
-        print(f"Angle: {angle}")
-        print(f"Speed: {self.speed}")
-    
         resultantForce = self.mass * (self.speed ** 2) / self.orbitalRadius
     
-        # Even more debugging statements
-        print(f"Resultant Force: {resultantForce}")
-    
         self.force = [
         -resultantDirection[0] * resultantForce * math.cos(angle), 
         0, 
         -resultantDirection[2] * resultantForce * math.sin(angle)
     ]
     
-        # Final debugging statement
-        print(f"Force: {self.force}")
+        if tracer.level <= TRACE_DEBUG:
+            tracer.record(TRACE_DEBUG, "hydrogen.circularMotion", "Centre: %s, radius: %s, direction: %s, angle: %s, speed: %s, force: %s", centre, radius, resultantDirection, angle, self.speed, self.force)
         
     def numericalCircularMotion(self, centre, radius, initialVelocity = None):
         '''Method that manages circular motion in the booster ring and the actual collider using a numerical method'''
         # 1. Calculate angular velocity from the starting velocity and the orbital radius
         # 2. Calculate the new angle based on the angular velocity and adjust the point's position
-        print("Applying Numerical Circular Motion")
         self.orbitalCentre = centre
         self.orbitalRadius = radius
         if initialVelocity is not None:
@@ -128,9 +116,8 @@ class HydrogenAtom(Point):
         newAngle = currentAngle + self.changeInAngle
         if newAngle > (2 * math.pi):
             newAngle = newAngle - (math.pi * 2)
-        print(f"Pos: {self.pos}")
-        print(f"Current Angle: {currentAngle}")
-        print(f"New Angle: {newAngle}")
+        if tracer.level <= TRACE_DEBUG:
+            tracer.record(TRACE_DEBUG, "hydrogen.circularMotion", "Pos: %s, current angle: %s, new angle: %s", self.pos, currentAngle, newAngle)
         newPos = [self.orbitalCentre[0] + self.orbitalRadius * math.cos(newAngle), self.orbitalCentre[1], self.orbitalCentre[2] + self.orbitalRadius * math.sin(newAngle)]
         self.pos = newPos
         
@@ -168,7 +155,8 @@ class Proton(Point):
                     targetAngleMinus = math.asin(self.pos[2] / 142)
                     self.xDistancePlus = (138 * math.cos(targetAnglePlus))
                     self.xDistanceMinus = (142 * math.cos(targetAngleMinus))
-                    print(self.xDistanceMinus)
+                    if tracer.level <= TRACE_DEBUG:
+                        tracer.record(TRACE_DEBUG, "proton.collider", "xDistanceMinus: %s", self.xDistanceMinus)
                     self.differencePlus = self.xDistancePlus - 79
                     self.differenceMinus = self.xDistanceMinus - 129
                     self.adjustAxesForCollider(self.pos)
@@ -242,7 +230,6 @@ class Proton(Point):
         # 1. Get direction and angle
         # 2. Get orbital radius and speed
         # 3. Apply F = mv^2/r
-        print("Applying Circular Motion")
         self.orbitalCentre = centre
         self.orbitalRadius = radius
         resultantDirection = getQuartiles(self.orbitalCentre, self.pos)
@@ -266,7 +253,8 @@ class Proton(Point):
             elif direction == "a":
                 self.changeInAngle = self.angularVelocity / RATE_OF_CALCULATIONS
         else:
-            print(self.speed)
+            if tracer.level <= TRACE_DEBUG:
+                tracer.record(TRACE_DEBUG, "proton.speed", "Speed: %s", self.speed)
             self.speed += 5
             self.angularVelocity = self.speed / self.orbitalRadius
             if direction == "c":
@@ -306,11 +294,11 @@ class Proton(Point):
         self.pos = newPos
         
     def collide(self, currentPos, differenceMatrix):
-        print("Colliding")
         newPos = currentPos
         for axis in range(3):
             newPos[axis] += (differenceMatrix[axis] / 8)
-        print(f"New Pos: {newPos}")
+        if tracer.level <= TRACE_DEBUG:
+            tracer.record(TRACE_DEBUG, "proton.collide", "Colliding, new pos: %s", newPos)
         self.pos = newPos
             
     
@@ -0,0 +1,94 @@
+# Tests that the NumPy and Numba kernels (see kernels.py) give the same Verlet steps and Coulomb forces
+# The backend is chosen when kernels.py is imported, so each test swaps in the kernels KERNEL_BACKEND = "numpy" or "numba" would have chosen
+# and checks ParticleArray.verletStep and DirectSumSolver against a plain pairwise reference
+
+import math
+import numpy as np
+import pytest
+import kernels
+from constants import *
+from coulombSolvers import DirectSumSolver
+from particleArray import ParticleArray
+
+def obtainNumbaKernels():
+    if kernels.COMPILED:
+        return kernels.verletStep, kernels.coulombForces
+    return kernels.numba.njit(cache = True)(kernels.verletStepLoop), kernels.numba.njit(cache = True)(kernels.coulombForcesLoop)
+
+BACKENDS = [
+    pytest.param("numpy", id = "numpy"),
+    pytest.param("numba", id = "numba", marks = pytest.mark.skipif(kernels.numba is None, reason = "Numba is not installed"))]
+
+@pytest.fixture(params = BACKENDS)
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        monkeypatch.setattr(kernels, "COMPILED", False)
+        monkeypatch.setattr(kernels, "verletStep", kernels.verletStepArrays)
+        monkeypatch.setattr(kernels, "coulombForces", None)
+    else:
+        verletStep, coulombForces = obtainNumbaKernels()
+        monkeypatch.setattr(kernels, "COMPILED", True)
+        monkeypatch.setattr(kernels, "verletStep", verletStep)
+        monkeypatch.setattr(kernels, "coulombForces", coulombForces)
+    return request.param
+
+def obtainReferenceForces(positions, charges, cutoff):
+    '''Function that sums the Coulomb force of every pair one at a time'''
+    forces = np.zeros((len(positions), 3))
+    for i in range(len(positions)):
+        for j in range(len(positions)):
+            separation = positions[i] - positions[j]
+            distance = math.sqrt(separation @ separation)
+            if i != j and distance > 0 and (cutoff is None or distance < cutoff):
+                forces[i] += COULOMB_LAW_CONSTANT * charges[i] * charges[j] * separation / distance ** 3
+    return forces
+
+@pytest.mark.parametrize("rows", [None, np.array([0, 2, 5]), slice(1, 7, 2)])
+def test_verletStep(backend, rows):
+    rng = np.random.default_rng(1)
+    count = 8
+    store = ParticleArray()
+    store.addMany(rng.normal(size = (count, 3)), rng.normal(size = (count, 3)) * 0.01, rng.normal(size = (count, 3)), rng.uniform(0.5, 2, count), 0, 0.25)
+    pos = store.pos[:count].copy()
+    oldPos = store.oldPos[:count].copy()
+    selected = np.arange(count) if rows is None else np.arange(count)[rows]
+    for step in range(5):
+        store.verletStep(rows)
+        acceleration = store.force[selected] / store.mass[selected, None]
+        velocity = (pos[selected] - oldPos[selected] + acceleration / RATE_OF_CALCULATIONS ** 2) * RATE_OF_CALCULATIONS
+        oldPos[selected] = pos[selected]
+        pos[selected] += velocity / RATE_OF_CALCULATIONS
+        np.testing.assert_allclose(store.pos[:count], pos, rtol = 1e-12, atol = 1e-12)
+        np.testing.assert_allclose(store.oldPos[:count], oldPos, rtol = 1e-12, atol = 1e-12)
+        np.testing.assert_allclose(store.velocity[selected], velocity, rtol = 1e-12, atol = 1e-12)
+        np.testing.assert_allclose(store.acceleration[selected], acceleration, rtol = 1e-12)
+        np.testing.assert_allclose(store.momentum[selected], store.mass[selected, None] * velocity, rtol = 1e-12, atol = 1e-12)
+
+@pytest.mark.parametrize("cutoff", [None, 1.5])
+def test_coulombDirectSum(backend, cutoff):
+    rng = np.random.default_rng(2)
+    positions = rng.uniform(0, 3, (300, 3))
+    positions[7] = positions[3] # Coincident points are skipped
+    charges = rng.choice([0, SIMULATED_PROTON_CHARGE, -SIMULATED_PROTON_CHARGE], 300)
+    forces = DirectSumSolver(cutoff = cutoff, blockSize = 64).obtainForces(positions, charges)
+    np.testing.assert_allclose(forces, obtainReferenceForces(positions, charges, cutoff), rtol = 1e-9, atol = 1e-9 * np.abs(forces).max())
+
+def test_backendsAgree(monkeypatch):
+    '''Both backends stepping the same particles under their own Coulomb forces stay together'''
+    if kernels.numba is None:
+        pytest.skip("Numba is not installed")
+    rng = np.random.default_rng(3)
+    positions = rng.uniform(0, 2, (50, 3))
+    results = []
+    for compiled in [False, True]:
+        verletStep, coulombForces = obtainNumbaKernels() if compiled else (kernels.verletStepArrays, None)
+        monkeypatch.setattr(kernels, "COMPILED", compiled)
+        monkeypatch.setattr(kernels, "verletStep", verletStep)
+        monkeypatch.setattr(kernels, "coulombForces", coulombForces)
+        store = ParticleArray()
+        store.addMany(positions, 0, 0, SIMULATED_PROTON_MASS, SIMULATED_PROTON_CHARGE, SIMULATED_PROTON_RADIUS)
+        solver = DirectSumSolver(cutoff = COULOMB_INTERACTION_RANGE)
+        for step in range(20):
+            store.verletStep(None, solver.obtainForces(store.pos[:store.count], store.charge[:store.count]))
+        results.append(store.pos[:store.count].copy())
+    np.testing.assert_allclose(results[0], results[1], rtol = 1e-9, atol = 1e-12)
@@ -0,0 +1,64 @@
+# Tests that Proton.advanceRing (see ringTransport.py) moves a proton round its ring as ticking Proton.enablePhysics does,
+# accelerator passes included, on the booster and both ways round the collider
+
+import math
+import pytest
+from constants import *
+from physicsEngine import PhysicsEngine
+from particles import Proton
+
+def obtainRingProton(engine, phase, speed, endBoostZCord = None):
+    '''Function that puts a proton on the booster's arc, or the collider's when endBoostZCord is given, going round at speed'''
+    proton = Proton([0, 0, 0], SIMULATED_PROTON_RADIUS, [0, 0, 0], [0, 0, 0], engine.bRing, engine.collider, engine.store)
+    proton.teleport = True
+    proton.orbitingRing = True
+    if endBoostZCord is not None:
+        proton.goingThroughCollider = True
+        proton.endBoostZCord = endBoostZCord
+    orbit = proton.obtainRingOrbit()
+    proton.pos = orbit.obtainPosition(phase)
+    proton.velocity = orbit.obtainVelocity(phase, speed)
+    proton.speed = speed
+    return proton
+
+# Speeds stay below 2500 on the booster, above which a ticked proton leaves it for the collider
+CASES = [
+    pytest.param(2.0, 200, None, 600, id = "booster-slow"),
+    pytest.param(2.0, 1000, None, 300, id = "booster"),
+    pytest.param(0.0, 300, None, 1000, id = "booster-inGap"),
+    pytest.param(1.0, 3000, -69, 2000, id = "collider-clockwise"),
+    pytest.param(5.0, 2600, -131, 3000, id = "collider-anticlockwise")]
+
+@pytest.mark.parametrize("phase, speed, endBoostZCord, ticks", CASES)
+def test_advanceRingTicks(phase, speed, endBoostZCord, ticks):
+    engine = PhysicsEngine()
+    ticked = obtainRingProton(engine, phase, speed, endBoostZCord)
+    advanced = obtainRingProton(engine, phase, speed, endBoostZCord)
+    for tick in range(ticks):
+        ticked.enablePhysics()
+    energyGained = advanced.advanceRing(ticks = ticks)
+    tickedSpeed = math.sqrt(ticked.velocity @ ticked.velocity)
+    assert tickedSpeed > speed # Every case passes the accelerator
+    assert advanced.speed == pytest.approx(tickedSpeed, rel = 1e-9)
+    assert energyGained == pytest.approx(0.5 * SIMULATED_PROTON_MASS * (tickedSpeed ** 2 - speed ** 2), rel = 1e-9)
+    assert advanced.pos.tolist() == pytest.approx(ticked.pos.tolist(), abs = 1e-8)
+
+@pytest.mark.parametrize("phase, speed, endBoostZCord, turns", [(2.0, 200, None, 3), (0.0, 1500, None, 10), (3.0, 3000, -69, 4)])
+def test_advanceTurns(phase, speed, endBoostZCord, turns):
+    '''Whole turns end on the first tick back at or past the starting phase (on the arc, so after the accelerator when it covers the start)'''
+    engine = PhysicsEngine()
+    ticked = obtainRingProton(engine, phase, speed, endBoostZCord)
+    advanced = obtainRingProton(engine, phase, speed, endBoostZCord)
+    orbit = advanced.obtainRingOrbit()
+    pos, velocity, newPhase, passes, taken = orbit.advance(advanced.pos.tolist(), None, speed, advanced.mass, angle = 2 * math.pi * turns)
+    for tick in range(taken):
+        ticked.enablePhysics()
+    assert passes >= turns
+    assert pos == pytest.approx(ticked.pos.tolist(), abs = 1e-8)
+    assert (orbit.direction * (newPhase - phase)) % (2 * math.pi) < math.pi / 4 # Just past the start, not part way round another turn
+
+def test_advanceRingAtRest():
+    proton = obtainRingProton(PhysicsEngine(), 2.0, 0)
+    start = proton.pos.tolist()
+    assert proton.advanceRing(ticks = 100, turns = 2) == 0
+    assert proton.pos.tolist() == pytest.approx(start, abs = 1e-12)
@@ -0,0 +1,75 @@
+# Sampled trace of what the simulation does, kept in memory instead of printed
+# Records below the tracer's level are dropped, and each site (a name for the place in the code) keeps one record in every n it is offered,
+# n from TRACE_SAMPLING. What is kept goes in a ring buffer of the latest TRACE_BUFFER_SIZE records, written out only when dump is called, e.g.
+#
+#     if tracer.level <= TRACE_DEBUG:
+#         tracer.record(TRACE_DEBUG, "proton.speed", "Speed: %s", self.speed)
+#     ...
+#     tracer.dump() # or tracer.dump("trace.txt")
+#
+# Call sites test the level themselves before calling record, so with tracing off (TRACE_LEVEL None) a site costs one comparison and its
+# message is never built. The message is formatted with its arguments when the record is kept, so it shows the values at that moment
+
+import collections
+import sys
+import time
+from constants import *
+
+TRACE_DEBUG = 10
+TRACE_INFO = 20
+TRACE_WARNING = 30
+TRACE_OFF = float("inf") # Above every level, so no record passes
+LEVEL_NAMES = {TRACE_DEBUG: "DEBUG", TRACE_INFO: "INFO", TRACE_WARNING: "WARNING"}
+LEVELS = {name.lower(): level for level, name in LEVEL_NAMES.items()}
+
+class Tracer:
+    def __init__(self, level = TRACE_LEVEL, size = TRACE_BUFFER_SIZE, sampling = TRACE_SAMPLING):
+        self.level = TRACE_OFF if level is None else LEVELS.get(level, level)
+        self.records = collections.deque(maxlen = size) # (nanoseconds since the tracer started, level, site, message), oldest first
+        self.sampling = dict(sampling) # Site: keep one record in this many, sites not listed keep every record
+        self.offered = collections.Counter() # Records offered by each site, kept or not
+        self.start = time.perf_counter_ns()
+
+    def setLevel(self, level):
+        '''Method that sets the lowest level kept, by number or by name ("debug", "info", "warning"), None turning tracing off'''
+        self.level = TRACE_OFF if level is None else LEVELS.get(level, level)
+
+    def setSampling(self, site, every):
+        '''Method that keeps one in every records from a site, 1 keeping them all'''
+        self.sampling[site] = every
+
+    def record(self, level, site, message, *args):
+        '''Method that keeps a record if its level passes and its site's sampling picks it, the first record from a site always being kept'''
+        if level < self.level:
+            return
+        offered = self.offered[site]
+        self.offered[site] = offered + 1
+        if offered % self.sampling.get(site, 1):
+            return
+        self.records.append((time.perf_counter_ns() - self.start, level, site, message % args if args else message))
+
+    def obtainRecords(self, site = None, level = TRACE_DEBUG):
+        '''Method that lists the buffered records, oldest first, from one site or all of them, at level or above'''
+        return [record for record in self.records if record[1] >= level and (site is None or record[2] == site)]
+
+    def formatRecord(self, record):
+        elapsed, level, site, message = record
+        return f"{elapsed / 10 ** 9:12.6f} {LEVEL_NAMES.get(level, level):<8}{site}: {message}"
+
+    def dump(self, path = None, clear = True):
+        '''Method that writes the buffered records, one per line, to a file (appending) or to stdout, emptying the buffer unless clear is False'''
+        lines = "".join(self.formatRecord(record) + "\n" for record in self.records)
+        if path is None:
+            sys.stdout.write(lines)
+        else:
+            with open(path, "a") as file:
+                file.write(lines)
+        if clear:
+            self.records.clear()
+
+    def clear(self):
+        self.records.clear()
+        self.offered.clear()
+
+
+tracer = Tracer() # Shared by every module, so one dump shows the whole simulation's records in order